@@ -5,10 +5,23 @@ Final stats summary at the end.
 Includes 5 duplicate queries arranged at intervals to test memory usage.
 """
 
+import argparse
 import asyncio
+import hashlib
+import io
+import json
+import logging
+import os
 import time
 from pathlib import Path
+from typing import Optional
 import sys
+import pickle
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import asdict, dataclass, field
+from functools import partial
 from datetime import datetime
 
 # Add project root to path
@@ -20,6 +33,222 @@ from agent.agent_loop import AgentLoop
 from utils.csv_manager import CSVManager
 import yaml
 import re
+import csv
+import numpy as np
+
+try:
+    import pandas as pd
+    PANDAS_AVAILABLE = True
+except ImportError:
+    PANDAS_AVAILABLE = False
+
+# Bound once at import; compact separators keep the Nodes_Called CSV cell small
+_json_dumps_compact = partial(json.dumps, separators=(',', ':'), ensure_ascii=False)
+
+# Minimum gap (seconds) between the end of one agent run and the next run on the same worker
+RATE_LIMIT_S = 2.0
+
+# Default number of concurrent agent runs (override with CONCURRENCY env var or --concurrency)
+DEFAULT_CONCURRENCY = int(os.environ.get("CONCURRENCY", "5"))
+
+# Exact duplicate queries are answered from the harness result cache unless DISABLE_DUPLICATE_CACHE=1
+# (or --no-duplicate-cache) is set, which sends them through the agent memory path instead
+DUPLICATE_CACHE_ENABLED = os.environ.get("DISABLE_DUPLICATE_CACHE", "0") != "1"
+
+# Separator lines used by the report output
+_DASH80 = "-" * 80
+_EQ80 = "=" * 80
+
+# Compiled regex for extracting numbers during answer verification
+_NUM_RE = re.compile(r'\d+\.?\d*')
+
+# Per-step progress lines are DEBUG (shown with --verbose); answers/errors are INFO
+# The handler is attached here rather than via basicConfig, so the lines also show when the
+# module is imported by another runner, and other libraries' records stay out of the report
+logger = logging.getLogger("test100")
+
+
+# Buffer that print() and test100 log lines go to in the current task (None = the console).
+# Tasks and asyncio.to_thread() workers inherit it, so concurrent queries each collect their own output
+_output_buffer: ContextVar[Optional[io.StringIO]] = ContextVar("test100_output_buffer", default=None)
+
+
+class _TaskStdout:
+    """
+    Stand-in for sys.stdout that writes to the current task's _output_buffer, if any.
+    
+    Installed only while run_test_100_queries() runs; writes with no buffer set (the reporter,
+    threads not started through asyncio.to_thread) go to the stream it replaced.
+    """
+    
+    def __init__(self):
+        self.stream = None  # The replaced sys.stdout while installed
+    
+    def _target(self):
+        buf = _output_buffer.get()
+        if buf is not None:
+            return buf
+        return self.stream if self.stream is not None else sys.stdout
+    
+    def write(self, s: str) -> int:
+        return self._target().write(s)
+    
+    def flush(self):
+        self._target().flush()
+    
+    def isatty(self) -> bool:
+        return self._target().isatty()
+    
+    def __getattr__(self, name):
+        return getattr(self.stream if self.stream is not None else sys.stdout, name)
+    
+    @contextmanager
+    def installed(self):
+        """Replace sys.stdout with this proxy for the duration of the block."""
+        self.stream, sys.stdout = sys.stdout, self
+        try:
+            yield self
+        finally:
+            sys.stdout, self.stream = self.stream, None
+
+
+_task_stdout = _TaskStdout()
+_log_handler = logging.StreamHandler(_task_stdout)
+_log_handler.setFormatter(logging.Formatter('%(message)s'))
+logger.addHandler(_log_handler)
+logger.setLevel(logging.INFO)
+logger.propagate = False
+
+
+# ============================================================================
+# BASE QUERIES (module-level constants, built once at import)
+# ============================================================================
+
+# Information queries (30 queries)
+_INFO_QUERIES = (
+    {"query": "What is the chemical formula for water?", "category": "information", "expected_type": "factual"},
+    {"query": "Who wrote the novel '1984'?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of Japan?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the speed of light?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of Australia?", "category": "information", "expected_type": "factual"},
+    {"query": "Who invented the telephone?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the largest planet in our solar system?", "category": "information", "expected_type": "factual"},
+    {"query": "What year did World War II end?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the smallest country in the world?", "category": "information", "expected_type": "factual"},
+    {"query": "How many chambers does a human heart have?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the largest organ in the human body?", "category": "information", "expected_type": "factual"},
+    {"query": "What gas do plants absorb from the atmosphere?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the national animal of India?", "category": "information", "expected_type": "factual"},
+    {"query": "Who painted the Mona Lisa?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of France?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of Germany?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of Italy?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of Spain?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of Brazil?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of Canada?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of Mexico?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of Russia?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of China?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of India?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of South Korea?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of Egypt?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of South Africa?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of Argentina?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of Chile?", "category": "information", "expected_type": "factual"},
+    {"query": "What is the capital of New Zealand?", "category": "information", "expected_type": "factual"},
+)
+
+# Math queries (30 queries)
+_MATH_QUERIES = (
+    {"query": "Calculate 144 divided by 12", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 200 divided by 8", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 10 * 5", "category": "math", "expected_type": "computation"},
+    {"query": "What is 81 divided by 9?", "category": "math", "expected_type": "computation"},
+    {"query": "What is 5 to the power of 3?", "category": "math", "expected_type": "computation"},
+    {"query": "Find the factorial of 5", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 25 multiplied by 4", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 100 divided by 4", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 15 * 6", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 72 divided by 8", "category": "math", "expected_type": "computation"},
+    {"query": "What is 3 to the power of 4?", "category": "math", "expected_type": "computation"},
+    {"query": "Find the factorial of 6", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 50 * 2", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 120 divided by 10", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 7 * 8", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 64 divided by 8", "category": "math", "expected_type": "computation"},
+    {"query": "What is 2 to the power of 8?", "category": "math", "expected_type": "computation"},
+    {"query": "Find the factorial of 4", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 30 * 3", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 90 divided by 9", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 12 * 7", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 56 divided by 7", "category": "math", "expected_type": "computation"},
+    {"query": "What is 4 to the power of 3?", "category": "math", "expected_type": "computation"},
+    {"query": "Find the factorial of 7", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 40 * 2", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 108 divided by 9", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 9 * 9", "category": "math", "expected_type": "computation"},
+    {"query": "Calculate 84 divided by 7", "category": "math", "expected_type": "computation"},
+    {"query": "What is 6 to the power of 2?", "category": "math", "expected_type": "computation"},
+    {"query": "Find the factorial of 8", "category": "math", "expected_type": "computation"},
+)
+
+# Data analysis queries (20 queries)
+_DATA_QUERIES = (
+    {"query": "Calculate the average of numbers: 5, 10, 15, 20, 25", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 10, 20, 30, 40, 50", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 100, 200, 300, 400, 500", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 15, 25, 35, 45, 55", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 20, 40, 60, 80, 100", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 12, 24, 36, 48, 60", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 7, 14, 21, 28, 35", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 50, 100, 150, 200, 250", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 8, 16, 24, 32, 40", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 11, 22, 33, 44, 55", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 6, 12, 18, 24, 30", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 9, 18, 27, 36, 45", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 13, 26, 39, 52, 65", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 14, 28, 42, 56, 70", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 16, 32, 48, 64, 80", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 17, 34, 51, 68, 85", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 19, 38, 57, 76, 95", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 21, 42, 63, 84, 105", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 23, 46, 69, 92, 115", "category": "data_analysis", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 25, 50, 75, 100, 125", "category": "data_analysis", "expected_type": "computation"},
+)
+
+# Complex queries (10 queries)
+_COMPLEX_QUERIES = (
+    {"query": "Find the factorial of 5 and calculate the sum of all prime numbers from 1 to 20, then find the greatest common divisor of 48 and 18", "category": "complex", "expected_type": "computation"},
+    {"query": "Calculate the average of numbers: 100, 200, 300, 400, 500, then find the square root of that average, and finally multiply it by 10", "category": "complex", "expected_type": "computation"},
+    {"query": "Calculate 15 * 4, then divide the result by 3, and finally add 20", "category": "complex", "expected_type": "computation"},
+    {"query": "Find the factorial of 6, then calculate 2 to the power of 5, and finally find the sum of both results", "category": "complex", "expected_type": "computation"},
+    {"query": "Calculate the average of 10, 20, 30, then multiply by 2, and finally subtract 5", "category": "complex", "expected_type": "computation"},
+    {"query": "Find the square root of 144, then multiply by 3, and finally add 10", "category": "complex", "expected_type": "computation"},
+    {"query": "Calculate 25 * 4, then divide by 5, and finally find the square root", "category": "complex", "expected_type": "computation"},
+    {"query": "Find the factorial of 4, then calculate 3 to the power of 3, and finally find the difference", "category": "complex", "expected_type": "computation"},
+    {"query": "Calculate the sum of 50, 100, 150, then divide by 3, and finally multiply by 2", "category": "complex", "expected_type": "computation"},
+    {"query": "Find the square root of 81, then multiply by 2, and finally subtract 3", "category": "complex", "expected_type": "computation"},
+)
+
+# Property queries (10 queries)
+_PROPERTY_QUERIES = (
+    {"query": "List the security features in DLF Camelia.", "category": "property", "expected_type": "factual"},
+    {"query": "What are the price ranges for 3BHK apartments in DLF Camelia?", "category": "property", "expected_type": "factual"},
+    {"query": "What amenities are available in DLF Camelia?", "category": "property", "expected_type": "factual"},
+    {"query": "What are the price ranges for 2BHK apartments in DLF Camelia?", "category": "property", "expected_type": "factual"},
+    {"query": "What are the price ranges for 4BHK apartments in DLF Camelia?", "category": "property", "expected_type": "factual"},
+    {"query": "List the parking facilities in DLF Camelia.", "category": "property", "expected_type": "factual"},
+    {"query": "What are the location advantages of DLF Camelia?", "category": "property", "expected_type": "factual"},
+    {"query": "What are the price ranges for 1BHK apartments in DLF Camelia?", "category": "property", "expected_type": "factual"},
+    {"query": "What are the price ranges for penthouse in DLF Camelia?", "category": "property", "expected_type": "factual"},
+    {"query": "What are the nearby schools and hospitals near DLF Camelia?", "category": "property", "expected_type": "factual"},
+)
+
+
+# Every category used above, sorted once so the report can iterate them in order without sorting
+CANONICAL_CATEGORIES = tuple(sorted({
+    q["category"] for q in _INFO_QUERIES + _MATH_QUERIES + _DATA_QUERIES + _COMPLEX_QUERIES + _PROPERTY_QUERIES
+}))
 
 
 def create_test_queries():
@@ -33,130 +262,8 @@ def create_test_queries():
     - Duplicate 4: After query 80 (80% mark)
     - Duplicate 5: After query 95 (95% mark)
     """
-    base_queries = []
-    
-    # Information queries (30 queries)
-    info_queries = [
-        {"query": "What is the chemical formula for water?", "category": "information", "expected_type": "factual"},
-        {"query": "Who wrote the novel '1984'?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of Japan?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the speed of light?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of Australia?", "category": "information", "expected_type": "factual"},
-        {"query": "Who invented the telephone?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the largest planet in our solar system?", "category": "information", "expected_type": "factual"},
-        {"query": "What year did World War II end?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the smallest country in the world?", "category": "information", "expected_type": "factual"},
-        {"query": "How many chambers does a human heart have?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the largest organ in the human body?", "category": "information", "expected_type": "factual"},
-        {"query": "What gas do plants absorb from the atmosphere?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the national animal of India?", "category": "information", "expected_type": "factual"},
-        {"query": "Who painted the Mona Lisa?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of France?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of Germany?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of Italy?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of Spain?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of Brazil?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of Canada?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of Mexico?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of Russia?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of China?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of India?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of South Korea?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of Egypt?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of South Africa?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of Argentina?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of Chile?", "category": "information", "expected_type": "factual"},
-        {"query": "What is the capital of New Zealand?", "category": "information", "expected_type": "factual"},
-    ]
-    
-    # Math queries (30 queries)
-    math_queries = [
-        {"query": "Calculate 144 divided by 12", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 200 divided by 8", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 10 * 5", "category": "math", "expected_type": "computation"},
-        {"query": "What is 81 divided by 9?", "category": "math", "expected_type": "computation"},
-        {"query": "What is 5 to the power of 3?", "category": "math", "expected_type": "computation"},
-        {"query": "Find the factorial of 5", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 25 multiplied by 4", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 100 divided by 4", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 15 * 6", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 72 divided by 8", "category": "math", "expected_type": "computation"},
-        {"query": "What is 3 to the power of 4?", "category": "math", "expected_type": "computation"},
-        {"query": "Find the factorial of 6", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 50 * 2", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 120 divided by 10", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 7 * 8", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 64 divided by 8", "category": "math", "expected_type": "computation"},
-        {"query": "What is 2 to the power of 8?", "category": "math", "expected_type": "computation"},
-        {"query": "Find the factorial of 4", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 30 * 3", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 90 divided by 9", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 12 * 7", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 56 divided by 7", "category": "math", "expected_type": "computation"},
-        {"query": "What is 4 to the power of 3?", "category": "math", "expected_type": "computation"},
-        {"query": "Find the factorial of 7", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 40 * 2", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 108 divided by 9", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 9 * 9", "category": "math", "expected_type": "computation"},
-        {"query": "Calculate 84 divided by 7", "category": "math", "expected_type": "computation"},
-        {"query": "What is 6 to the power of 2?", "category": "math", "expected_type": "computation"},
-        {"query": "Find the factorial of 8", "category": "math", "expected_type": "computation"},
-    ]
-    
-    # Data analysis queries (20 queries)
-    data_queries = [
-        {"query": "Calculate the average of numbers: 5, 10, 15, 20, 25", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 10, 20, 30, 40, 50", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 100, 200, 300, 400, 500", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 15, 25, 35, 45, 55", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 20, 40, 60, 80, 100", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 12, 24, 36, 48, 60", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 7, 14, 21, 28, 35", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 50, 100, 150, 200, 250", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 8, 16, 24, 32, 40", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 11, 22, 33, 44, 55", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 6, 12, 18, 24, 30", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 9, 18, 27, 36, 45", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 13, 26, 39, 52, 65", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 14, 28, 42, 56, 70", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 16, 32, 48, 64, 80", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 17, 34, 51, 68, 85", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 19, 38, 57, 76, 95", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 21, 42, 63, 84, 105", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 23, 46, 69, 92, 115", "category": "data_analysis", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 25, 50, 75, 100, 125", "category": "data_analysis", "expected_type": "computation"},
-    ]
-    
-    # Complex queries (10 queries)
-    complex_queries = [
-        {"query": "Find the factorial of 5 and calculate the sum of all prime numbers from 1 to 20, then find the greatest common divisor of 48 and 18", "category": "complex", "expected_type": "computation"},
-        {"query": "Calculate the average of numbers: 100, 200, 300, 400, 500, then find the square root of that average, and finally multiply it by 10", "category": "complex", "expected_type": "computation"},
-        {"query": "Calculate 15 * 4, then divide the result by 3, and finally add 20", "category": "complex", "expected_type": "computation"},
-        {"query": "Find the factorial of 6, then calculate 2 to the power of 5, and finally find the sum of both results", "category": "complex", "expected_type": "computation"},
-        {"query": "Calculate the average of 10, 20, 30, then multiply by 2, and finally subtract 5", "category": "complex", "expected_type": "computation"},
-        {"query": "Find the square root of 144, then multiply by 3, and finally add 10", "category": "complex", "expected_type": "computation"},
-        {"query": "Calculate 25 * 4, then divide by 5, and finally find the square root", "category": "complex", "expected_type": "computation"},
-        {"query": "Find the factorial of 4, then calculate 3 to the power of 3, and finally find the difference", "category": "complex", "expected_type": "computation"},
-        {"query": "Calculate the sum of 50, 100, 150, then divide by 3, and finally multiply by 2", "category": "complex", "expected_type": "computation"},
-        {"query": "Find the square root of 81, then multiply by 2, and finally subtract 3", "category": "complex", "expected_type": "computation"},
-    ]
-    
-    # Property queries (10 queries)
-    property_queries = [
-        {"query": "List the security features in DLF Camelia.", "category": "property", "expected_type": "factual"},
-        {"query": "What are the price ranges for 3BHK apartments in DLF Camelia?", "category": "property", "expected_type": "factual"},
-        {"query": "What amenities are available in DLF Camelia?", "category": "property", "expected_type": "factual"},
-        {"query": "What are the price ranges for 2BHK apartments in DLF Camelia?", "category": "property", "expected_type": "factual"},
-        {"query": "What are the price ranges for 4BHK apartments in DLF Camelia?", "category": "property", "expected_type": "factual"},
-        {"query": "List the parking facilities in DLF Camelia.", "category": "property", "expected_type": "factual"},
-        {"query": "What are the location advantages of DLF Camelia?", "category": "property", "expected_type": "factual"},
-        {"query": "What are the price ranges for 1BHK apartments in DLF Camelia?", "category": "property", "expected_type": "factual"},
-        {"query": "What are the price ranges for penthouse in DLF Camelia?", "category": "property", "expected_type": "factual"},
-        {"query": "What are the nearby schools and hospitals near DLF Camelia?", "category": "property", "expected_type": "factual"},
-    ]
-    
     # Combine all base queries (100 total)
-    base_queries = info_queries + math_queries + data_queries + complex_queries + property_queries
+    base_queries = _INFO_QUERIES + _MATH_QUERIES + _DATA_QUERIES + _COMPLEX_QUERIES + _PROPERTY_QUERIES
     
     # Select queries for duplicates (strategically chosen for memory testing)
     duplicate_sources = [
@@ -167,6 +274,16 @@ def create_test_queries():
         base_queries[90],  # "List the security features in DLF Camelia." (property)
     ]
     
+    # Duplicate placement: base index after which to insert -> (source query, original_id)
+    # Inserted after queries 20, 40, 60, 80, 95
+    DUP_MAP = {
+        19: (duplicate_sources[0], 1),   # After query 20 (index 19)
+        39: (duplicate_sources[1], 31),  # After query 40 (index 39)
+        59: (duplicate_sources[2], 61),  # After query 60 (index 59)
+        79: (duplicate_sources[3], 81),  # After query 80 (index 79)
+        94: (duplicate_sources[4], 91),  # After query 95 (index 94)
+    }
+    
     # Build final query list with duplicates inserted at intervals
     final_queries = []
     query_id = 1
@@ -181,69 +298,35 @@ def create_test_queries():
         })
         query_id += 1
         
-        # Insert duplicates at intervals: after 20, 40, 60, 80, 95
-        if i == 19:  # After query 20 (index 19)
-            dup = duplicate_sources[0]
-            final_queries.append({
-                "id": query_id,
-                "query": dup["query"],
-                "category": dup["category"],
-                "expected_type": dup["expected_type"],
-                "is_duplicate": True,
-                "original_id": 1
-            })
-            query_id += 1
-        elif i == 39:  # After query 40 (index 39)
-            dup = duplicate_sources[1]
-            final_queries.append({
-                "id": query_id,
-                "query": dup["query"],
-                "category": dup["category"],
-                "expected_type": dup["expected_type"],
-                "is_duplicate": True,
-                "original_id": 31
-            })
-            query_id += 1
-        elif i == 59:  # After query 60 (index 59)
-            dup = duplicate_sources[2]
-            final_queries.append({
-                "id": query_id,
-                "query": dup["query"],
-                "category": dup["category"],
-                "expected_type": dup["expected_type"],
-                "is_duplicate": True,
-                "original_id": 61
-            })
-            query_id += 1
-        elif i == 79:  # After query 80 (index 79)
-            dup = duplicate_sources[3]
-            final_queries.append({
-                "id": query_id,
-                "query": dup["query"],
-                "category": dup["category"],
-                "expected_type": dup["expected_type"],
-                "is_duplicate": True,
-                "original_id": 81
-            })
-            query_id += 1
-        elif i == 94:  # After query 95 (index 94)
-            dup = duplicate_sources[4]
+        dup_entry = DUP_MAP.get(i)
+        if dup_entry:
+            dup, original_id = dup_entry
             final_queries.append({
                 "id": query_id,
                 "query": dup["query"],
                 "category": dup["category"],
                 "expected_type": dup["expected_type"],
                 "is_duplicate": True,
-                "original_id": 91
+                "original_id": original_id
             })
             query_id += 1
     
     return final_queries
 
 
-def print_step_header(step_name: str, query_id: int):
-    """Print compact step header."""
-    print(f"  [{step_name}]", end=" ")
+def _fast_ts(dt: datetime) -> str:
+    """Format dt as "YYYY-MM-DD HH:MM:SS" (isoformat is cheaper than strftime for this)."""
+    return dt.isoformat(sep=' ', timespec='seconds')
+
+
+def _preview(s: str, n: int = 60) -> str:
+    """Return s, or its first n characters followed by "..." when it is longer."""
+    return s if len(s) <= n else f"{s[:n]}..."
+
+
+def log_step(step_name: str, message: str, *args, level: int = logging.DEBUG):
+    """Log a compact step line ("  [Step] message"); message uses lazy %-formatting."""
+    logger.log(level, "  [%s] " + message, step_name, *args)
 
 
 def print_memory_results(memory_results):
@@ -293,12 +376,201 @@ def print_execution_summary(execution_details):
         print("Steps: N/A | Tools: N/A | Nodes: N/A")
 
 
+@dataclass(slots=True)
+class ResultEntry:
+    """Outcome of one test query, as used by the final statistics."""
+    id: int
+    query: str
+    category: str
+    answer: str
+    answer_len: int = field(init=False, default=0)  # len(answer), set once for the preview pass
+    expected_answer: str = "N/A"
+    is_correct: Optional[bool] = None
+    validation_notes: list = field(default_factory=list)
+    status: str = "success"
+    elapsed: float = 0.0
+    is_duplicate: bool = False
+    original_id: Optional[int] = None
+    hil_triggered: bool = False
+    hil_reason: str = ""
+    error: Optional[str] = None
+    
+    def __post_init__(self):
+        self.answer_len = len(self.answer)
+    
+    def as_dict(self) -> dict:
+        """Return the entry as a plain dict (for JSON/CSV serialization)."""
+        return asdict(self)
+
+
+class _RunCache:
+    """
+    Process-local LRU cache of agent loop results, keyed by sha1 of the query text.
+    
+    Lets exact duplicate queries skip the whole perception/decision/execution pipeline.
+    Disabled with DISABLE_DUPLICATE_CACHE=1, since it bypasses the agent's own memory system.
+    """
+    
+    def __init__(self, maxsize: int = 128):
+        self.maxsize = maxsize
+        self._entries: OrderedDict[str, object] = OrderedDict()
+    
+    @staticmethod
+    def _key(query: str) -> str:
+        return hashlib.sha1(query.encode('utf-8')).hexdigest()
+    
+    def get(self, query: str):
+        """Return the cached result for query, or None."""
+        key = self._key(query)
+        if key not in self._entries:
+            return None
+        self._entries.move_to_end(key)
+        return self._entries[key]
+    
+    def put(self, query: str, result):
+        """Cache a completed agent loop result for query."""
+        self._entries[self._key(query)] = result
+        if len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+
+
+class _QueryLogger:
+    """
+    Collects everything printed for one query into a StringIO buffer.
+    
+    Sets _output_buffer for the current task while the block runs, so print() and log_step()
+    need no changes and output from other tasks is not picked up; on exit the whole report is
+    emitted with a single write instead of many small writes. It is only flushed right away on
+    an interactive terminal; redirected runs leave it to the block-buffered stdout.
+    """
+    
+    def __enter__(self):
+        self._buf = io.StringIO(newline='')
+        self._token = _output_buffer.set(self._buf)
+        return self._buf
+    
+    def __exit__(self, exc_type, exc, tb):
+        _output_buffer.reset(self._token)
+        sys.stdout.write(self._buf.getvalue())
+        if exc_type is not None or sys.stdout.isatty():
+            sys.stdout.flush()
+        return False
+
+
+# Parsed MCP configs keyed by (path, mtime), reused across runs in the same interpreter
+_MCP_CONFIG_CACHE: dict[tuple[str, float], dict] = {}
+
+
+def _load_mcp_config(path: Path) -> dict:
+    """Parse the MCP server YAML config, reusing the cached dict while the file is unchanged."""
+    key = (str(path), path.stat().st_mtime)
+    config = _MCP_CONFIG_CACHE.get(key)
+    if config is None:
+        with open(path, 'r') as f:
+            config = yaml.safe_load(f) or {}
+        _MCP_CONFIG_CACHE[key] = config
+    return config
+
+
+# Parsed expected answers are cached here, keyed by source path + mtime (see .meta file)
+EXPECTED_ANSWERS_CACHE = project_root / "Tests" / ".expected_answers.pkl"
+# Bump when parsing changes, so answers cached by an older parser are not reused
+EXPECTED_ANSWERS_PARSER_VERSION = 2
+
+
+def _expected_answers_cache_key(answers_path: Path) -> str:
+    """Cache key for an expected answers file: parser version, resolved path and modification time."""
+    return f"v{EXPECTED_ANSWERS_PARSER_VERSION}|{answers_path.resolve()}|{answers_path.stat().st_mtime_ns}"
+
+
+def _load_cached_expected_answers(answers_path: Path) -> dict | None:
+    """Return cached expected answers if the cache is fresh for answers_path, else None."""
+    meta_path = EXPECTED_ANSWERS_CACHE.with_suffix(".pkl.meta")
+    try:
+        if meta_path.read_text(encoding='utf-8') != _expected_answers_cache_key(answers_path):
+            return None
+        with open(EXPECTED_ANSWERS_CACHE, 'rb') as f:
+            return pickle.load(f)
+    except Exception:
+        return None
+
+
+def _save_cached_expected_answers(answers_path: Path, expected_answers: dict):
+    """Persist parsed expected answers alongside the cache key (best effort)."""
+    meta_path = EXPECTED_ANSWERS_CACHE.with_suffix(".pkl.meta")
+    try:
+        with open(EXPECTED_ANSWERS_CACHE, 'wb') as f:
+            pickle.dump(expected_answers, f, protocol=pickle.HIGHEST_PROTOCOL)
+        meta_path.write_text(_expected_answers_cache_key(answers_path), encoding='utf-8')
+    except Exception as e:
+        print(f"[WARN] Could not cache expected answers: {e}")
+
+
+def _intern_answer_types(expected_answers: dict) -> dict:
+    """
+    Intern each entry's answer type in place.
+    
+    There are only a handful of distinct types, so every entry then shares one string object and
+    the type comparisons in verify_answer() hit the identity fast path.
+    """
+    for entry in expected_answers.values():
+        entry["type"] = sys.intern(entry["type"])
+    return expected_answers
+
+
+_EXPECTED_ANSWER_COLUMNS = ['query', 'expected', 'type', 'notes']
+
+
+def _parse_expected_answer_lines(lines: list[str]) -> dict:
+    """Parse "Query | Expected Answer | Answer Type | Notes" lines one at a time."""
+    expected_answers = {}
+    for line in lines:
+        # Parse format: Query | Expected Answer | Answer Type | Notes
+        parts = [p.strip() for p in line.strip().split('|')]
+        if len(parts) >= 2:
+            query = parts[0]
+            expected_answer = parts[1]
+            answer_type = parts[2] if len(parts) > 2 else "unknown"
+            notes = parts[3] if len(parts) > 3 else ""
+            
+            expected_answers[query] = {
+                "expected": expected_answer,
+                "type": answer_type,
+                "notes": notes
+            }
+    return expected_answers
+
+
+def _read_expected_answers_frame(lines: list[str]) -> dict:
+    """
+    Parse the same lines as _parse_expected_answer_lines() with a single pandas read.
+    
+    '|' fields beyond Notes are cut off first, as the line parser ignores them (pandas would
+    otherwise take a longer first line as the column count); read_csv pads short lines with NaN.
+    """
+    ncols = len(_EXPECTED_ANSWER_COLUMNS)
+    text = '\n'.join('|'.join(line.rstrip('\n').split('|', ncols)[:ncols]) for line in lines)
+    df = pd.read_csv(
+        io.StringIO(text), sep='|', skipinitialspace=True, header=None,
+        names=_EXPECTED_ANSWER_COLUMNS, engine='python', dtype=str,
+        keep_default_na=False, quoting=csv.QUOTE_NONE
+    )
+    df = df[df['expected'].notna()]
+    df['type'] = df['type'].fillna('unknown')
+    df = df.fillna('').apply(lambda col: col.str.strip())
+    df = df.drop_duplicates('query', keep='last')
+    return df.set_index('query')[['expected', 'type', 'notes']].to_dict('index')
+
+
 def load_expected_answers(answers_file: str = "Tests/test_100_queries_expected_answers.txt") -> dict:
     """
     Load expected answers from text file.
     
     Format: Query | Expected Answer | Answer Type | Notes
     
+    The parsed result is cached in Tests/.expected_answers.pkl and reused
+    until the source file's modification time changes.
+    
     Returns:
         Dictionary mapping query text to expected answer
     """
@@ -309,28 +581,26 @@ def load_expected_answers(answers_file: str = "Tests/test_100_queries_expected_a
         print(f"[WARN] Expected answers file not found: {answers_path}")
         return {}
     
+    cached = _load_cached_expected_answers(answers_path)
+    if cached is not None:
+        return _intern_answer_types(cached)
+    
     try:
+        # Comment and blank lines are dropped here, so a '#' inside an answer is kept as data
         with open(answers_path, 'r', encoding='utf-8') as f:
-            for line in f:
-                line = line.strip()
-                # Skip comments and empty lines
-                if not line or line.startswith('#'):
-                    continue
-                
-                # Parse format: Query | Expected Answer | Answer Type | Notes
-                parts = [p.strip() for p in line.split('|')]
-                if len(parts) >= 2:
-                    query = parts[0]
-                    expected_answer = parts[1]
-                    answer_type = parts[2] if len(parts) > 2 else "unknown"
-                    notes = parts[3] if len(parts) > 3 else ""
-                    
-                    expected_answers[query] = {
-                        "expected": expected_answer,
-                        "type": answer_type,
-                        "notes": notes
-                    }
+            lines = [line for line in f if line.strip() and not line.strip().startswith('#')]
+        
+        if PANDAS_AVAILABLE:
+            try:
+                expected_answers = _read_expected_answers_frame(lines)
+            except pd.errors.ParserError as e:
+                print(f"[WARN] pandas could not parse expected answers ({e}); using the line parser")
+                expected_answers = _parse_expected_answer_lines(lines)
+        else:
+            expected_answers = _parse_expected_answer_lines(lines)
         
+        _intern_answer_types(expected_answers)
+        _save_cached_expected_answers(answers_path, expected_answers)
         return expected_answers
     except Exception as e:
         print(f"[ERROR] Failed to load expected answers: {e}")
@@ -352,46 +622,38 @@ def verify_answer(answer: str, expected: str, answer_type: str) -> tuple[bool, l
     answer_lower = answer_clean.lower()
     expected_lower = expected_clean.lower()
     
-    # Exact match
+    # Exact match (no regex needed)
     if answer_lower == expected_lower:
         return True, []
     
-    # For numeric answers, try to extract and compare numbers
-    if answer_type in ["computation", "factual"] and any(c.isdigit() for c in expected_clean):
-        # Extract numbers from both
-        answer_nums = re.findall(r'\d+\.?\d*', answer_clean)
-        expected_nums = re.findall(r'\d+\.?\d*', expected_clean)
-        
-        if expected_nums:
-            expected_num = float(expected_nums[0])
-            if answer_nums:
-                answer_num = float(answer_nums[0])
-                # Allow small tolerance for floating point
-                if abs(answer_num - expected_num) < 0.01:
-                    return True, []
-                else:
-                    issues.append(f"Expected {expected_num}, got {answer_num}")
-            else:
-                issues.append(f"Expected numeric value {expected_num}, but answer contains no numbers")
-        else:
-            # Not a numeric answer type, do string comparison
-            if expected_lower in answer_lower or answer_lower in expected_lower:
+    # Extract numbers once; reused by the numeric and multi-value branches
+    answer_nums = _NUM_RE.findall(answer_clean)
+    expected_nums = _NUM_RE.findall(expected_clean)
+    
+    # For numeric answers, compare the first extracted numbers
+    if answer_type in ("computation", "factual") and expected_nums:
+        expected_num = float(expected_nums[0])
+        if answer_nums:
+            answer_num = float(answer_nums[0])
+            # Allow small tolerance for floating point
+            if abs(answer_num - expected_num) < 0.01:
                 return True, []
             else:
-                issues.append(f"Expected '{expected_clean}', got '{answer_clean}'")
+                issues.append(f"Expected {expected_num}, got {answer_num}")
+        else:
+            issues.append(f"Expected numeric value {expected_num}, but answer contains no numbers")
     
     # For complex queries, check if expected values are present
     elif "," in expected_clean:
-        # Multiple values expected (e.g., "120, 77, 6")
-        expected_parts = [p.strip() for p in expected_clean.split(',')]
-        answer_nums = re.findall(r'\d+\.?\d*', answer_clean)
-        
-        missing = []
-        for exp_part in expected_parts:
-            exp_num = re.findall(r'\d+\.?\d*', exp_part)
+        # Multiple values expected (e.g., "120, 77, 6") - first number of each part
+        expected_values = []
+        for exp_part in expected_clean.split(','):
+            exp_num = _NUM_RE.findall(exp_part)
             if exp_num:
-                if exp_num[0] not in answer_nums:
-                    missing.append(exp_num[0])
+                expected_values.append(exp_num[0])
+        
+        answer_set = set(answer_nums)
+        missing = [n for n in expected_values if n not in answer_set]
         
         if missing:
             issues.append(f"Missing expected values: {', '.join(missing)}")
@@ -408,39 +670,63 @@ def verify_answer(answer: str, expected: str, answer_type: str) -> tuple[bool, l
     return False, issues
 
 
-async def run_test_100_queries():
-    """Run 100 queries with compact logging."""
-    print("=" * 80)
+async def run_test_100_queries(concurrency: int = DEFAULT_CONCURRENCY, use_harness_cache: bool = DUPLICATE_CACHE_ENABLED):
+    """
+    Run 100 queries with compact logging.
+    
+    Queries run concurrently only between duplicate injection points: each duplicate
+    starts a new segment, and a segment does not start until every earlier query has
+    finished, so the original is already in memory when its duplicate runs.
+    
+    Args:
+        concurrency: Number of queries submitted to the agent loop at once (1 = sequential).
+            Above 1, each query's agent output is collected per task and printed with its
+            report, so HIL prompts only show there; use 1 to answer them interactively
+        use_harness_cache: If True, serve exact duplicate queries from a harness-level result
+            cache instead of re-running the agent (skips the memory-system test path)
+    """
+    with _task_stdout.installed():
+        await _run_test_100_queries(concurrency, use_harness_cache)
+
+
+async def _run_test_100_queries(concurrency: int, use_harness_cache: bool):
+    """Body of run_test_100_queries(), run with _TaskStdout installed as sys.stdout."""
+    concurrency = max(1, concurrency)
+    print(_EQ80)
     print("COMPACT TEST: 100 QUERIES WITH 5 DUPLICATES")
-    print("=" * 80)
+    print(_EQ80)
     print()
     
-    # Load expected answers
+    # Initialize (MultiMCP needs the parsed config before it can start)
+    print("[INIT] Loading MCP configuration...")
+    config_path = project_root / "config" / "mcp_server_config.yaml"
+    config = await asyncio.to_thread(_load_mcp_config, config_path)
+    mcp_configs = config.get('mcp_servers', [])
+    multi_mcp = MultiMCP(mcp_configs)
+    
+    # Load expected answers on a worker thread while the MCP servers start up
     print("[INIT] Loading expected answers...")
-    expected_answers = load_expected_answers()
+    _, expected_answers = await asyncio.gather(
+        multi_mcp.initialize(),
+        asyncio.to_thread(load_expected_answers),
+    )
     if not expected_answers:
         print("[WARN] No expected answers loaded. Validation will be limited.")
     else:
         print(f"[OK] Loaded {len(expected_answers)} expected answers for verification\n")
     
-    # Initialize
-    print("[INIT] Loading MCP configuration...")
-    config_path = project_root / "config" / "mcp_server_config.yaml"
-    with open(config_path, 'r') as f:
-        config = yaml.safe_load(f)
-    mcp_configs = config.get('mcp_servers', [])
-    multi_mcp = MultiMCP(mcp_configs)
-    await multi_mcp.initialize()
-    
     print("[INIT] Initializing Agent Loop...")
     perception_prompt = project_root / "prompts" / "perception_prompt.txt"
     decision_prompt = project_root / "prompts" / "decision_prompt.txt"
     
+    # Without the harness cache, duplicates must reach the agent's memory path, so the
+    # agent's own answer cache is turned off as well
     loop = AgentLoop(
         str(perception_prompt),
         str(decision_prompt),
         multi_mcp,
-        strategy="exploratory"
+        strategy="exploratory",
+        answer_cache_ttl=None if use_harness_cache else 0
     )
     
     csv_manager = CSVManager()
@@ -448,306 +734,408 @@ async def run_test_100_queries():
     # Get test queries
     queries = create_test_queries()
     
-    # Results tracking
-    results = []
-    start_time = time.perf_counter()
-    duplicate_results = []
+    # Results tracking (pre-sized: one slot per query, row = idx - 1)
+    total = len(queries)
+    results = [None] * total
+    start_ns = time.perf_counter_ns()
+    duplicate_results = [None] * sum(1 for q in queries if q.get('is_duplicate'))
+    dup_slot = 0
+    
+    # Per-query summary columns (row = idx - 1), aggregated with numpy at the end
+    category_index = {cat: i for i, cat in enumerate(CANONICAL_CATEGORIES)}
+    elapsed_ns_arr = np.zeros(total, dtype=np.int64)
+    success_arr = np.zeros(total, dtype=np.bool_)
+    duplicate_arr = np.zeros(total, dtype=np.bool_)
+    correct_arr = np.full(total, -1, dtype=np.int8)  # -1 = not validated, 0 = wrong, 1 = correct
+    hil_arr = np.zeros(total, dtype=np.bool_)
+    category_arr = np.zeros(total, dtype=np.int8)
+    
+    # Expected answer entry per row, resolved once up front so the reporter never hashes query text
+    expected_by_row = [expected_answers.get(q['query']) for q in queries]
     
     print()
-    print("=" * 80)
+    print(_EQ80)
     print("EXECUTING QUERIES")
-    print("=" * 80)
+    print(_EQ80)
     print()
     
-    # Process each query
-    for idx, query_info in enumerate(queries, 1):
-        query_id = query_info['id']
-        query = query_info['query']
-        category = query_info['category']
-        is_duplicate = query_info.get('is_duplicate', False)
-        original_id = query_info.get('original_id', None)
-        
-        # Print query header
-        if is_duplicate:
-            print(f"TEST {idx}/105: {category.upper()} (DUPLICATE - Original: Test {original_id})")
-        else:
-            print(f"TEST {idx}/105: {category.upper()}")
-        print("-" * 80)
-        print(f"Query: {query}")
-        if is_duplicate:
-            print(f"[MEMORY TEST] This is a DUPLICATE query - should use memory from Test {original_id}")
-        print()
-        
-        query_start = time.perf_counter()
+    run_cache = _RunCache() if use_harness_cache else None
+    
+    async def _process_one(idx: int, query_info: dict) -> dict:
+        """Run a single query through the agent loop and capture its outcome (no printing/CSV)."""
+        query_start_ns = time.perf_counter_ns()
         query_start_datetime = datetime.now()
-        execution_details = {}  # Initialize in case of error
+        outcome = {
+            "idx": idx,
+            "query_info": query_info,
+            "answer": "ERROR",
+            "execution_details": {},  # Initialize in case of error
+            "error": None,
+            "cache_hit": False,
+            "start_datetime": query_start_datetime,
+            "output": "",
+        }
         
+        # With several queries in flight, the agent's own output is held back and printed with
+        # the query's report; a single worker prints it live (e.g. for interactive HIL prompts)
+        output = io.StringIO(newline='') if concurrency > 1 else None
+        token = _output_buffer.set(output)
         try:
             # Run agent loop with execution details
-            result = await loop.run(query, return_execution_details=True)
+            query = query_info['query']
+            is_duplicate = query_info.get('is_duplicate', False)
+            result = run_cache.get(query) if run_cache is not None and is_duplicate else None
+            if result is not None:
+                outcome["cache_hit"] = True
+            else:
+                result = await loop.run(query, return_execution_details=True, memory_hint=is_duplicate)
+                if run_cache is not None:
+                    run_cache.put(query, result)
             
             # agent_loop.run() with return_execution_details=True returns the execution_details dict directly
             # (not wrapped in {'answer': ..., 'execution_details': ...})
             if isinstance(result, dict):
                 # Check if it's the execution_details dict (has 'answer' key) or wrapped format
                 if 'answer' in result:
-                    answer = result.get('answer', 'N/A')
-                    execution_details = result  # The dict itself is execution_details
+                    outcome["answer"] = result.get('answer', 'N/A')
+                    outcome["execution_details"] = result  # The dict itself is execution_details
                 else:
                     # Wrapped format (shouldn't happen, but handle it)
-                    answer = result.get('answer', 'N/A')
-                    execution_details = result.get('execution_details', {})
+                    outcome["answer"] = result.get('answer', 'N/A')
+                    outcome["execution_details"] = result.get('execution_details', {})
             else:
-                answer = result
-                execution_details = {}
+                outcome["answer"] = result
+        except Exception as e:
+            outcome["error"] = str(e)[:100]
+        finally:
+            _output_buffer.reset(token)
+        if output is not None:
+            outcome["output"] = output.getvalue()
+        
+        outcome["elapsed_ns"] = time.perf_counter_ns() - query_start_ns
+        outcome["end_datetime"] = datetime.now()
+        return outcome
+    
+    # Two-stage pipeline: `concurrency` agent workers feed outcomes into a queue, and the
+    # reporting stage below prints/validates/logs them strictly in query order (by idx).
+    in_q: asyncio.Queue = asyncio.Queue()
+    out_q: asyncio.Queue = asyncio.Queue()
+    for numbered in enumerate(queries, 1):
+        in_q.put_nowait(numbered)
+    
+    # Segments: a new one starts at each duplicate query; segment k waits for segment k-1
+    segment_of = {}
+    segment_sizes = []
+    for idx, query_info in enumerate(queries, 1):
+        if query_info.get('is_duplicate') or not segment_sizes:
+            segment_sizes.append(0)
+        segment_of[idx] = len(segment_sizes) - 1
+        segment_sizes[-1] += 1
+    segment_done = [asyncio.Event() for _ in segment_sizes]
+    
+    async def _agent_stage():
+        """Pull queries off in_q, run them, and push outcomes to out_q until in_q is drained."""
+        next_allowed = 0.0
+        while not in_q.empty():
+            idx, query_info = in_q.get_nowait()
+            segment = segment_of[idx]
+            if segment > 0:
+                await segment_done[segment - 1].wait()
+            # Rate limit: only wait for whatever is left of the gap since this worker's last run
+            delay = next_allowed - time.monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            outcome = await _process_one(idx, query_info)
+            if not outcome["cache_hit"]:  # cache hits make no API calls
+                next_allowed = time.monotonic() + RATE_LIMIT_S
+            segment_sizes[segment] -= 1
+            if segment_sizes[segment] == 0:
+                segment_done[segment].set()
+            await out_q.put(outcome)
+    
+    workers = [asyncio.create_task(_agent_stage()) for _ in range(min(concurrency, total))]
+    
+    pending = {}
+    next_idx = 1
+    while next_idx <= total:
+        outcome = await out_q.get()
+        pending[outcome["idx"]] = outcome
+        
+        while next_idx in pending:
+            outcome = pending.pop(next_idx)
+            next_idx += 1
             
-            # Check for Human-in-Loop triggers
-            hil_triggered = execution_details.get('human_in_loop_triggered', False)
-            hil_reason = execution_details.get('hil_reason', '')
-            if hil_triggered:
-                print(f"[HIL] Human-in-Loop was triggered: {hil_reason}")
+            idx = outcome["idx"]
+            query_info = outcome["query_info"]
+            query_id = query_info['id']
+            query = query_info['query']
+            category = query_info['category']
+            is_duplicate = query_info.get('is_duplicate', False)
+            original_id = query_info.get('original_id', None)
+            row = idx - 1
+            exp_entry = expected_by_row[row]  # reused for validation/CSV/results
+            answer = outcome["answer"]
+            execution_details = outcome["execution_details"]
+            elapsed_ns = outcome["elapsed_ns"]
+            query_elapsed = elapsed_ns / 1e9  # seconds, for printing/CSV only
+            query_start_datetime = outcome["start_datetime"]
+            query_end_datetime = outcome["end_datetime"]
             
-            query_elapsed = time.perf_counter() - query_start
+            elapsed_ns_arr[row] = elapsed_ns
+            success_arr[row] = outcome["error"] is None
+            duplicate_arr[row] = is_duplicate
+            category_arr[row] = category_index[category]
             
-            # Compact step logging - extract from context if available
-            print_step_header("Memory Search", query_id)
-            # Memory results are not directly in execution_details, but we can check if memory was used
-            # by checking if answer matches a previous answer pattern
-            print("Searching session logs...")
+            with _QueryLogger():
+                # Print query header
+                if is_duplicate:
+                    print(f"TEST {idx}/{total}: {category.upper()} (DUPLICATE - Original: Test {original_id})")
+                else:
+                    print(f"TEST {idx}/{total}: {category.upper()}")
+                print(_DASH80)
+                print(f"Query: {query}")
+                if is_duplicate:
+                    print(f"[MEMORY TEST] This is a DUPLICATE query - should use memory from Test {original_id}")
+                    if outcome["cache_hit"]:
+                        print("[CACHE] Answer served from the harness duplicate cache (agent not re-run)")
+                print()
+                sys.stdout.write(outcome["output"])
             
-            print_step_header("Perception", query_id)
-            # Perception happens internally, we show it happened
-            print("Analyzing query intent...")
+                if outcome["error"] is None:
+                    # Check for Human-in-Loop triggers
+                    hil_triggered = execution_details.get('human_in_loop_triggered', False)
+                    hil_reason = execution_details.get('hil_reason', '')
+                    hil_arr[row] = hil_triggered
+                    if hil_triggered:
+                        print(f"[HIL] Human-in-Loop was triggered: {hil_reason}")
             
-            print_step_header("Decision", query_id)
-            plan_steps = execution_details.get('plan_steps', [])
-            if plan_steps:
-                step_count = len(plan_steps)
-                print(f"Generated {step_count} step plan")
-            else:
-                print("Plan generated")
+                    # Compact step logging - extract from context if available
+                    # Memory results are not directly in execution_details, but we can check if memory was used
+                    # by checking if answer matches a previous answer pattern
+                    log_step("Memory Search", "Searching session logs...")
             
-            print_step_header("PlanGraph", query_id)
-            nodes_called = execution_details.get('nodes_called', [])
-            nodes_path = execution_details.get('nodes_exe_path', '')
-            node_count = len(nodes_called) if nodes_called else len(plan_steps)
-            if node_count > 0:
-                print(f"{node_count} node(s) | Path: {nodes_path}")
-            else:
-                print("Graph structure created")
+                    # Perception happens internally, we show it happened
+                    log_step("Perception", "Analyzing query intent...")
+            
+                    plan_steps = execution_details.get('plan_steps') or []
+                    if plan_steps:
+                        log_step("Decision", "Generated %d step plan", len(plan_steps))
+                    else:
+                        log_step("Decision", "Plan generated")
+            
+                    nodes_called = execution_details.get('nodes_called', [])
+                    nodes_path = execution_details.get('nodes_exe_path', '')
+                    node_count = len(nodes_called) if nodes_called else len(plan_steps)
+                    if node_count > 0:
+                        log_step("PlanGraph", "%d node(s) | Path: %s", node_count, nodes_path)
+                    else:
+                        log_step("PlanGraph", "Graph structure created")
             
-            print_step_header("Execution", query_id)
-            tools_used = execution_details.get('tools_used', [])
-            unique_tools = len(set(tools_used)) if tools_used else 0
-            print(f"Executed {len(plan_steps)} step(s) | Tools: {unique_tools}")
+                    tools_used = execution_details.get('tools_used') or []
+                    unique_tools = len(dict.fromkeys(tools_used)) if tools_used else 0
+                    log_step("Execution", "Executed %d step(s) | Tools: %d", len(plan_steps), unique_tools)
             
-            print_step_header("Summary", query_id)
-            print("Formatting final answer...")
+                    log_step("Summary", "Formatting final answer...")
             
-            print_step_header("Final Answer", query_id)
-            answer_preview = answer[:80] + "..." if len(answer) > 80 else answer
-            print(f"'{answer_preview}'")
+                    answer_preview = _preview(answer, 80)
+                    log_step("Final Answer", "'%s'", answer_preview, level=logging.INFO)
             
-            # Validate answer using expected answers
-            is_correct = None
-            validation_notes = []
-            if query in expected_answers:
-                expected_data = expected_answers[query]
-                expected_answer = expected_data["expected"]
-                expected_type = expected_data.get("type", "unknown")
+                    # Validate answer using expected answers
+                    is_correct = None
+                    validation_notes = []
+                    if exp_entry is not None:
+                        expected_answer = exp_entry["expected"]
+                        expected_type = exp_entry.get("type", "unknown")
                 
-                # Verify answer
-                is_correct, issues = verify_answer(answer, expected_answer, expected_type)
+                        # Verify answer
+                        is_correct, issues = verify_answer(answer, expected_answer, expected_type)
+                        correct_arr[row] = is_correct
                 
-                if is_correct:
-                    print(f"[VALIDATION] ✓ Answer matches expected: '{expected_answer}'")
-                else:
-                    print(f"[VALIDATION] ✗ Answer does not match expected: '{expected_answer}'")
-                    if issues:
-                        print(f"[VALIDATION] Issues: {', '.join(issues)}")
-                    validation_notes = issues
+                        if is_correct:
+                            print(f"[VALIDATION] ✓ Answer matches expected: '{expected_answer}'")
+                        else:
+                            print(f"[VALIDATION] ✗ Answer does not match expected: '{expected_answer}'")
+                            if issues:
+                                print(f"[VALIDATION] Issues: {', '.join(issues)}")
+                            validation_notes = issues
             
-            # Display HIL status if triggered
-            if hil_triggered:
-                print(f"[HIL] Human-in-Loop was triggered: {hil_reason}")
+                    # Display HIL status if triggered
+                    if hil_triggered:
+                        print(f"[HIL] Human-in-Loop was triggered: {hil_reason}")
             
-            if is_duplicate:
-                print(f"[MEMORY USAGE] Duplicate query - Original was Test {original_id}")
+                    if is_duplicate:
+                        print(f"[MEMORY USAGE] Duplicate query - Original was Test {original_id}")
             
-            # Derive statuses for CSV:
-            # Result_Status  → high-level pipeline outcome (success / failed / error)
-            # Actual_Status  → per-query correctness (success / mismatch / warning / error)
-            result_status = "success"      # pipeline completed without exception
-            actual_status = "success"      # default correctness classification
-            if is_correct is False:
-                actual_status = "mismatch"
-            elif is_correct is None and validation_notes:
-                actual_status = "warning"
-
-            # Log to CSV
-            # Extract tool_name from execution_details (first tool used, or "agent_loop" if none)
-            tools_used_list = execution_details.get('tools_used', [])
-            tool_name = tools_used_list[0] if tools_used_list else execution_details.get('tool_name', 'agent_loop')
+                    # Derive statuses for CSV:
+                    # Result_Status  → high-level pipeline outcome (success / failed / error)
+                    # Actual_Status  → per-query correctness (success / mismatch / warning / error)
+                    result_status = "success"      # pipeline completed without exception
+                    actual_status = "success"      # default correctness classification
+                    if is_correct is False:
+                        actual_status = "mismatch"
+                    elif is_correct is None and validation_notes:
+                        actual_status = "warning"
+
+                    # Log to CSV
+                    # Extract tool_name from execution_details (first tool used, or "agent_loop" if none)
+                    tool_name = tools_used[0] if tools_used else execution_details.get('tool_name', 'agent_loop')
             
-            # Extract nodes data - agent_loop returns nodes_called_json, but not nodes_compact or node_count
-            # These will be calculated by CSVManager if not provided
-            nodes_called_json = execution_details.get('nodes_called_json', [])
-            if isinstance(nodes_called_json, list):
-                # Convert list to JSON string if needed
-                import json
-                nodes_called_json = json.dumps(nodes_called_json)
+                    # Extract nodes data - agent_loop returns nodes_called_json, but not nodes_compact or node_count
+                    # These will be calculated by CSVManager if not provided
+                    nodes_called_json = execution_details.get('nodes_called_json') or []
+                    if isinstance(nodes_called_json, list):
+                        # Convert list to JSON string if needed
+                        nodes_called_json = _json_dumps_compact(nodes_called_json)
             
-            # Get expected answer if available
-            expected_answer = expected_answers.get(query, {}).get("expected", "") if query in expected_answers else ""
+                    # Get expected answer if available
+                    expected_answer = exp_entry["expected"] if exp_entry else ""
             
-            csv_manager.log_tool_performance(
-                query_id=query_id,
-                plan_used=execution_details.get('plan_steps', []),
-                plan_step_count=len(execution_details.get('plan_steps', [])),
-                query_name=f"Test {query_id} - {category}" + (" (DUPLICATE)" if is_duplicate else ""),
-                query_text=query,
-                query_answer=answer,
-                correct_answer_expected=expected_answer,
-                result_status=result_status,
-                actual_status=actual_status,
-                elapsed_time=query_elapsed,
-                tool_name=tool_name,
-                retry_count=0,  # Not tracked in execution_details, default to 0
-                api_call_type=execution_details.get('api_call_type', ''),
-                llm_provider=execution_details.get('llm_provider', ''),
-                step_details=execution_details.get('step_details', ''),
-                nodes_called=nodes_called_json,  # Pass as JSON string or list (CSVManager will handle it)
-                nodes_compact="",  # Will be calculated by CSVManager from nodes_called and step_details
-                node_count=0,  # Will be calculated by CSVManager from nodes_called
-                nodes_exe_path=execution_details.get('nodes_exe_path', ''),
-                final_state=execution_details.get('final_state', {}),
-                start_datetime=query_start_datetime.strftime("%Y-%m-%d %H:%M:%S"),
-                end_datetime=datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
-                error_message=""
-            )
+                    csv_manager.log_tool_performance_buffered(
+                        query_id=query_id,
+                        plan_used=plan_steps,
+                        plan_step_count=len(plan_steps),
+                        query_name=f"Test {query_id} - {category}" + (" (DUPLICATE)" if is_duplicate else ""),
+                        query_text=query,
+                        query_answer=answer,
+                        correct_answer_expected=expected_answer,
+                        result_status=result_status,
+                        actual_status=actual_status,
+                        elapsed_time=query_elapsed,
+                        tool_name=tool_name,
+                        retry_count=0,  # Not tracked in execution_details, default to 0
+                        api_call_type=execution_details.get('api_call_type', ''),
+                        llm_provider=execution_details.get('llm_provider', ''),
+                        step_details=execution_details.get('step_details', ''),
+                        nodes_called=nodes_called_json,  # Pass as JSON string or list (CSVManager will handle it)
+                        nodes_compact="",  # Will be calculated by CSVManager from nodes_called and step_details
+                        node_count=0,  # Will be calculated by CSVManager from nodes_called
+                        nodes_exe_path=execution_details.get('nodes_exe_path', ''),
+                        final_state=execution_details.get('final_state', {}),
+                        start_datetime=_fast_ts(query_start_datetime),
+                        end_datetime=_fast_ts(query_end_datetime),
+                        error_message=""
+                    )
             
-            result_entry = {
-                "id": query_id,
-                "query": query,
-                "category": category,
-                "answer": answer,
-                "expected_answer": expected_answers.get(query, {}).get("expected", "N/A"),
-                "is_correct": is_correct,
-                "validation_notes": validation_notes,
-                "status": "success",
-                "elapsed": query_elapsed,
-                "is_duplicate": is_duplicate,
-                "original_id": original_id,
-                "hil_triggered": hil_triggered,
-                "hil_reason": hil_reason
-            }
-            
-            results.append(result_entry)
+                    result_entry = ResultEntry(
+                        id=query_id,
+                        query=query,
+                        category=category,
+                        answer=answer,
+                        expected_answer=exp_entry.get("expected", "N/A") if exp_entry else "N/A",
+                        is_correct=is_correct,
+                        validation_notes=validation_notes,
+                        status="success",
+                        elapsed=query_elapsed,
+                        is_duplicate=is_duplicate,
+                        original_id=original_id,
+                        hil_triggered=hil_triggered,
+                        hil_reason=hil_reason
+                    )
             
-            if is_duplicate:
-                duplicate_results.append(result_entry)
+                    results[row] = result_entry
             
-        except Exception as e:
-            query_elapsed = time.perf_counter() - query_start
-            error_msg = str(e)[:100]
+                    if is_duplicate:
+                        duplicate_results[dup_slot] = result_entry
+                        dup_slot += 1
+                else:
+                    error_msg = outcome["error"]
             
-            print_step_header("ERROR", query_id)
-            print(f"{error_msg}")
+                    log_step("ERROR", "%s", error_msg, level=logging.INFO)
             
-            result_entry = {
-                "id": query_id,
-                "query": query,
-                "category": category,
-                "answer": "ERROR",
-                "status": "error",
-                "elapsed": query_elapsed,
-                "error": error_msg,
-                "is_duplicate": is_duplicate,
-                "original_id": original_id
-            }
+                    result_entry = ResultEntry(
+                        id=query_id,
+                        query=query,
+                        category=category,
+                        answer="ERROR",
+                        status="error",
+                        elapsed=query_elapsed,
+                        error=error_msg,
+                        is_duplicate=is_duplicate,
+                        original_id=original_id
+                    )
             
-            results.append(result_entry)
+                    results[row] = result_entry
             
-            if is_duplicate:
-                duplicate_results.append(result_entry)
+                    if is_duplicate:
+                        duplicate_results[dup_slot] = result_entry
+                        dup_slot += 1
             
-            # Log error to CSV
-            try:
-                # Extract tool_name if execution_details available (might be empty on error)
-                tools_used_list = execution_details.get('tools_used', []) if execution_details else []
-                tool_name = tools_used_list[0] if tools_used_list else (execution_details.get('tool_name', '') if execution_details else '')
+                    # Log error to CSV
+                    try:
+                        # execution_details might be empty (or None) on error; bind the lookups once
+                        details = execution_details or {}
+                        plan_steps = details.get('plan_steps') or []
+                        tools_used = details.get('tools_used') or []
+                        tool_name = tools_used[0] if tools_used else details.get('tool_name', '')
                 
-                # Get expected answer if available
-                expected_answer = expected_answers.get(query, {}).get("expected", "") if query in expected_answers else ""
+                        # Get expected answer if available
+                        expected_answer = exp_entry["expected"] if exp_entry else ""
                 
-                csv_manager.log_tool_performance(
-                    query_id=query_id,
-                    plan_used=execution_details.get('plan_steps', []) if execution_details else [],
-                    plan_step_count=len(execution_details.get('plan_steps', [])) if execution_details else 0,
-                    query_name=f"Test {query_id} - {category}" + (" (DUPLICATE)" if is_duplicate else ""),
-                    query_text=query,
-                    query_answer="ERROR",
-                    correct_answer_expected=expected_answer,
-                    result_status="failed",
-                    actual_status="error",
-                    elapsed_time=query_elapsed,
-                    tool_name=tool_name,
-                    retry_count=0,
-                    error_message=error_msg,
-                    api_call_type=execution_details.get('api_call_type', '') if execution_details else '',
-                    llm_provider=execution_details.get('llm_provider', '') if execution_details else '',
-                    step_details=execution_details.get('step_details', '') if execution_details else '',
-                    nodes_called=execution_details.get('nodes_called_json', []) if execution_details else [],
-                    nodes_compact=execution_details.get('nodes_compact', '') if execution_details else '',
-                    node_count=execution_details.get('node_count', 0) if execution_details else 0,
-                    nodes_exe_path=execution_details.get('nodes_exe_path', '') if execution_details else '',
-                    final_state=execution_details.get('final_state', {}) if execution_details else {},
-                    start_datetime=query_start_datetime.strftime("%Y-%m-%d %H:%M:%S"),
-                    end_datetime=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-                )
-            except Exception as csv_error:
-                print(f"⚠ Warning: Could not log error to CSV: {csv_error}")
+                        csv_manager.log_tool_performance_buffered(
+                            query_id=query_id,
+                            plan_used=plan_steps,
+                            plan_step_count=len(plan_steps),
+                            query_name=f"Test {query_id} - {category}" + (" (DUPLICATE)" if is_duplicate else ""),
+                            query_text=query,
+                            query_answer="ERROR",
+                            correct_answer_expected=expected_answer,
+                            result_status="failed",
+                            actual_status="error",
+                            elapsed_time=query_elapsed,
+                            tool_name=tool_name,
+                            retry_count=0,
+                            error_message=error_msg,
+                            api_call_type=details.get('api_call_type', ''),
+                            llm_provider=details.get('llm_provider', ''),
+                            step_details=details.get('step_details', ''),
+                            nodes_called=details.get('nodes_called_json') or [],
+                            nodes_compact=details.get('nodes_compact', ''),
+                            node_count=details.get('node_count', 0),
+                            nodes_exe_path=details.get('nodes_exe_path', ''),
+                            final_state=details.get('final_state', {}),
+                            start_datetime=_fast_ts(query_start_datetime),
+                            end_datetime=_fast_ts(query_end_datetime)
+                        )
+                    except Exception as csv_error:
+                        print(f"⚠ Warning: Could not log error to CSV: {csv_error}")
         
-        print()
+                print()
         
-        # Small delay between queries to avoid rate limiting
-        if idx < len(queries):
-            await asyncio.sleep(2)
+    await asyncio.gather(*workers)
     
-    total_elapsed = time.perf_counter() - start_time
+    # Write queued CSV rows and close the log file (nothing is logged after this point)
+    csv_manager.close()
+    sys.stdout.flush()
+    
+    total_elapsed = (time.perf_counter_ns() - start_ns) / 1e9
     
     # Final Stats
     print()
-    print("=" * 80)
+    print(_EQ80)
     print("FINAL STATISTICS")
-    print("=" * 80)
+    print(_EQ80)
     print()
     
-    successful = sum(1 for r in results if r['status'] == 'success')
-    errors = sum(1 for r in results if r['status'] == 'error')
-    avg_time = sum(r['elapsed'] for r in results) / len(results) if results else 0
+    successful = int(success_arr.sum())
+    errors = total - successful
+    avg_time = elapsed_ns_arr.sum() / total / 1e9 if total else 0
     
     # Count Human-in-Loop triggers
-    hil_count = sum(1 for r in results if r.get('hil_triggered', False))
+    hil_count = int(hil_arr.sum())
     
     # Answer Accuracy (vs Expected Answers)
-    correct_answers = 0
-    total_with_expected = 0
-    validation_issues = []
-    
-    for r in results:
-        if r.get("is_correct") is not None:
-            total_with_expected += 1
-            if r.get("is_correct"):
-                correct_answers += 1
-            else:
-                validation_issues.append({
-                    "id": r["id"],
-                    "query": r["query"][:50],
-                    "expected": r.get("expected_answer", "N/A"),
-                    "got": r["answer"][:50],
-                    "notes": r.get("validation_notes", [])
-                })
+    total_with_expected = int((correct_arr >= 0).sum())
+    correct_answers = int((correct_arr == 1).sum())
+    validation_issues = [
+        {
+            "id": r.id,
+            "query": r.query[:50],
+            "expected": r.expected_answer,
+            "got": r.answer[:50],
+            "notes": r.validation_notes
+        }
+        for r in (results[row] for row in np.flatnonzero(correct_arr == 0))
+    ]
     
     print(f"Total Queries: {len(results)}")
     print(f"  Successful: {successful}")
@@ -768,9 +1156,10 @@ async def run_test_100_queries():
     
     # Duplicate query statistics
     if duplicate_results:
-        dup_successful = sum(1 for r in duplicate_results if r['status'] == 'success')
-        dup_errors = sum(1 for r in duplicate_results if r['status'] == 'error')
-        dup_avg_time = sum(r['elapsed'] for r in duplicate_results) / len(duplicate_results) if duplicate_results else 0
+        dup_successful = int(success_arr[duplicate_arr].sum())
+        dup_errors = int(duplicate_arr.sum()) - dup_successful
+        dup_elapsed_ns = elapsed_ns_arr[duplicate_arr]
+        dup_avg_time = dup_elapsed_ns.sum() / len(dup_elapsed_ns) / 1e9
         
         print("Duplicate Query Statistics (Memory Tests):")
         print(f"  Total Duplicates: {len(duplicate_results)}")
@@ -781,17 +1170,13 @@ async def run_test_100_queries():
     
     # Category breakdown
     categories = {}
-    for r in results:
-        cat = r['category']
-        if cat not in categories:
-            categories[cat] = {'total': 0, 'success': 0}
-        categories[cat]['total'] += 1
-        if r['status'] == 'success':
-            categories[cat]['success'] += 1
+    for cat, cat_idx in category_index.items():
+        mask = category_arr == cat_idx
+        categories[cat] = {'total': int(mask.sum()), 'success': int(success_arr[mask].sum())}
     
     if categories:
         print("Category Breakdown:")
-        for cat, stats in sorted(categories.items()):
+        for cat, stats in categories.items():  # already in CANONICAL_CATEGORIES order
             success_rate = (stats['success'] / stats['total'] * 100) if stats['total'] > 0 else 0
             print(f"  {cat}: {stats['success']}/{stats['total']} ({success_rate:.1f}%)")
         print()
@@ -823,19 +1208,35 @@ async def run_test_100_queries():
     # Quick answer preview (first 10)
     print("Answer Preview (First 10):")
     for r in results[:10]:
-        answer_preview = r['answer'][:60] + "..." if len(r['answer']) > 60 else r['answer']
-        dup_marker = " [DUPLICATE]" if r.get('is_duplicate') else ""
-        print(f"  [{r['id']}] {r['category']}{dup_marker}: {answer_preview}")
+        answer_preview = r.answer if r.answer_len <= 60 else f"{r.answer[:60]}..."
+        dup_marker = " [DUPLICATE]" if r.is_duplicate else ""
+        print(f"  [{r.id}] {r.category}{dup_marker}: {answer_preview}")
     
     if len(results) > 10:
         print(f"  ... and {len(results) - 10} more")
     
     print()
-    print("=" * 80)
+    print(_EQ80)
     print("TEST COMPLETE")
-    print("=" * 80)
+    print(_EQ80)
 
 
 if __name__ == "__main__":
-    asyncio.run(run_test_100_queries())
+    parser = argparse.ArgumentParser(description="Run 100 queries with 5 duplicates through the agent loop")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY,
+                        help="Number of queries to run concurrently between duplicate boundaries "
+                             f"(default: CONCURRENCY env var or 5, currently {DEFAULT_CONCURRENCY})")
+    parser.add_argument("--no-duplicate-cache", action="store_true",
+                        help="Re-run exact duplicate queries through the agent (exercises the memory "
+                             "system) instead of serving them from the harness result cache; "
+                             "same as DISABLE_DUPLICATE_CACHE=1")
+    parser.add_argument("--verbose", action="store_true",
+                        help="Show per-step progress lines (DEBUG logging)")
+    args = parser.parse_args()
+    if args.verbose:
+        logger.setLevel(logging.DEBUG)
+    asyncio.run(run_test_100_queries(
+        concurrency=args.concurrency,
+        use_harness_cache=DUPLICATE_CACHE_ENABLED and not args.no_duplicate_cache
+    ))
 
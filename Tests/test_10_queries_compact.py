@@ -5,7 +5,12 @@ Final stats summary at the end.
 """
 
 import asyncio
+import io
+import json
 import time
+from collections import Counter
+from contextlib import redirect_stdout
+from functools import partial
 from pathlib import Path
 import sys
 
@@ -18,6 +23,40 @@ from agent.agent_loop import AgentLoop
 from utils.csv_manager import CSVManager
 import yaml
 
+# Bound once at import; compact separators keep the Nodes_Called CSV cell small
+_json_dumps_compact = partial(json.dumps, separators=(',', ':'), ensure_ascii=False)
+
+# Minimum gap (seconds) between the end of one agent run and the start of the next
+RATE_LIMIT_S = 2.0
+
+
+def _preview(s: str, n: int = 60) -> str:
+    """Return s, or its first n characters followed by "..." when it is longer."""
+    return s if len(s) <= n else f"{s[:n]}..."
+
+
+class _QueryOutput:
+    """
+    Collects one query's printed report into a StringIO buffer.
+    
+    On exit the report is emitted with a single write instead of one per print(). It is only
+    flushed right away on an interactive terminal; redirected runs leave it to the block-buffered
+    stdout.
+    """
+    
+    def __enter__(self):
+        self._buf = io.StringIO(newline='')
+        self._redirect = redirect_stdout(self._buf)
+        self._redirect.__enter__()
+        return self._buf
+    
+    def __exit__(self, exc_type, exc, tb):
+        self._redirect.__exit__(exc_type, exc, tb)
+        sys.stdout.write(self._buf.getvalue())
+        if exc_type is not None or sys.stdout.isatty():
+            sys.stdout.flush()
+        return False
+
 
 def create_test_queries():
     """Create 10 diverse test queries."""
@@ -85,6 +124,10 @@ def create_test_queries():
     ]
 
 
+# Every category used by create_test_queries(), sorted once so the report needs no per-run sort
+CANONICAL_CATEGORIES = tuple(sorted({q["category"] for q in create_test_queries()}))
+
+
 def print_step_header(step_name: str, query_id: int):
     """Print compact step header."""
     print(f"  [{step_name}]", end=" ")
@@ -169,9 +212,9 @@ async def run_test_10_queries():
     # Get test queries
     queries = create_test_queries()
     
-    # Results tracking
-    results = []
-    start_time = time.perf_counter()
+    # Results tracking (pre-sized: one slot per query)
+    results = [None] * len(queries)
+    start_ns = time.perf_counter_ns()
     
     print()
     print("=" * 80)
@@ -179,8 +222,13 @@ async def run_test_10_queries():
     print("=" * 80)
     print()
     
-    # Process each query
+    # Process each query; printing/CSV work for a query overlaps its rate-limit gap
+    next_allowed = 0.0
     for idx, query_info in enumerate(queries, 1):
+        delay = next_allowed - time.monotonic()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        
         query_id = query_info['id']
         query = query_info['query']
         category = query_info['category']
@@ -190,7 +238,7 @@ async def run_test_10_queries():
         print(f"Query: {query}")
         print()
         
-        query_start = time.perf_counter()
+        query_start_ns = time.perf_counter_ns()
         
         try:
             # Run agent loop with execution details
@@ -211,134 +259,138 @@ async def run_test_10_queries():
                 answer = result
                 execution_details = {}
             
-            query_elapsed = time.perf_counter() - query_start
-            
-            # Compact step logging - extract from context if available
-            # Note: execution_details may not have all fields, so we log what we can see
+            elapsed_ns = time.perf_counter_ns() - query_start_ns
+            query_elapsed = elapsed_ns / 1e9  # seconds, for printing/CSV only
+            next_allowed = time.monotonic() + RATE_LIMIT_S
             
-            print_step_header("Memory Search", query_id)
-            # Memory results are not directly in execution_details, but we can check if memory was used
-            # by checking if answer matches a previous answer pattern
-            print("Searching session logs...")
+            with _QueryOutput():
+                # Compact step logging - extract from context if available
+                # Note: execution_details may not have all fields, so we log what we can see
             
-            print_step_header("Perception", query_id)
-            # Perception happens internally, we show it happened
-            print("Analyzing query intent...")
-            
-            print_step_header("Decision", query_id)
-            plan_steps = execution_details.get('plan_steps', [])
-            if plan_steps:
-                step_count = len(plan_steps)
-                print(f"Generated {step_count} step plan")
-            else:
-                print("Plan generated")
-            
-            print_step_header("PlanGraph", query_id)
-            nodes_called = execution_details.get('nodes_called', [])
-            nodes_path = execution_details.get('nodes_exe_path', '')
-            node_count = len(nodes_called) if nodes_called else len(plan_steps)
-            if node_count > 0:
-                print(f"{node_count} node(s) | Path: {nodes_path}")
-            else:
-                print("Graph structure created")
+                print_step_header("Memory Search", query_id)
+                # Memory results are not directly in execution_details, but we can check if memory was used
+                # by checking if answer matches a previous answer pattern
+                print("Searching session logs...")
             
-            print_step_header("Execution", query_id)
-            tools_used = execution_details.get('tools_used', [])
-            unique_tools = len(set(tools_used)) if tools_used else 0
-            print(f"Executed {len(plan_steps)} step(s) | Tools: {unique_tools}")
+                print_step_header("Perception", query_id)
+                # Perception happens internally, we show it happened
+                print("Analyzing query intent...")
             
-            print_step_header("Summary", query_id)
-            print("Formatting final answer...")
-            
-            print_step_header("Final Answer", query_id)
-            answer_preview = answer[:80] + "..." if len(answer) > 80 else answer
-            print(f"'{answer_preview}'")
+                print_step_header("Decision", query_id)
+                plan_steps = execution_details.get('plan_steps') or []
+                if plan_steps:
+                    step_count = len(plan_steps)
+                    print(f"Generated {step_count} step plan")
+                else:
+                    print("Plan generated")
             
-            # Log to CSV
-            # Extract tool_name from execution_details
-            tools_used_list = execution_details.get('tools_used', [])
-            tool_name = tools_used_list[0] if tools_used_list else execution_details.get('tool_name', 'agent_loop')
+                print_step_header("PlanGraph", query_id)
+                nodes_called = execution_details.get('nodes_called', [])
+                nodes_path = execution_details.get('nodes_exe_path', '')
+                node_count = len(nodes_called) if nodes_called else len(plan_steps)
+                if node_count > 0:
+                    print(f"{node_count} node(s) | Path: {nodes_path}")
+                else:
+                    print("Graph structure created")
             
-            # Extract nodes data - agent_loop returns nodes_called_json, but not nodes_compact or node_count
-            # These will be calculated by CSVManager if not provided
-            nodes_called_json = execution_details.get('nodes_called_json', [])
-            if isinstance(nodes_called_json, list):
-                # Convert list to JSON string if needed
-                import json
-                nodes_called_json = json.dumps(nodes_called_json)
+                print_step_header("Execution", query_id)
+                tools_used = execution_details.get('tools_used') or []
+                unique_tools = len(dict.fromkeys(tools_used)) if tools_used else 0
+                print(f"Executed {len(plan_steps)} step(s) | Tools: {unique_tools}")
             
-            csv_manager.log_tool_performance(
-                query_id=query_id,
-                plan_used=execution_details.get('plan_steps', []),
-                plan_step_count=len(execution_details.get('plan_steps', [])),
-                query_name=f"Test {query_id} - {category}",
-                query_text=query,
-                query_answer=answer,
-                result_status="success",
-                actual_status="success",
-                elapsed_time=query_elapsed,
-                tool_name=tool_name,
-                api_call_type=execution_details.get('api_call_type', ''),
-                llm_provider=execution_details.get('llm_provider', ''),
-                step_details=execution_details.get('step_details', ''),
-                nodes_called=nodes_called_json,  # Pass as JSON string or list (CSVManager will handle it)
-                nodes_compact="",  # Will be calculated by CSVManager from nodes_called and step_details
-                node_count=0,  # Will be calculated by CSVManager from nodes_called
-                nodes_exe_path=execution_details.get('nodes_exe_path', ''),
-                final_state=execution_details.get('final_state', {})
-            )
+                print_step_header("Summary", query_id)
+                print("Formatting final answer...")
             
-            results.append({
-                "id": query_id,
-                "query": query,
-                "category": category,
-                "answer": answer,
-                "status": "success",
-                "elapsed": query_elapsed
-            })
+                print_step_header("Final Answer", query_id)
+                answer_preview = _preview(answer, 80)
+                print(f"'{answer_preview}'")
             
-        except Exception as e:
-            query_elapsed = time.perf_counter() - query_start
-            error_msg = str(e)[:100]
+                # Log to CSV
+                # Extract tool_name from execution_details
+                tool_name = tools_used[0] if tools_used else execution_details.get('tool_name', 'agent_loop')
             
-            print_step_header("ERROR", query_id)
-            print(f"{error_msg}")
+                # Extract nodes data - agent_loop returns nodes_called_json, but not nodes_compact or node_count
+                # These will be calculated by CSVManager if not provided
+                nodes_called_json = execution_details.get('nodes_called_json') or []
+                if isinstance(nodes_called_json, list):
+                    # Convert list to JSON string if needed
+                    nodes_called_json = _json_dumps_compact(nodes_called_json)
             
-            # Log error to CSV
-            try:
-                csv_manager.log_tool_performance(
+                csv_manager.log_tool_performance_buffered(
                     query_id=query_id,
-                    plan_used=[],
-                    plan_step_count=0,
+                    plan_used=plan_steps,
+                    plan_step_count=len(plan_steps),
                     query_name=f"Test {query_id} - {category}",
                     query_text=query,
-                    query_answer="ERROR",
-                    result_status="failed",
-                    actual_status="error",
+                    query_answer=answer,
+                    result_status="success",
+                    actual_status="success",
                     elapsed_time=query_elapsed,
-                    tool_name="",
-                    error_message=error_msg
+                    tool_name=tool_name,
+                    api_call_type=execution_details.get('api_call_type', ''),
+                    llm_provider=execution_details.get('llm_provider', ''),
+                    step_details=execution_details.get('step_details', ''),
+                    nodes_called=nodes_called_json,  # Pass as JSON string or list (CSVManager will handle it)
+                    nodes_compact="",  # Will be calculated by CSVManager from nodes_called and step_details
+                    node_count=0,  # Will be calculated by CSVManager from nodes_called
+                    nodes_exe_path=execution_details.get('nodes_exe_path', ''),
+                    final_state=execution_details.get('final_state', {})
                 )
-            except Exception as csv_error:
-                print(f"⚠ Warning: Could not log error to CSV: {csv_error}")
             
-            results.append({
-                "id": query_id,
-                "query": query,
-                "category": category,
-                "answer": "ERROR",
-                "status": "error",
-                "elapsed": query_elapsed,
-                "error": error_msg
-            })
-        
-        print()
-        
-        # Small delay between queries
-        if idx < len(queries):
-            await asyncio.sleep(2)
+                results[idx - 1] = {
+                    "id": query_id,
+                    "query": query,
+                    "category": category,
+                    "answer": answer,
+                    "status": "success",
+                    "elapsed_ns": elapsed_ns
+                }
+                print()
+            
+        except Exception as e:
+            elapsed_ns = time.perf_counter_ns() - query_start_ns
+            query_elapsed = elapsed_ns / 1e9  # seconds, for printing/CSV only
+            next_allowed = time.monotonic() + RATE_LIMIT_S
+            with _QueryOutput():
+                error_msg = str(e)[:100]
+            
+                print_step_header("ERROR", query_id)
+                print(f"{error_msg}")
+            
+                # Log error to CSV
+                try:
+                    csv_manager.log_tool_performance_buffered(
+                        query_id=query_id,
+                        plan_used=[],
+                        plan_step_count=0,
+                        query_name=f"Test {query_id} - {category}",
+                        query_text=query,
+                        query_answer="ERROR",
+                        result_status="failed",
+                        actual_status="error",
+                        elapsed_time=query_elapsed,
+                        tool_name="",
+                        error_message=error_msg
+                    )
+                except Exception as csv_error:
+                    print(f"⚠ Warning: Could not log error to CSV: {csv_error}")
+            
+                results[idx - 1] = {
+                    "id": query_id,
+                    "query": query,
+                    "category": category,
+                    "answer": "ERROR",
+                    "status": "error",
+                    "elapsed_ns": elapsed_ns,
+                    "error": error_msg
+                }
+                print()
     
-    total_elapsed = time.perf_counter() - start_time
+    # Write queued CSV rows and close the log file (nothing is logged after this point)
+    csv_manager.close()
+    sys.stdout.flush()
+    
+    total_elapsed = (time.perf_counter_ns() - start_ns) / 1e9
     
     # Final Stats
     print()
@@ -347,9 +399,20 @@ async def run_test_10_queries():
     print("=" * 80)
     print()
     
-    successful = sum(1 for r in results if r['status'] == 'success')
-    errors = sum(1 for r in results if r['status'] == 'error')
-    avg_time = sum(r['elapsed'] for r in results) / len(results) if results else 0
+    # Single pass over results for counts, timing and the (category, succeeded) tallies
+    successful = 0
+    errors = 0
+    elapsed_ns_sum = 0
+    cat_ctr = Counter()
+    for r in results:
+        status = r['status']
+        cat_ctr[(r['category'], status == 'success')] += 1
+        if status == 'success':
+            successful += 1
+        elif status == 'error':
+            errors += 1
+        elapsed_ns_sum += r['elapsed_ns']
+    avg_time = elapsed_ns_sum / len(results) / 1e9 if results else 0
     
     print(f"Total Queries: {len(results)}")
     print(f"  Successful: {successful}")
@@ -361,26 +424,19 @@ async def run_test_10_queries():
     print()
     
     # Category breakdown
-    categories = {}
-    for r in results:
-        cat = r['category']
-        if cat not in categories:
-            categories[cat] = {'total': 0, 'success': 0}
-        categories[cat]['total'] += 1
-        if r['status'] == 'success':
-            categories[cat]['success'] += 1
-    
-    if categories:
+    if cat_ctr:
         print("Category Breakdown:")
-        for cat, stats in sorted(categories.items()):
-            success_rate = (stats['success'] / stats['total'] * 100) if stats['total'] > 0 else 0
-            print(f"  {cat}: {stats['success']}/{stats['total']} ({success_rate:.1f}%)")
+        for cat in CANONICAL_CATEGORIES:
+            cat_success = cat_ctr[(cat, True)]
+            cat_total = cat_success + cat_ctr[(cat, False)]
+            success_rate = (cat_success / cat_total * 100) if cat_total > 0 else 0
+            print(f"  {cat}: {cat_success}/{cat_total} ({success_rate:.1f}%)")
         print()
     
     # Quick answer preview
     print("Answer Preview:")
     for r in results[:5]:  # Show first 5
-        answer_preview = r['answer'][:60] + "..." if len(r['answer']) > 60 else r['answer']
+        answer_preview = _preview(r['answer'])
         print(f"  [{r['id']}] {r['category']}: {answer_preview}")
     
     if len(results) > 5:
@@ -2,11 +2,14 @@
 import ast
 import asyncio
 import time
+import random
 import builtins
 import textwrap
+import keyword
 import re
-from typing import Tuple, Optional, Any
-from datetime import datetime
+import types
+from collections import OrderedDict
+from typing import Tuple, Optional, Any, List
 from core.control_manager import ControlManager
 from core.human_in_loop import ask_user_for_tool_result
 from core.plan_graph import CodeVariant, StepNode
@@ -20,77 +23,206 @@ ALLOWED_MODULES = {
 }
 MAX_FUNCTIONS = 5
 TIMEOUT_PER_FUNCTION = 500  # seconds
+RETRY_BASE_DELAY = 0.25  # seconds; doubles with each retry of a transient failure
+RETRY_MAX_DELAY = 30  # seconds
+# Errors from the generated code itself: the same code fails the same way, so never retried
+NON_RETRYABLE_ERRORS = (SyntaxError, ValueError, TypeError)
+COMPILE_CACHE_SIZE = 512  # compiled user code objects kept (LRU)
+
+# (cleaned source, tool names) -> (code object, function call count)
+_COMPILE_CACHE: "OrderedDict[Tuple[str, frozenset], Tuple[types.CodeType, int]]" = OrderedDict()
+
+# One-line "[target =] tool(args)" snippets, compiled without parsing the whole source
+_SIMPLE_CALL_RE = re.compile(r'^(?:(\w+)\s*=\s*)?(\w+)\((.*)\)\s*$', re.DOTALL)
+
+# Exactly the strings int() accepts (whitespace except \x1c-\x1f, sign, digits with "_" groups),
+# so non-numeric tool arguments are rejected without raising ValueError
+_INT_LITERAL_RE = re.compile(r'[^\S\x1c-\x1f]*[-+]?\d+(?:_\d+)*[^\S\x1c-\x1f]*')
+
+# Sandbox globals that never change between executions, built once at import
+_SAFE_BUILTINS = {
+    k: getattr(builtins, k)
+    for k in ("range", "len", "int", "float", "str", "list", "dict", "print", "sum", "__import__")
+}
+_SAFE_GLOBALS_TEMPLATE = {module: __import__(module) for module in ALLOWED_MODULES}
+
+# ───────────────────────────────────────────────────────────────
+# AST TRANSFORMER: single-pass rewrite of generated code
+# ───────────────────────────────────────────────────────────────
+class ExecutorRewriter(ast.NodeTransformer):
+    """
+    Rewrite generated code for execution in one traversal.
+    
+    For every call: strip keyword args down to positional values ("key"="value" -> "value").
+    For calls to known async MCP tools, additionally convert string number literals to ints
+    and wrap the call in an Await. Counts all calls on the way (call_count) and notes whether
+    the top level of the module returns or assigns `result` (has_return / has_result).
+    """
+    def __init__(self, tool_names):
+        self.tool_names = tool_names
+        self.call_count = 0
+        self.has_return = False
+        self.has_result = False
+        self._depth = 0  # 1 while visiting the module's own statements
+
+    def generic_visit(self, node):
+        self._depth += 1
+        try:
+            return super().generic_visit(node)
+        finally:
+            self._depth -= 1
+
+    def visit_Return(self, node):
+        if self._depth == 1:
+            self.has_return = True
+        return self.generic_visit(node)
+
+    def visit_Assign(self, node):
+        if self._depth == 1 and any(isinstance(t, ast.Name) and t.id == "result" for t in node.targets):
+            self.has_result = True
+        return self.generic_visit(node)
 
-class KeywordStripper(ast.NodeTransformer):
-    """Rewrite all function calls to remove keyword args and keep only values as positional."""
     def visit_Call(self, node):
         self.generic_visit(node)
+        self.call_count += 1
         if node.keywords:
             # Convert all keyword arguments into positional args (discard names)
             for kw in node.keywords:
                 node.args.append(kw.value)
             node.keywords = []
-        return node
-
-
-# ───────────────────────────────────────────────────────────────
-# AST TRANSFORMER: auto-await known async MCP tools
-# ───────────────────────────────────────────────────────────────
-class AwaitTransformer(ast.NodeTransformer):
-    def __init__(self, async_funcs):
-        self.async_funcs = async_funcs
-
-    def visit_Call(self, node):
-        self.generic_visit(node)
-        if isinstance(node.func, ast.Name) and node.func.id in self.async_funcs:
-            return ast.Await(value=node)
-        return node
-
-# ───────────────────────────────────────────────────────────────
-# AST TRANSFORMER: Convert string number literals to ints in tool calls
-# ───────────────────────────────────────────────────────────────
-class IntLiteralTransformer(ast.NodeTransformer):
-    """Convert string literals that are numbers to integers in function calls."""
-    def __init__(self, tool_names):
-        self.tool_names = tool_names
-    
-    def visit_Call(self, node):
-        self.generic_visit(node)
-        # Check if this is a tool call
         if isinstance(node.func, ast.Name) and node.func.id in self.tool_names:
             # Convert string number arguments to integers
             new_args = []
             for arg in node.args:
-                if isinstance(arg, ast.Constant) and isinstance(arg.value, str):
-                    # Try to convert string to int if it's a number
-                    try:
-                        int_value = int(arg.value)
-                        new_args.append(ast.Constant(value=int_value))
-                    except ValueError:
-                        new_args.append(arg)
+                if (isinstance(arg, ast.Constant) and isinstance(arg.value, str)
+                        and _INT_LITERAL_RE.fullmatch(arg.value)):
+                    new_args.append(ast.copy_location(ast.Constant(value=int(arg.value)), arg))
                 else:
                     new_args.append(arg)
             node.args = new_args
+            return ast.copy_location(ast.Await(value=node), node)
         return node
 
 # ───────────────────────────────────────────────────────────────
 # UTILITY FUNCTIONS
 # ───────────────────────────────────────────────────────────────
-def count_function_calls(code: str) -> int:
-    tree = ast.parse(code)
-    return sum(isinstance(node, ast.Call) for node in ast.walk(tree))
+def _simple_call_body(cleaned_code: str, tool_names: frozenset) -> Optional[Tuple[list, int]]:
+    """
+    Fast path for a single `tool(args)` or `target = tool(args)` statement.
+    
+    Only the argument list is parsed; the statement around it is built directly. Returns
+    the rewritten __main body and call count, or None to use the generic path.
+    """
+    match = _SIMPLE_CALL_RE.match(cleaned_code)
+    if not match:
+        return None
+    target, func_name, args_src = match.groups()
+    if func_name not in tool_names:
+        return None
+    if target is not None and (not target.isidentifier() or keyword.iskeyword(target)):
+        return None
+    try:
+        call = ast.parse(f"_({args_src})", mode="eval").body
+    except SyntaxError:
+        return None
+    # "a(1) + b(2)" or "a(1)(2)" also match the regex; they parse to something else here
+    if not (isinstance(call, ast.Call) and isinstance(call.func, ast.Name) and call.func.id == "_"):
+        return None
+    call.func = ast.copy_location(ast.Name(id=func_name, ctx=ast.Load()), call.func)
+
+    rewriter = ExecutorRewriter(tool_names)
+    value = rewriter.visit(call)
+    # New nodes take the call's location so the module compiles without fix_missing_locations
+    if target is None:
+        body = [ast.copy_location(ast.Expr(value=value), call)]
+    else:
+        target_name = ast.copy_location(ast.Name(id=target, ctx=ast.Store()), call)
+        body = [ast.copy_location(ast.Assign(targets=[target_name], value=value), call)]
+        if target == "result":
+            body.append(_return_result(call))
+    return body, rewriter.call_count
 
-def build_safe_globals(mcp_funcs: dict, multi_mcp=None) -> dict:
-    safe_globals = {
-        "__builtins__": {
-            k: getattr(builtins, k)
-            for k in ("range", "len", "int", "float", "str", "list", "dict", "print", "sum", "__import__")
-        },
-        **mcp_funcs,
-    }
 
-    for module in ALLOWED_MODULES:
-        safe_globals[module] = __import__(module)
+def compile_user_code(cleaned_code: str, tool_names: frozenset) -> Tuple[types.CodeType, int]:
+    """
+    Parse, rewrite and compile generated code into a module defining `async def __main()`.
+    
+    Returns:
+        Tuple of (code object, number of function calls in the code)
+    """
+    simple = _simple_call_body(cleaned_code, tool_names)
+    if simple is not None:
+        body, call_count = simple
+        return _compile_main(body), call_count
+
+    tree = ast.parse(cleaned_code)
+    
+    # Validate tree has body
+    if not tree.body:
+        raise ValueError("Parsed code has no statements. Decision module generated invalid code.")
+
+    # One pass: strip keyword args, coerce numeric string args, await tool calls
+    # and note top-level return / `result =` statements
+    rewriter = ExecutorRewriter(tool_names)
+    tree = rewriter.visit(tree)
+    if not rewriter.has_return and rewriter.has_result:
+        tree.body.append(_return_result(tree.body[-1]))
+    
+    # Double-check body is not empty after transformations
+    if not tree.body:
+        raise ValueError("Code body is empty after AST transformations.")
+
+    return _compile_main(tree.body), rewriter.call_count
+
+
+def _return_result(located: ast.AST) -> ast.Return:
+    """`return result`, placed at `located`'s source position."""
+    name = ast.copy_location(ast.Name(id="result", ctx=ast.Load()), located)
+    return ast.copy_location(ast.Return(value=name), located)
+
+
+def _compile_main(body: list) -> types.CodeType:
+    """Wrap rewritten statements in `async def __main()` and compile the module."""
+    # Every node in body already has a location; only the wrapper needs one
+    func_def = ast.AsyncFunctionDef(
+        name="__main",
+        args=ast.arguments(posonlyargs=[], args=[], kwonlyargs=[], kw_defaults=[], defaults=[]),
+        body=body,
+        decorator_list=[],
+        lineno=1,
+        col_offset=0,
+    )
+    wrapper = ast.Module(body=[func_def], type_ignores=[])
+    # optimize=2 drops asserts and docstrings; nothing inspects them in generated code
+    return compile(wrapper, filename="<user_code>", mode="exec", optimize=2)
+
+
+def get_compiled_user_code(cleaned_code: str, tool_names: frozenset) -> Tuple[types.CodeType, int]:
+    """
+    compile_user_code() with an LRU cache keyed by (source, tool names).
+    
+    Retries and repeated variants of the same source reuse one code object; the code object
+    holds no per-call state (globals/locals are supplied at exec time).
+    """
+    key = (cleaned_code, tool_names)
+    cached = _COMPILE_CACHE.get(key)
+    if cached is not None:
+        _COMPILE_CACHE.move_to_end(key)
+        return cached
+    
+    cached = compile_user_code(cleaned_code, tool_names)
+    _COMPILE_CACHE[key] = cached
+    if len(_COMPILE_CACHE) > COMPILE_CACHE_SIZE:
+        _COMPILE_CACHE.popitem(last=False)
+    return cached
+
+def build_safe_globals(mcp_funcs: dict, multi_mcp=None) -> dict:
+    # Builtins dict is copied so code run in one sandbox cannot alter the next one's builtins
+    safe_globals = _SAFE_GLOBALS_TEMPLATE.copy()
+    safe_globals["__builtins__"] = _SAFE_BUILTINS.copy()
+    # Allowed modules take precedence over same-named tools, as before
+    for name, func in mcp_funcs.items():
+        safe_globals.setdefault(name, func)
 
     # Store LLM-style result
     safe_globals["final_answer"] = lambda x: safe_globals.setdefault("result_holder", x)
@@ -102,13 +234,12 @@ def build_safe_globals(mcp_funcs: dict, multi_mcp=None) -> dict:
                 multi_mcp.function_wrapper(tool_name, *args)
                 for tool_name, *args in tool_calls
             ]
-            try:
-                return await asyncio.gather(*coros, return_exceptions=True)
-            except ExceptionGroup as eg:
-                # Handle ExceptionGroup from gather - extract first error
-                if eg.exceptions:
-                    raise eg.exceptions[0]  # Re-raise first exception
-                raise
+            # gather() with return_exceptions=True never raises; partial failures
+            # stay in the list for the caller, a total failure raises the first error
+            results = await asyncio.gather(*coros, return_exceptions=True)
+            if results and all(isinstance(r, BaseException) for r in results):
+                raise results[0]
+            return results
 
         safe_globals["parallel"] = parallel
 
@@ -118,7 +249,31 @@ def build_safe_globals(mcp_funcs: dict, multi_mcp=None) -> dict:
 # ───────────────────────────────────────────────────────────────
 # MAIN EXECUTOR
 # ───────────────────────────────────────────────────────────────
-async def run_user_code(code: str, multi_mcp, step_description: str = "", query: str = "", completed_steps: list = None) -> dict:
+def _retry_delay(retry_count: int) -> float:
+    """Exponential backoff with a little jitter before retry number `retry_count`."""
+    return min(RETRY_MAX_DELAY, RETRY_BASE_DELAY * (2 ** retry_count)) + random.random() * 0.1
+
+
+def _timing_fields(start_wall: float, start_perf: float) -> dict:
+    """Build the execution_time/total_time result fields from the call's start clocks."""
+    return {
+        "execution_time": time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(start_wall)),
+        "total_time": f"{time.perf_counter() - start_perf:.3f}",
+    }
+
+
+def _ask_human_for_result(error: str, step_description: str, query: str) -> str:
+    """Human-in-loop answer for a step whose code could not produce one."""
+    context = {
+        "tool_name": "code_executor",
+        "error_message": error,
+        "step_description": step_description,
+        "query": query
+    }
+    return ask_user_for_tool_result(context)
+
+
+async def run_user_code(code: str, multi_mcp, step_description: str = "", query: str = "", completed_steps: list = None, ask_human: bool = True) -> dict:
     """
     Execute user code with retry logic and human-in-loop on failure.
     
@@ -128,6 +283,7 @@ async def run_user_code(code: str, multi_mcp, step_description: str = "", query:
         step_description: Description of the step (for human-in-loop context)
         query: Original query (for human-in-loop context)
         completed_steps: List of completed steps with their execution results
+        ask_human: If False, report the failure instead of asking the user for a result
     
     Returns:
         dict: Execution result with status, result/error, retry_count
@@ -138,77 +294,45 @@ async def run_user_code(code: str, multi_mcp, step_description: str = "", query:
     max_retries = control_manager.get_max_retries()
     
     start_time = time.perf_counter()
-    start_timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+    start_wall = time.time()  # formatted only when a result is built
     
     retry_count = 0
     last_error = None
     
+    # Invariant across retries: computed once
+    cleaned_code = textwrap.dedent(code).strip()
+    
+    # Validate code is not empty; an error lets the caller move on to the next variant
+    if not cleaned_code or not cleaned_code.strip():
+        return {
+            "status": "error",
+            "error": "Generated code is empty. Decision module may have failed to generate valid code.",
+            **_timing_fields(start_wall, start_time),
+            "retry_count": retry_count
+        }
+    
+    tool_funcs = multi_mcp.tool_proxies
+    
     # Retry loop
     while retry_count < max_retries:
         try:
-            func_count = count_function_calls(code)
+            func_count = 0
+
+            # Fresh sandbox per attempt: exec() and final_answer() write into it
+            sandbox = build_safe_globals(tool_funcs, multi_mcp)
+            # Add completed_steps to sandbox for code execution context
+            sandbox["completed_steps"] = completed_steps
+            local_vars = {}
+
+            compiled, func_count = get_compiled_user_code(cleaned_code, frozenset(tool_funcs))
             if func_count > MAX_FUNCTIONS:
                 return {
                     "status": "error",
                     "error": f"Too many functions ({func_count} > {MAX_FUNCTIONS})",
-                    "execution_time": start_timestamp,
-                    "total_time": str(round(time.perf_counter() - start_time, 3)),
+                    **_timing_fields(start_wall, start_time),
                     "retry_count": retry_count
                 }
 
-            tool_funcs = {
-                tool.name: make_tool_proxy(tool.name, multi_mcp)
-                for tool in multi_mcp.get_all_tools()
-            }
-
-            sandbox = build_safe_globals(tool_funcs, multi_mcp)
-            # Add completed_steps to sandbox for code execution context
-            sandbox["completed_steps"] = completed_steps
-            local_vars = {}
-
-            cleaned_code = textwrap.dedent(code.strip())
-            
-            # Validate code is not empty
-            if not cleaned_code or not cleaned_code.strip():
-                raise ValueError("Generated code is empty. Decision module may have failed to generate valid code.")
-            
-            tree = ast.parse(cleaned_code)
-            
-            # Validate tree has body
-            if not tree.body:
-                raise ValueError("Parsed code has no statements. Decision module generated invalid code.")
-
-            has_return = any(isinstance(node, ast.Return) for node in tree.body)
-            has_result = any(
-                isinstance(node, ast.Assign) and any(
-                    isinstance(t, ast.Name) and t.id == "result" for t in node.targets
-                )
-                for node in tree.body
-            )
-            if not has_return and has_result:
-                tree.body.append(ast.Return(value=ast.Name(id="result", ctx=ast.Load())))
-
-            tree = KeywordStripper().visit(tree) # strip "key" = "value" cases to only "value"
-            # Convert string number literals to integers in tool calls
-            tool_names = set(tool_funcs.keys())
-            tree = IntLiteralTransformer(tool_names).visit(tree)
-            tree = AwaitTransformer(tool_names).visit(tree)
-            ast.fix_missing_locations(tree)
-            
-            # Double-check body is not empty after transformations
-            if not tree.body:
-                raise ValueError("Code body is empty after AST transformations.")
-
-            func_def = ast.AsyncFunctionDef(
-                name="__main",
-                args=ast.arguments(posonlyargs=[], args=[], kwonlyargs=[], kw_defaults=[], defaults=[]),
-                body=tree.body,
-                decorator_list=[]
-            )
-            wrapper = ast.Module(body=[func_def], type_ignores=[])
-            ast.fix_missing_locations(wrapper)
-
-            compiled = compile(wrapper, filename="<user_code>", mode="exec")
             exec(compiled, sandbox, local_vars)
 
             timeout = max(3, func_count * TIMEOUT_PER_FUNCTION)  # minimum 3s even for plain returns
@@ -230,7 +354,7 @@ async def run_user_code(code: str, multi_mcp, step_description: str = "", query:
                 retry_count += 1
                 if retry_count < max_retries:
                     print(f"Tool error: {error_msg}. Retrying ({retry_count}/{max_retries})...")
-                    await asyncio.sleep(1)
+                    await asyncio.sleep(_retry_delay(retry_count))
                     continue
                 else:
                     break
@@ -239,8 +363,7 @@ async def run_user_code(code: str, multi_mcp, step_description: str = "", query:
             return {
                 "status": "success",
                 "result": str(result_value),
-                "execution_time": start_timestamp,
-                "total_time": str(round(time.perf_counter() - start_time, 3)),
+                **_timing_fields(start_wall, start_time),
                 "retry_count": retry_count
             }
 
@@ -249,72 +372,51 @@ async def run_user_code(code: str, multi_mcp, step_description: str = "", query:
             retry_count += 1
             if retry_count < max_retries:
                 print(f"Timeout occurred. Retrying ({retry_count}/{max_retries})...")
-                await asyncio.sleep(1)  # Brief delay before retry
-                continue
-            else:
-                break
-        except ExceptionGroup as eg:
-            # Handle ExceptionGroup (Python 3.11+) - extract first meaningful error
-            # Note: Using regular 'except' instead of 'except*' to avoid mixing syntax
-            last_error = f"ExceptionGroup: {len(eg.exceptions)} error(s)"
-            if eg.exceptions:
-                first_exc = eg.exceptions[0]
-                last_error = f"{type(first_exc).__name__}: {str(first_exc)}"
-            retry_count += 1
-            if retry_count < max_retries:
-                print(f"Error occurred: {last_error}. Retrying ({retry_count}/{max_retries})...")
-                await asyncio.sleep(1)  # Brief delay before retry
+                await asyncio.sleep(_retry_delay(retry_count))
                 continue
             else:
                 break
         except Exception as e:
+            # Tool calls can still surface an ExceptionGroup from the MCP client's
+            # task groups; report its first sub-exception (groups are never empty)
+            if isinstance(e, ExceptionGroup):
+                e = e.exceptions[0]
             last_error = f"{type(e).__name__}: {str(e)}"
             retry_count += 1
+            if isinstance(e, NON_RETRYABLE_ERRORS):
+                break  # fail fast: retrying identical code cannot help
             if retry_count < max_retries:
                 print(f"Error occurred: {last_error}. Retrying ({retry_count}/{max_retries})...")
-                await asyncio.sleep(1)  # Brief delay before retry
+                await asyncio.sleep(_retry_delay(retry_count))
                 continue
             else:
                 break
     
     # All retries exhausted - trigger human-in-loop
     if last_error:
-        print(f"\nAll {max_retries} retries exhausted. Error: {last_error}")
-        context = {
-            "tool_name": "code_executor",
-            "error_message": last_error,
-            "step_description": step_description,
-            "query": query
-        }
-        user_result = ask_user_for_tool_result(context)
-        
-        return {
-            "status": "success",  # Treat user input as success
-            "result": user_result,
-            "execution_time": start_timestamp,
-            "total_time": str(round(time.perf_counter() - start_time, 3)),
-            "retry_count": retry_count,
-            "human_provided": True
-        }
+        if retry_count < max_retries:
+            print(f"\nNot retrying ({retry_count}/{max_retries} attempts used). Error: {last_error}")
+        else:
+            print(f"\nAll {max_retries} retries exhausted. Error: {last_error}")
+        if ask_human:
+            user_result = _ask_human_for_result(last_error, step_description, query)
+            
+            return {
+                "status": "success",  # Treat user input as success
+                "result": user_result,
+                **_timing_fields(start_wall, start_time),
+                "retry_count": retry_count,
+                "human_provided": True
+            }
     
     # Fallback error
     return {
         "status": "error",
         "error": last_error or "Unknown error",
-        "execution_time": start_timestamp,
-        "total_time": str(round(time.perf_counter() - start_time, 3)),
+        **_timing_fields(start_wall, start_time),
         "retry_count": retry_count
     }
 
-# ───────────────────────────────────────────────────────────────
-# TOOL WRAPPER
-# ───────────────────────────────────────────────────────────────
-def make_tool_proxy(tool_name: str, mcp):
-    async def _tool_fn(*args):
-        return await mcp.function_wrapper(tool_name, *args)
-    return _tool_fn
-
-
 # ───────────────────────────────────────────────────────────────
 # CODE VARIANT EXECUTION (V2)
 # ───────────────────────────────────────────────────────────────
@@ -324,7 +426,8 @@ async def run_code_variant(
     multi_mcp,
     step_description: str = "",
     query: str = "",
-    completed_steps: list = None
+    completed_steps: list = None,
+    ask_human: bool = True
 ) -> Tuple[bool, Any, Optional[str]]:
     """
     Execute a single code variant.
@@ -336,6 +439,7 @@ async def run_code_variant(
         step_description: Description of the step
         query: Original query
         completed_steps: List of completed steps
+        ask_human: If False, a failing variant reports its error instead of asking the user
     
     Returns:
         Tuple of (success: bool, result: Any, error: Optional[str])
@@ -352,7 +456,8 @@ async def run_code_variant(
         multi_mcp,
         step_description=step_description,
         query=query,
-        completed_steps=completed_steps
+        completed_steps=completed_steps,
+        ask_human=ask_human
     )
     
     if result.get("status") == "success":
@@ -362,13 +467,68 @@ async def run_code_variant(
         return False, None, error
 
 
+async def _first_successful_variant(
+    node: StepNode,
+    context: ContextManager,
+    multi_mcp,
+    query: str,
+    completed_steps: list,
+    ask_human: bool = True
+) -> Tuple[Optional[CodeVariant], Any, Optional[str], List[str]]:
+    """
+    Run a node's variants in order until one succeeds.
+    
+    Nodes with variants_parallel start every variant at once but still take the results in
+    order, so the winner is the variant sequential execution would pick; the others are
+    cancelled as soon as it is known. Raced variants report failures instead of each asking
+    the user; the user is asked once, only if every variant failed (and ask_human is set).
+    
+    Returns:
+        Tuple of (winning variant or None, result, last error, names of the variants tried)
+    """
+    race = node.variants_parallel and len(node.variants) > 1
+    
+    def attempt(variant: CodeVariant):
+        return run_code_variant(
+            variant,
+            context,
+            multi_mcp,
+            step_description=node.description,
+            query=query,
+            completed_steps=completed_steps,
+            ask_human=ask_human and not race
+        )
+    
+    tasks = [asyncio.ensure_future(attempt(variant)) for variant in node.variants] if race else None
+    variants_tried = []
+    last_error = None
+    try:
+        for i, variant in enumerate(node.variants):
+            variants_tried.append(variant.name)
+            success, result, error = await (tasks[i] if race else attempt(variant))
+            if success:
+                return variant, result, None, variants_tried
+            last_error = error
+    finally:
+        if race:
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+    
+    if race and last_error and ask_human:
+        # Same human-in-loop fallback a single failing variant gets
+        return node.variants[-1], _ask_human_for_result(last_error, node.description, query), None, variants_tried
+    return None, None, last_error, variants_tried
+
+
 async def execute_step(
     node: StepNode,
     context: ContextManager,
     multi_mcp,
     step_description: str = "",
     query: str = "",
-    completed_steps: list = None
+    completed_steps: list = None,
+    ask_human: bool = True
 ) -> dict:
     """
     Execute a step node with code variants (A/B/C retry logic).
@@ -380,6 +540,8 @@ async def execute_step(
         step_description: Description of the step
         query: Original query
         completed_steps: List of completed steps
+        ask_human: If False, a step whose variants all fail reports the error instead of
+            asking the user for a result
     
     Returns:
         dict: Execution result with variant tracking
@@ -387,42 +549,28 @@ async def execute_step(
     if completed_steps is None:
         completed_steps = []
     
-    variants_tried = []
-    last_error = None
+    variant, result, last_error, variants_tried = await _first_successful_variant(
+        node, context, multi_mcp, query, completed_steps, ask_human=ask_human
+    )
     
-    # Try each variant in order
-    for variant in node.variants:
-        variants_tried.append(variant.name)
-        
-        success, result, error = await run_code_variant(
-            variant,
-            context,
-            multi_mcp,
-            step_description=node.description,
-            query=query,
-            completed_steps=completed_steps
+    if variant is not None:
+        # Success - register result and update globals
+        globals_delta = {"last_result": result, "last_node": node.index}
+        context.register_step_result(
+            node.index,
+            True,
+            result,
+            globals_delta=globals_delta,
+            error=None
         )
         
-        if success:
-            # Success - register result and update globals
-            globals_delta = {"last_result": result, "last_node": node.index}
-            context.register_step_result(
-                node.index,
-                True,
-                result,
-                globals_delta=globals_delta,
-                error=None
-            )
-            
-            return {
-                "status": "success",
-                "result": result,
-                "variants_tried": variants_tried,
-                "variant_succeeded": variant.name,
-                "node_id": node.index
-            }
-        
-        last_error = error
+        return {
+            "status": "success",
+            "result": result,
+            "variants_tried": variants_tried,
+            "variant_succeeded": variant.name,
+            "node_id": node.index
+        }
     
     # All variants failed
     context.register_step_result(
@@ -0,0 +1,117 @@
+"""
+Content-addressed cache for LLM-backed agent calls (perception, plan building).
+
+Results are keyed by SHA-256 of a pickled key tuple and stored pickled, so every hit
+hands back a fresh object that the caller may mutate (plan graphs are updated during
+execution). Two levels:
+    - L1: in-process LRU of recent entries
+    - L2: on-disk diskcache.Cache in .agent_cache/ (optional; skipped if diskcache is missing)
+
+Set DISABLE_LLM_CACHE=1 to bypass both levels.
+"""
+
+import hashlib
+import inspect
+import os
+import pickle
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+try:
+    import diskcache
+    DISKCACHE_AVAILABLE = True
+except ImportError:
+    DISKCACHE_AVAILABLE = False
+
+LLM_CACHE_ENABLED = os.environ.get("DISABLE_LLM_CACHE", "0") != "1"
+CACHE_DIR = ".agent_cache"
+L1_MAXSIZE = 1000
+
+_l1: "OrderedDict[str, bytes]" = OrderedDict()
+_l2 = None
+
+
+def _disk_cache():
+    """Open the on-disk cache on first use; None if diskcache is unavailable or fails to open."""
+    global _l2, DISKCACHE_AVAILABLE
+    if _l2 is None and DISKCACHE_AVAILABLE:
+        try:
+            _l2 = diskcache.Cache(CACHE_DIR)
+        except Exception as e:
+            print(f"[WARN] LLM cache: could not open {CACHE_DIR}: {e}")
+            DISKCACHE_AVAILABLE = False
+    return _l2
+
+
+def file_version(path: str) -> float:
+    """Modification time of a prompt file, so editing the prompt invalidates its entries."""
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return 0.0
+
+
+def cache_key(key_tuple: Tuple[Hashable, ...]) -> str:
+    """SHA-256 hex digest of the pickled key tuple."""
+    return hashlib.sha256(pickle.dumps(key_tuple, protocol=pickle.HIGHEST_PROTOCOL)).hexdigest()
+
+
+def _l1_put(key: str, blob: bytes):
+    _l1[key] = blob
+    _l1.move_to_end(key)
+    if len(_l1) > L1_MAXSIZE:
+        _l1.popitem(last=False)
+
+
+async def cached(
+    key_tuple: Tuple[Hashable, ...],
+    factory: Callable[[], Any],
+    cacheable: Optional[Callable[[Any], bool]] = None,
+) -> Any:
+    """
+    Return the cached result for key_tuple, computing it with factory() on a miss.
+
+    Args:
+        key_tuple: Picklable tuple identifying the call (call name, inputs, prompt version, ...)
+        factory: Zero-argument callable producing the result; may return an awaitable
+        cacheable: Optional predicate; results it rejects (e.g. LLM error fallbacks) are
+            returned but not stored
+
+    Returns:
+        The (possibly cached) result. None results are not cached.
+    """
+    if not LLM_CACHE_ENABLED:
+        result = factory()
+        return await result if inspect.isawaitable(result) else result
+
+    key = cache_key(key_tuple)
+    blob = _l1.get(key)
+    if blob is not None:
+        _l1.move_to_end(key)
+        return pickle.loads(blob)
+
+    disk = _disk_cache()
+    if disk is not None:
+        blob = disk.get(key)
+        if blob is not None:
+            _l1_put(key, blob)
+            return pickle.loads(blob)
+
+    result = factory()
+    if inspect.isawaitable(result):
+        result = await result
+    if result is None or (cacheable is not None and not cacheable(result)):
+        return result
+
+    try:
+        blob = pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        print(f"[WARN] LLM cache: result for {key_tuple[0]!r} is not picklable, not cached: {e}")
+        return result
+    _l1_put(key, blob)
+    if disk is not None:
+        try:
+            disk.set(key, blob)
+        except Exception as e:
+            print(f"[WARN] LLM cache: could not write entry to {CACHE_DIR}: {e}")
+    return result
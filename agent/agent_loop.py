@@ -3,29 +3,349 @@ Agent Loop V2 for Session 11 - Graph-Native Agent System
 Implements graph-based execution with code variants, fallbacks, and retrieval agents.
 """
 
+import asyncio
+import copy
+import json
+import logging
+import operator
+import re
+import sys
+import traceback
 import uuid
-from typing import Optional
+from dataclasses import dataclass
+from functools import cached_property, lru_cache, partial
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from rapidfuzz import fuzz
 from perception.perception import Perception, PerceptionResult
 from decision.decision import Decision
 from action.executor import execute_step
 from core.context_manager import ContextManager
-from core.plan_graph import PlanGraph, Route, StepStatus
+from core.lazy_str import summarize
+from core.plan_graph import PlanGraph, PlanGraphError, Route, StepStatus
 from memory.memory_search import MemorySearch
 from memory.session_log import append_session_to_store
 from agent.agentSession import AgentSession, PerceptionSnapshot
+from agent._llm_cache import cached, file_version
+from agent import plan_template_cache
+from agent.answer_cache import AnswerCache
 from mcp_servers.multiMCP import MultiMCP
 from retrieval.retriever_agent import RetrieverAgent
 from retrieval.triplet_agent import TripletAgent
 from retrieval.graph_agent import GraphAgent
 from retrieval.critic_agent import CriticAgent
-from retrieval.formatter_agent import FormatterAgent
+from retrieval.formatter_agent import FormatterAgent, StepEvent
 from core.human_in_loop import ask_user_for_plan
 
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
+
+# Compact JSON for the execution-details strings; the stdlib fallback emits the same text as orjson
+if ORJSON_AVAILABLE:
+    def _jdumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+else:
+    _jdumps = partial(json.dumps, separators=(",", ":"), ensure_ascii=False)
+
+
+class _StdoutHandler(logging.StreamHandler):
+    """StreamHandler bound to the current sys.stdout at emit time, so redirect_stdout still captures it."""
+    
+    @property
+    def stream(self):
+        return sys.stdout
+    
+    @stream.setter
+    def stream(self, value):
+        pass
+
+
+# Per-step progress messages. Printed to stdout like the rest of the run output by default;
+# raise the level (or set logger.disabled = True) to skip their formatting entirely.
+logger = logging.getLogger("agent_loop")
+if not logger.handlers:
+    logger.addHandler(_StdoutHandler())
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+# Text the perception/decision modules put in their fallback output when the LLM call fails;
+# such results must not be cached
+_PERCEPTION_ERROR_NOTES = ("Perception API error", "Network/Connection error")
+_DECISION_ERROR_MARKERS = ("model unavailable", "model returned a 503", "model connection failed")
+
+PROFILE_PATH = "config/profiles.yaml"
+
+
+@lru_cache(maxsize=1)
+def _load_profile() -> dict:
+    """
+    Parsed config/profiles.yaml, read once per process and shared by every AgentLoop.
+    
+    Returns:
+        Profile dict; empty if the file is missing or invalid (a warning is printed once)
+    """
+    import yaml
+    try:
+        with open(PROFILE_PATH, "rb") as f:
+            return yaml.load(f, Loader=getattr(yaml, "CSafeLoader", yaml.SafeLoader)) or {}
+    except Exception as e:
+        print(f"[WARN] Could not read {PROFILE_PATH}: {e}")
+        return {}
+
+
+# Retrieval agents shared across AgentLoop instances, created on first use (see _get_or_create)
+_AGENT_REGISTRY: Dict[str, Any] = {}
+
+
+def _get_or_create(key: str, factory: Callable[[], Any]) -> Any:
+    """Return the shared agent registered under key, building it with factory() the first time."""
+    agent = _AGENT_REGISTRY.get(key)
+    if agent is None:
+        agent = _AGENT_REGISTRY[key] = factory()
+    return agent
+
+
+@dataclass(slots=True)
+class TraceRecord:
+    """One executed node and the code variant that produced its result."""
+    node_id: str
+    variant: str
+
+# Placeholder for a step whose perception is skipped because its answer would not be used.
+# Shared, so never mutate it
+_SKIP_PERCEPTION = PerceptionResult(Route.DECISION, False, notes="Step perception skipped")
+
+
+# Any "a op b" in a query marks it as simple math (memory skipped, execution always forced)
+_SIMPLE_MATH_RE = re.compile(r'\d+\s*[+\-*/]\s*\d+')
+# First number in a step result, used when aggregating math steps
+_NUM_RE = re.compile(r'\b(\d+\.?\d*)\b')
+
+# A whole query that is one binary operation, optionally phrased as a question ("What is 2 + 2?")
+_ARITHMETIC_RE = re.compile(
+    r"^\s*(?:(?:what\s+is|what's|calculate|compute|evaluate)\s+)?"
+    r"(\d+(?:\.\d+)?)\s*([+\-*/])\s*(\d+(?:\.\d+)?)\s*[?=]?\s*$",
+    re.IGNORECASE
+)
+# Operator -> (MCP tool it stands in for, implementation); same semantics as the math tools
+_ARITHMETIC_OPS = {
+    "+": ("add", operator.add),
+    "-": ("subtract", operator.sub),
+    "*": ("multiply", operator.mul),
+    "/": ("divide", operator.truediv),
+}
+
+
+def _evaluate_arithmetic(query: str) -> Optional[Tuple[str, str, str]]:
+    """
+    Answer a query that is nothing but one binary operation on two numbers.
+    
+    Args:
+        query: User query
+    
+    Returns:
+        (tool name, call as text e.g. "multiply(10, 5)", result text), or None if the query is
+        anything more (or divides by zero)
+    """
+    match = _ARITHMETIC_RE.match(query)
+    if not match:
+        return None
+    left, symbol, right = match.groups()
+    tool_name, op = _ARITHMETIC_OPS[symbol]
+    try:
+        result = op(*(float(n) if "." in n else int(n) for n in (left, right)))
+    except ZeroDivisionError:
+        return None
+    return tool_name, f"{tool_name}({left}, {right})", str(result)
+
+
+# Math tools recognised in step descriptions (as substrings, so "addition" counts as add)
+_OP_RE = re.compile(r"add|subtract|multiply|divide|power|factorial|gcd|sqrt|cbrt|remainder")
+
+
+def _tools_used(completed_steps: list) -> set:
+    """Tools the completed steps appear to have used: web search, plus the first math tool named in each step."""
+    tools_used = set()
+    for step in completed_steps:
+        result_str = str(step.get("result", "")).lower()
+        desc_str = str(step.get("description", "")).lower()
+        # Check for search tools
+        if "duckduckgo" in result_str or "duckduckgo" in desc_str:
+            tools_used.add("duckduckgo_search_with_markdown")
+        # Check for math tools
+        match = _OP_RE.search(desc_str)
+        if match:
+            tools_used.add(match.group())
+    return tools_used
+
+
+# Step descriptions with these words are math steps; their result is shortened to its number
+_MATH_WORDS = ("calculate", "find", "compute", "factorial", "sum", "gcd", "prime")
+# Result recorded when a tool failed and the human-in-loop prompt got no answer (core.human_in_loop)
+_TOOL_FAILED = "Tool failed, no user input provided"
+
+
+def _aggregate_parts(completed_steps: list):
+    """Yield "description: result" for each completed step with a usable result."""
+    for step in completed_steps:
+        result = step.get("result")
+        if not result:
+            continue
+        result_val = str(result)
+        if result_val == _TOOL_FAILED:
+            continue
+        desc = step.get("description", "")
+        # For math results, extract just the number if the result is mostly a number
+        if desc and len(result_val) < 50:
+            desc_lower = desc.lower()
+            if any(word in desc_lower for word in _MATH_WORDS):
+                num_match = _NUM_RE.search(result_val)
+                if num_match:
+                    yield f"{desc}: {num_match.group(1)}"
+                    continue
+        yield f"{desc}: {result_val}"
+
+
+def _perception_cacheable(result: PerceptionResult) -> bool:
+    """False for the default result Perception returns when its LLM call failed."""
+    return not (result.notes or "").startswith(_PERCEPTION_ERROR_NOTES)
+
+
+def _plan_cacheable(graph: PlanGraph) -> bool:
+    """False if any step was built from Decision's error fallback instead of a real plan."""
+    return not any(
+        marker in node.description
+        for node in graph.nodes.values()
+        for marker in _DECISION_ERROR_MARKERS
+    )
+
+
+def _plan_descriptions(plan_graph: PlanGraph, skip_status: Optional[StepStatus] = StepStatus.SKIPPED) -> List[str]:
+    """Step descriptions of a plan, in plan order, leaving out nodes in skip_status (None keeps all)."""
+    return [node.description for node in plan_graph.nodes.values() if node.status != skip_status]
+
+
+def _acyclic(plan_graph: PlanGraph) -> PlanGraph:
+    """
+    Return plan_graph after checking it is a DAG.
+    
+    The wave scheduler never runs a node on a cycle (its parents can't all finish first), so a
+    cyclic plan would silently skip those steps; fail loudly instead.
+    """
+    if plan_graph.has_cycles():
+        raise PlanGraphError(f"Plan graph has a cycle; nodes: {list(plan_graph.nodes)}")
+    return plan_graph
+
+
+def _is_ready(plan_graph: PlanGraph, node_id: str) -> bool:
+    """
+    Whether a node can run now.
+    
+    A regular node is ready once every parent is COMPLETED or SKIPPED; a fallback node is
+    ready once the step it stands in for has FAILED. Children of a failed step never become
+    ready, so execution stops on that branch after its fallback, as before.
+    """
+    node = plan_graph.get_node(node_id)
+    if node is None or node.status != StepStatus.PENDING:
+        return False
+    parents = [plan_graph.get_node(parent_id) for parent_id in node.parents]
+    if any(parent is None for parent in parents):
+        return False
+    if node.is_fallback:
+        return all(parent.status == StepStatus.FAILED for parent in parents)
+    return all(parent.status in (StepStatus.COMPLETED, StepStatus.SKIPPED) for parent in parents)
+
+
+def _ready_nodes(plan_graph: PlanGraph) -> List[str]:
+    """Pending nodes that can run now, in plan order (full scan of the graph)."""
+    return [node_id for node_id in plan_graph.nodes if _is_ready(plan_graph, node_id)]
+
+
+def _unblocked(plan_graph: PlanGraph, wave: List[str]) -> List[str]:
+    """
+    Nodes that became ready once wave finished, in wave order.
+    
+    A node's readiness only changes when one of its parents finishes, so only the wave's
+    children (including a fallback just added under a failed step) need checking; over a run
+    this visits each edge once instead of rescanning the graph after every wave.
+    """
+    candidates = dict.fromkeys(child_id for node_id in wave for child_id in plan_graph.get_children(node_id))
+    return [node_id for node_id in candidates if _is_ready(plan_graph, node_id)]
+
+
+def _forced_successor(plan_graph: PlanGraph, wave: List[str]) -> Optional[str]:
+    """
+    The one node a single-node wave unblocked, when that choice is forced; None otherwise.
+    
+    On a linear plan the node just completed has exactly one child, and that child waits on
+    nothing else, so it is the whole next ready set and _ready_nodes() need not scan the graph.
+    """
+    if len(wave) != 1:
+        return None
+    node = plan_graph.get_node(wave[0])
+    if node is None or node.status != StepStatus.COMPLETED or len(node.children) != 1:
+        return None
+    child = plan_graph.get_node(node.children[0])
+    if child is None or child.status != StepStatus.PENDING or child.is_fallback or child.parents != [node.index]:
+        return None
+    return child.index
+
+
+class _StagedContext:
+    """
+    ContextManager stand-in for nodes run speculatively.
+    
+    execute_step() only writes to its context through register_step_result(); those calls are
+    held back here and applied by commit() once the speculative wave is adopted, so a discarded
+    speculation leaves the real context untouched.
+    """
+    
+    def __init__(self, ctx: ContextManager):
+        self._ctx = ctx
+        self._step_results = []
+    
+    def register_step_result(self, *args, **kwargs):
+        self._step_results.append((args, kwargs))
+    
+    def commit(self, skip: Tuple[str, ...] = ()):
+        """Apply the held-back results, except those of the nodes in skip."""
+        for args, kwargs in self._step_results:
+            if args[0] not in skip:
+                self._ctx.register_step_result(*args, **kwargs)
+        self._step_results.clear()
+    
+    def __getattr__(self, name):
+        return getattr(self._ctx, name)
+
+
+async def _cancel_speculation(speculation: Optional[tuple]):
+    """Cancel an unused speculative wave and wait for it to unwind."""
+    if speculation is None:
+        return
+    task = speculation[-1]
+    task.cancel()
+    await asyncio.gather(task, return_exceptions=True)
+
 
 class AgentLoop:
     """V2 Graph-native agent loop with retrieval augmentation."""
     
-    def __init__(self, perception_prompt_path: str, decision_prompt_path: str, multi_mcp: MultiMCP, strategy: str = "exploratory", use_ollama: bool = False):
+    # Minimum query similarity (0-100) for a memory_hint run to reuse a remembered answer
+    MEMORY_HINT_MIN_RATIO = 95
+    
+    # Start the nodes a wave unblocks while that wave's output is still being perceived
+    SPECULATIVE_EXECUTION = True
+    
+    # Default seconds a finished run's answer is reused for a repeat of the same query (0 disables)
+    ANSWER_CACHE_TTL = 300
+    
+    # Characters of a step's output shown to step perception (start and end of the text)
+    STEP_OUTPUT_HEAD_CHARS = 2000
+    STEP_OUTPUT_TAIL_CHARS = 500
+    
+    def __init__(self, perception_prompt_path: str, decision_prompt_path: str, multi_mcp: MultiMCP, strategy: str = "exploratory", use_ollama: bool = False, answer_cache_ttl: Optional[float] = None):
         """
         Initialize V2 agent loop.
         
@@ -35,74 +355,287 @@ class AgentLoop:
             multi_mcp: MultiMCP instance
             strategy: Planning strategy
             use_ollama: If True, use Ollama instead of Google API (reads from config/profiles.yaml)
+            answer_cache_ttl: Seconds a run's answer is reused for a repeat of the same query
+                (default ANSWER_CACHE_TTL; 0 disables the answer cache)
         """
         # Check config for Ollama preference
-        import yaml
-        from pathlib import Path
-        try:
-            with open("config/profiles.yaml", "r") as f:
-                profile = yaml.safe_load(f)
-                llm_config = profile.get("llm", {})
-                text_gen = llm_config.get("text_generation", "gemini")
-                # Use Ollama if configured in profiles.yaml (not "gemini")
-                if text_gen != "gemini" and not use_ollama:
-                    use_ollama = True
-                    print(f"[INFO] Using Ollama model '{text_gen}' from config/profiles.yaml")
-        except Exception as e:
-            print(f"[WARN] Could not read config/profiles.yaml: {e}")
+        text_gen = (_load_profile().get("llm") or {}).get("text_generation", "gemini")
+        # Use Ollama if configured in profiles.yaml (not "gemini")
+        if text_gen != "gemini" and not use_ollama:
+            use_ollama = True
+            print(f"[INFO] Using Ollama model '{text_gen}' from config/profiles.yaml")
         
         self.perception = Perception(perception_prompt_path, use_ollama=use_ollama)
         self.decision = Decision(decision_prompt_path, multi_mcp, use_ollama=use_ollama)
         self.strategy = strategy
         self.multi_mcp = multi_mcp
+        self.answer_cache_ttl = self.ANSWER_CACHE_TTL if answer_cache_ttl is None else answer_cache_ttl
+    
+    # Retrieval agents are created on first use and shared by all AgentLoop instances
+    @cached_property
+    def graph_agent(self) -> GraphAgent:
+        return _get_or_create("graph", GraphAgent)
+    
+    @cached_property
+    def retriever_agent(self) -> RetrieverAgent:
+        return _get_or_create("retriever", lambda: RetrieverAgent(graph_agent=self.graph_agent))
+    
+    @cached_property
+    def triplet_agent(self) -> TripletAgent:
+        return _get_or_create("triplet", TripletAgent)
+    
+    @cached_property
+    def critic_agent(self) -> CriticAgent:
+        return _get_or_create("critic", CriticAgent)
+    
+    @cached_property
+    def formatter_agent(self) -> FormatterAgent:
+        return _get_or_create("formatter", FormatterAgent)
+    
+    @cached_property
+    def answer_cache(self) -> AnswerCache:
+        return AnswerCache(ttl=self.answer_cache_ttl)
+    
+    def _remember_answer(self, query: str, ctx: ContextManager, result, return_execution_details: bool):
+        """Cache a finished run's result for repeats of query, unless a human was involved; returns result."""
+        if self.answer_cache_ttl > 0 and not ctx.globals_schema.get("human_in_loop_triggered"):
+            self.answer_cache.put(query, result, variant=return_execution_details)
+        return result
+    
+    # Kept for the life of the loop so its query cache and indices carry over between runs
+    @cached_property
+    def memory_search(self) -> MemorySearch:
+        return MemorySearch()
+    
+    def _perception_version(self) -> tuple:
+        """What, besides the inputs, decides a perception answer: prompt file and model."""
+        return (file_version(self.perception.perception_prompt_path), getattr(self.perception, "model", None))
+    
+    def _decision_version(self) -> tuple:
+        """Prompt file, model and available tools, which all shape the generated plan."""
+        return (
+            file_version(self.decision.decision_prompt_path),
+            getattr(self.decision, "model", None),
+            tuple(sorted(getattr(self.multi_mcp, "tool_map", None) or ())),
+        )
+    
+    def _llm_provider(self) -> str:
+        """LLM backend the agents were configured with, for execution details."""
+        if getattr(self.perception, "use_ollama", False) or getattr(self.decision, "use_ollama", False):
+            return "Ollama"
+        return "Google API"
+    
+    def _build_execution_details(
+        self,
+        final_answer: str,
+        *,
+        ctx: Optional[ContextManager] = None,
+        completed_steps: Optional[list] = None,
+        node_execution_trace: Optional[List[TraceRecord]] = None,
+        tools_used=(),
+        default_tool: str = "agent_loop",
+        source: Optional[str] = None,
+        llm_provider: Optional[str] = None,
+        api_call_type: Optional[str] = None,
+        hil_triggered: bool = False,
+        hil_reason: str = ""
+    ) -> dict:
+        """
+        Execution details returned by run(return_execution_details=True), for CSV logging.
         
-        # Initialize retrieval agents
-        self.graph_agent = GraphAgent()
-        self.retriever_agent = RetrieverAgent(graph_agent=self.graph_agent)
-        self.triplet_agent = TripletAgent()
-        self.critic_agent = CriticAgent()
-        self.formatter_agent = FormatterAgent()
-    
-    async def run(self, query: str, return_execution_details: bool = False) -> str | dict:
+        Args:
+            final_answer: The run's answer
+            ctx: Run context; its plan graph supplies plan_steps (none if omitted)
+            completed_steps: Steps that succeeded, as recorded by run()
+            node_execution_trace: Nodes executed, in order
+            tools_used: Tools to report (sorted); the first is also reported as tool_name
+            default_tool: tool_name when tools_used is empty
+            source: Where the answer came from (memory, memory_hint, ...), if not execution
+            llm_provider: Overrides the configured provider (e.g. "none" when no LLM was used)
+            api_call_type: Overrides "tool_execution"/"llm_call" (chosen by whether tools were used)
+            hil_triggered: Whether human-in-loop was triggered
+            hil_reason: Why it was triggered
+        
+        Returns:
+            Execution details dict
+        """
+        completed_steps = completed_steps or []
+        node_execution_trace = node_execution_trace or []
+        # Sorted: tools_used is often a set, whose order (and so tool_name) varied between processes
+        tools = sorted(tools_used)
+        plan_graph = ctx.plan_graph if ctx is not None else None
+        plan_steps = [
+            f"Step {node_id}: {node.description}"
+            for node_id, node in (plan_graph.nodes.items() if plan_graph else ())
+        ]
+        nodes_called_list = [trace.node_id for trace in node_execution_trace]
+        step_details_list = [
+            {
+                "node_id": step.get("node_id", ""),
+                "description": step.get("description", ""),
+                "variant": step.get("variant_succeeded", ""),
+                "result_preview": str(step.get("result", ""))[:100]
+            }
+            for step in completed_steps
+        ]
+        final_state = {
+            "final_answer": final_answer,
+            "nodes_executed": len(nodes_called_list),
+            "steps_completed": len(completed_steps)
+        }
+        details = {"answer": final_answer}
+        if source:
+            details["source"] = source
+            final_state["source"] = source
+        details.update({
+            "plan_steps": plan_steps,
+            "plan_step_count": len(plan_steps),
+            "tools_used": tools,
+            "tool_name": next(iter(tools), default_tool),
+            "nodes_called": nodes_called_list,
+            "nodes_exe_path": "->".join(nodes_called_list),
+            "node_execution_trace": node_execution_trace,
+            "completed_steps": completed_steps,
+            "step_details": _jdumps(step_details_list),
+            "nodes_called_json": _jdumps(nodes_called_list),
+            "node_count": len(nodes_called_list),
+            "final_state": final_state,
+            "llm_provider": llm_provider or self._llm_provider(),
+            "api_call_type": api_call_type or ("tool_execution" if tools else "llm_call"),
+            "human_in_loop_triggered": hil_triggered,
+            "hil_reason": hil_reason
+        })
+        return details
+    
+    async def _execute_wave(
+        self, ready: List[str], ctx, query: str, completed_steps: list, ask_human: bool = True
+    ) -> list:
+        """Run a set of ready nodes concurrently; results are in the order of ready."""
+        if len(ready) == 1:
+            # Every wave of a linear plan: nothing to overlap, so skip gather's task wrapping
+            return [await self._execute_node(ready[0], ctx, query, completed_steps, ask_human)]
+        return await asyncio.gather(*[
+            self._execute_node(node_id, ctx, query, completed_steps, ask_human) for node_id in ready
+        ])
+    
+    async def _execute_node(
+        self, node_id: str, ctx, query: str, completed_steps: list, ask_human: bool = True
+    ) -> dict:
+        """Run one ready node's code variants; returns execute_step()'s result dict."""
+        node = ctx.plan_graph.get_node(node_id)
+        logger.info("\n[Step %s] %s\nTrying %d variants...", node_id, node.description, len(node.variants))
+        return await execute_step(
+            node,
+            ctx,
+            self.multi_mcp,
+            step_description=node.description,
+            query=query,
+            completed_steps=completed_steps,
+            ask_human=ask_human
+        )
+    
+    async def run(self, query: str, return_execution_details: bool = False, memory_hint: bool = False) -> str | dict:
         """
         Run the graph-native agent loop.
         
         Args:
             query: User query
             return_execution_details: If True, return dict with answer and execution details
+            memory_hint: If True, the caller expects a memory hit (e.g. a repeated query); a
+                near-identical remembered query is answered from memory, skipping perception,
+                planning and execution
         
         Returns:
             Final answer string, or dict with 'answer' and 'execution_details' if return_execution_details=True
         """
-        print(f"\n=== V2 GRAPH-NATIVE AGENT SESSION ===")
-        print(f"Query: {query}")
+        print(f"\n=== V2 GRAPH-NATIVE AGENT SESSION ===\nQuery: {query}")
         
         # Initialize context manager
         ctx = ContextManager()
+        # One id for the whole run: human-in-loop prompts and the saved session log share it. Kept
+        # out of globals, whose keys the formatter may list in an answer
+        session_id = str(uuid.uuid4())
         
         # Store query in context for error logging
         ctx.update_globals({"query": query})
         
         # Step -1: Memory Search
         # For simple math queries, skip memory and always execute
-        import re
         query_lower = query.lower()
-        is_simple_math = bool(re.search(r'\d+\s*[+\-*/]\s*\d+', query))
+        is_simple_math = bool(_SIMPLE_MATH_RE.search(query))
+        
+        # A bare "a op b" query has one right answer: compute it without any LLM or tool call
+        arithmetic = _evaluate_arithmetic(query) if is_simple_math else None
+        if arithmetic is not None:
+            tool_name, call, final_answer = arithmetic
+            print(f"\n[INFO] Simple arithmetic answered locally: {call} = {final_answer}")
+            ctx.update_globals({"final_answer": final_answer, "last_result": final_answer})
+            if not return_execution_details:
+                return final_answer
+            return self._build_execution_details(
+                final_answer,
+                completed_steps=[{
+                    "node_id": "math_0",
+                    "description": call,
+                    "result": final_answer,
+                    "variant_succeeded": "math_0A"
+                }],
+                node_execution_trace=[TraceRecord("math_0", "math_0A")],
+                tools_used=[tool_name],
+                source="local_arithmetic",
+                llm_provider="none",
+                api_call_type="local_computation"
+            )
+        
+        # Repeat of a query this loop answered recently: skip the whole pipeline. Not for memory_hint
+        # runs, whose caller wants the repeat answered through memory search
+        if self.answer_cache_ttl > 0 and not memory_hint:
+            cached_result = self.answer_cache.get(query, variant=return_execution_details)
+            if cached_result is not None:
+                print("[INFO] Answer cache: reusing the answer from an earlier run of this query.")
+                if isinstance(cached_result, dict):
+                    cached_result["source"] = "answer_cache"
+                    cached_result["api_call_type"] = "answer_cache"
+                return cached_result
         
         if is_simple_math:
             print(f"\n[INFO] Simple math query detected. Skipping memory search and forcing execution.")
             memory_results = []  # Force execution for simple math - don't even create searcher
+            root_prompt = None
         else:
             print(f"\nSearching Recent Conversation History")
-            searcher = MemorySearch()
-            memory_results = searcher.search_memory(query, skip_load=False)  # Explicitly allow loading
+            searcher = self.memory_search
+            # Root perception needs the memory results, but reading its prompt does not: do both at once
+            memory_results, root_prompt = await asyncio.gather(
+                asyncio.to_thread(searcher.search_memory, query, skip_load=False),  # Explicitly allow loading
+                asyncio.to_thread(self.perception.load_prompt)
+            )
             if not memory_results:
                 print("No matching memory entries found.")
             else:
-                print(f"\nTop {len(memory_results)} Matches:")
-                for i, res in enumerate(memory_results[:3], 1):
-                    print(f"[{i}] Query: {res.get('query', '')[:60]}...")
-                    print(f"    Answer: {res.get('solution_summary', '')[:60]}...")
+                # One write for the whole block rather than a print per line
+                matches = "".join(
+                    f"\n[{i}] Query: {res.get('query', '')[:60]}..."
+                    f"\n    Answer: {res.get('solution_summary', '')[:60]}..."
+                    for i, res in enumerate(memory_results[:3], 1)
+                )
+                print(f"\nTop {len(memory_results)} Matches:{matches}")
+        
+        # Hinted repeat query: reuse a high-confidence memory answer without planning
+        if memory_hint and memory_results:
+            best_match = memory_results[0]
+            cached_answer = best_match.get("solution_summary") or best_match.get("summary", "")
+            similarity = fuzz.ratio(query_lower.strip(), best_match.get("query", "").lower().strip())
+            if cached_answer and similarity >= self.MEMORY_HINT_MIN_RATIO:
+                print(f"[INFO] Memory hint: reusing answer from matching query (similarity {similarity:.0f}).")
+                if not return_execution_details:
+                    return cached_answer
+                return self._build_execution_details(
+                    cached_answer,
+                    tools_used=["memory_search"],
+                    source="memory_hint",
+                    api_call_type="memory_retrieval"
+                )
         
         # Store memory results in context for formatter to use (but don't set final_answer yet)
         if memory_results:
@@ -118,7 +651,15 @@ class AgentLoop:
         
         # Step 0: Root Perception
         print(f"\n[Perception] Analyzing root query...")
-        p0 = self.perception.perceive_root(query, memory_results)
+        memory_key = tuple(
+            (res.get("query"), res.get("result_requirement"), res.get("solution_summary"))
+            for res in memory_results
+        )
+        p0 = await cached(
+            ("root_perception", query, memory_key, self._perception_version()),
+            lambda: self.perception.perceive_root(query, memory_results, prompt_template=root_prompt),
+            cacheable=_perception_cacheable
+        )
         ctx.log("root_perception", route=p0.route.value, goal_met=p0.goal_met)
         
         # For simple math queries, ALWAYS force execution (skip early return)
@@ -141,45 +682,14 @@ class AgentLoop:
             
             # Build execution_details for early return
             if return_execution_details:
-                import json
-                plan_steps = []
-                if ctx.plan_graph and ctx.plan_graph.nodes:
-                    for node_id, node in ctx.plan_graph.nodes.items():
-                        plan_steps.append(f"Step {node_id}: {node.description}")
-                
-                # Extract from memory
-                tools_used = set()
-                if memory_results:
-                    tools_used.add("memory_search")
-                
-                llm_provider = "Google API"
-                if hasattr(self.perception, 'use_ollama') and self.perception.use_ollama:
-                    llm_provider = "Ollama"
-                
-                execution_details = {
-                    "answer": final_answer,
-                    "plan_steps": plan_steps,
-                    "plan_step_count": len(plan_steps),
-                    "tools_used": list(tools_used),
-                    "tool_name": list(tools_used)[0] if tools_used else "memory_search",
-                    "nodes_called": [],
-                    "nodes_exe_path": "",
-                    "node_execution_trace": [],
-                    "completed_steps": [],
-                    "step_details": json.dumps([]),
-                    "nodes_called_json": json.dumps([]),
-                    "final_state": {
-                        "final_answer": final_answer,
-                        "nodes_executed": 0,
-                        "steps_completed": 0,
-                        "source": "memory"
-                    },
-                    "llm_provider": llm_provider,
-                    "api_call_type": "memory_retrieval",
-                    "human_in_loop_triggered": False,
-                    "hil_reason": ""
-                }
-                return execution_details
+                return self._build_execution_details(
+                    final_answer,
+                    ctx=ctx,
+                    tools_used=["memory_search"] if memory_results else [],
+                    default_tool="memory_search",
+                    source="memory",
+                    api_call_type="memory_retrieval"
+                )
             
             return final_answer
         elif p0.route == Route.SUMMARIZE and p0.goal_met and not memory_results:
@@ -190,346 +700,316 @@ class AgentLoop:
         
         # Step 1: Build initial plan graph
         print(f"\n[Decision] Building initial plan graph...")
-        ctx.plan_graph = self.decision.build_initial_plan_graph(query)
+        ctx.plan_graph = _acyclic(await plan_template_cache.get_or_build(
+            query,
+            lambda: self.decision.build_initial_plan_graph(query),
+            key_extra=(self.strategy, self._decision_version()),
+            cacheable=_plan_cacheable
+        ))
         ctx.log("plan_graph_created", node_count=len(ctx.plan_graph.nodes))
+        # Decision gets the same input at every rebuild in this run (human-in-loop suggestions and
+        # re-plans), so keep the plan as built and hand out copies instead of asking it again
+        initial_plan = copy.deepcopy(ctx.plan_graph)
+        initial_plan_steps = _plan_descriptions(initial_plan, skip_status=None)
         
-        # Step 2: Execute graph
-        current_node_id = ctx.plan_graph.start_node_id
+        # Step 2: Execute graph in waves: every node whose parents are done runs concurrently
         completed_steps = []
-        node_execution_trace = []  # Track node_id and variant used
+        node_execution_trace: List[TraceRecord] = []  # Track node_id and variant used
         max_steps = 10  # Maximum steps before triggering HIL
         consecutive_failures = 0  # Track consecutive failures
         max_consecutive_failures = 3  # Trigger HIL after 3 consecutive failures
         
-        while current_node_id is not None:
-            node = ctx.plan_graph.get_node(current_node_id)
-            if not node:
-                print(f"Node {current_node_id} not found. Stopping.")
-                break
-            
-            # Skip if already completed or skipped
-            if node.status in [StepStatus.COMPLETED, StepStatus.SKIPPED]:
-                print(f"Node {current_node_id} already {node.status.name}. Moving to next...")
-                current_node_id = self.decision.select_next_node(
-                    ctx.plan_graph,
-                    current_node_id,
-                    PerceptionResult(Route.DECISION, False)
-                )
-                continue
-            
-            # Execute step
-            print(f"\n[Step {current_node_id}] {node.description}")
-            print(f"Trying {len(node.variants)} variants...")
-            
-            execution_result = await execute_step(
-                node,
-                ctx,
-                self.multi_mcp,
-                step_description=node.description,
-                query=query,
-                completed_steps=completed_steps
-            )
-            
-            # Track completed step and node execution
-            variant_succeeded = execution_result.get("variant_succeeded", f"{current_node_id}A")
-            node_execution_trace.append({
-                "node_id": current_node_id,
-                "variant": variant_succeeded
-            })
-            
-            if execution_result.get("status") == "success":
-                result_value = execution_result.get("result", "")
-                # Store result in context for ALL queries (not just simple math)
-                ctx.update_globals({
-                    "last_result": str(result_value),
-                    "last_node": current_node_id
-                })
-                
-                completed_steps.append({
-                    "node_id": current_node_id,
-                    "description": node.description,
-                    "result": result_value,
-                    "variant_succeeded": variant_succeeded
-                })
-            
-            # Perception on step output
-            step_output = str(execution_result.get("result", ""))
-            p = self.perception.perceive_step_output(current_node_id, step_output, ctx.get_globals_schema())
-            ctx.log("step_perception", node_id=current_node_id, route=p.route.value, goal_met=p.goal_met)
-            
-            # For simple math queries, use execution result directly
-            import re
-            is_simple_math = bool(re.search(r'\d+\s*[+\-*/]\s*\d+', query))
-            if is_simple_math and execution_result.get("status") == "success":
-                # For simple math, use the execution result as final answer
-                result_value = execution_result.get("result", "")
-                if result_value:
-                    print(f"[INFO] Simple math execution successful. Result: {result_value}")
-                    ctx.update_globals({"final_answer": str(result_value), "last_result": str(result_value)})
-                    final_answer = self.formatter_agent.format_report(
-                        ctx.get_globals_schema(),
-                        "Produce concise answer from execution results",
-                        query=query
+        speculation = None  # (plan graph, node ids, forced, staged context, task) of a wave started early
+        frontier = None  # ready set after the last wave, kept from its children; None: scan the graph
+        try:
+            while True:
+                if speculation is not None and speculation[0] is ctx.plan_graph:
+                    # Adopt the wave started while the previous one was being perceived; anything else
+                    # that became ready meanwhile (e.g. a fallback node) runs alongside it
+                    _, ready, forced, staged, spec_task = speculation
+                    speculation = None
+                    # A forced successor was the only node the previous wave could unblock
+                    extra = [] if forced else [node_id for node_id in frontier if node_id not in ready]
+                    if extra:
+                        spec_results, extra_results = await asyncio.gather(
+                            spec_task, self._execute_wave(extra, ctx, query, completed_steps)
+                        )
+                    else:
+                        spec_results, extra_results = await spec_task, []
+                    # Speculative nodes never ask the user for a result; now that the wave is
+                    # adopted, a failed one is re-run normally so it can fall back to the user
+                    failed = tuple(
+                        node_id for node_id, result in zip(ready, spec_results) if result.get("status") != "success"
                     )
-                    ctx.update_globals({"final_answer": final_answer})
-                    
-                    # Build execution_details for early return
-                    if return_execution_details:
-                        import json
-                        plan_steps = []
-                        if ctx.plan_graph and ctx.plan_graph.nodes:
-                            for node_id, node in ctx.plan_graph.nodes.items():
-                                plan_steps.append(f"Step {node_id}: {node.description}")
-                        
-                        # Extract tools used from execution
-                        tools_used = set()
-                        for step in completed_steps:
-                            result_str = str(step.get("result", "")).lower()
-                            desc_str = str(step.get("description", "")).lower()
-                            for op in ["add", "subtract", "multiply", "divide", "power", "factorial", "gcd", "sqrt", "cbrt", "remainder"]:
-                                if op in desc_str:
-                                    tools_used.add(op)
-                                    break
-                        
-                        nodes_called_list = [trace["node_id"] for trace in node_execution_trace]
-                        nodes_exe_path = "->".join(nodes_called_list) if nodes_called_list else ""
-                        
-                        step_details_list = []
-                        for step in completed_steps:
-                            step_details_list.append({
-                                "node_id": step.get("node_id", ""),
-                                "description": step.get("description", ""),
-                                "variant": step.get("variant_succeeded", ""),
-                                "result_preview": str(step.get("result", ""))[:100]
-                            })
-                        
-                        llm_provider = "Google API"
-                        if hasattr(self.perception, 'use_ollama') and self.perception.use_ollama:
-                            llm_provider = "Ollama"
-                        elif hasattr(self.decision, 'use_ollama') and self.decision.use_ollama:
-                            llm_provider = "Ollama"
-                        
-                        execution_details = {
-                            "answer": final_answer,
-                            "plan_steps": plan_steps,
-                            "plan_step_count": len(plan_steps),
-                            "tools_used": list(tools_used),
-                            "tool_name": list(tools_used)[0] if tools_used else "agent_loop",
-                            "nodes_called": nodes_called_list,
-                            "nodes_exe_path": nodes_exe_path,
-                            "node_execution_trace": node_execution_trace,
-                            "completed_steps": completed_steps,
-                            "step_details": json.dumps(step_details_list),
-                            "nodes_called_json": json.dumps(nodes_called_list),
-                            "final_state": {
-                                "final_answer": final_answer,
-                                "nodes_executed": len(nodes_called_list),
-                                "steps_completed": len(completed_steps)
-                            },
-                            "llm_provider": llm_provider,
-                            "api_call_type": "tool_execution" if tools_used else "llm_call",
-                            "human_in_loop_triggered": False,
-                            "hil_reason": ""
-                        }
-                        return execution_details
-                    
-                    return final_answer
-            
-            # For non-simple-math queries, also store result if execution succeeded
-            if execution_result.get("status") == "success" and not is_simple_math:
-                result_value = execution_result.get("result", "")
-                if result_value and result_value != "Tool failed, no user input provided":
-                    # Store as potential final answer
-                    ctx.update_globals({"last_result": str(result_value)})
-            
-            # If goal met, summarize
-            if p.route == Route.SUMMARIZE and p.goal_met:
-                print(f"\nGoal achieved at step {current_node_id}. Summarizing...")
-                final_answer = self.formatter_agent.format_report(
-                    ctx.get_globals_schema(),
-                    p.instruction_to_summarize,
-                    query=query
-                )
-                # Store final answer in context
-                ctx.update_globals({"final_answer": final_answer})
-                return final_answer
+                    staged.commit(skip=failed)
+                    if failed:
+                        rerun = dict(zip(failed, await self._execute_wave(list(failed), ctx, query, completed_steps)))
+                        spec_results = [rerun.get(node_id, result) for node_id, result in zip(ready, spec_results)]
+                    ready, wave_results = ready + extra, list(spec_results) + list(extra_results)
+                else:
+                    # No speculation, or the plan graph was replaced since it started
+                    await _cancel_speculation(speculation)
+                    speculation = None
+                    ready = frontier if frontier is not None else _ready_nodes(ctx.plan_graph)
+                    if not ready:
+                        break
+                    wave_results = await self._execute_wave(ready, ctx, query, completed_steps)
             
-            # Handle failure
-            if node.status == StepStatus.FAILED:
-                consecutive_failures += 1
-                print(f"Step {current_node_id} failed. Adding fallback...")
-                fallback_id = self.decision.add_fallback_node(ctx.plan_graph, current_node_id)
-                
-                # Check if fallback was successfully added
-                if fallback_id is None:
-                    # No fallback available - trigger HIL
-                    print(f"\n[WARNING] Step {current_node_id} failed and no fallback available. Triggering Human-in-Loop...")
-                    ctx.update_globals({"human_in_loop_triggered": True, "hil_reason": "no_fallback_available"})
+                frontier = None
+                # Results are handled one at a time, in plan order, so traces stay deterministic
+                for current_node_id, execution_result in zip(ready, wave_results):
+                    node = ctx.plan_graph.get_node(current_node_id)
                     
-                    # Build context for HIL
-                    current_plan = [n.description for n in ctx.plan_graph.nodes.values() if n.status != StepStatus.SKIPPED]
-                    context = {
-                        "reason": f"Step {current_node_id} failed and no fallback available",
-                        "current_plan": current_plan,
-                        "step_count": len(completed_steps),
-                        "max_steps": max_steps,
-                        "query": query,
-                        "failed_node": current_node_id,
-                        "consecutive_failures": consecutive_failures
-                    }
-                    
-                    # Generate suggested plan
-                    suggested_plan = self.decision.build_initial_plan_graph(query)
-                    suggested_plan_steps = [n.description for n in suggested_plan.nodes.values()]
-                    
-                    # Trigger HIL
-                    session_id = ctx.globals_schema.get("session_id", str(uuid.uuid4()))
-                    new_plan, user_plan_dict = ask_user_for_plan(context, suggested_plan_steps, session_id)
+                    # Track completed step and node execution
+                    variant_succeeded = execution_result.get("variant_succeeded", f"{current_node_id}A")
+                    node_execution_trace.append(TraceRecord(current_node_id, variant_succeeded))
+                
+                    if execution_result.get("status") == "success":
+                        result_value = execution_result.get("result", "")
+                        # Store result in context for ALL queries (not just simple math)
+                        ctx.update_globals({
+                            "last_result": str(result_value),
+                            "last_node": current_node_id
+                        })
                     
-                    # If user provided a plan, use it
-                    if new_plan and user_plan_dict:
-                        # User provided JSON plan with final_answer
-                        final_answer = user_plan_dict.get('final_answer', '')
-                        if final_answer:
-                            ctx.update_globals({"final_answer": final_answer})
-                            return final_answer
-                    elif new_plan and new_plan != suggested_plan_steps:
-                        # User provided custom plan - rebuild graph with new plan
-                        print(f"\n[INFO] Rebuilding plan graph with user-provided plan ({len(new_plan)} steps)...")
-                        # Rebuild plan graph using the query with modified context
-                        ctx.plan_graph = self.decision.build_initial_plan_graph(query)
-                        current_node_id = ctx.plan_graph.start_node_id
-                        consecutive_failures = 0  # Reset failure counter
-                        continue
-                    else:
-                        # User accepted suggested plan or no input (non-interactive mode)
-                        print(f"\n[INFO] Using suggested plan or default (non-interactive mode)...")
-                        ctx.plan_graph = suggested_plan
-                        current_node_id = ctx.plan_graph.start_node_id
-                        consecutive_failures = 0
-                        continue
+                        completed_steps.append({
+                            "node_id": current_node_id,
+                            "description": node.description,
+                            "result": result_value,
+                            "variant_succeeded": variant_succeeded
+                        })
+                        # Show each step's partial answer as soon as it is in, not only at the end
+                        if logger.isEnabledFor(logging.INFO):
+                            partial = self.formatter_agent.format_step(
+                                StepEvent(current_node_id, node.description, result_value), query=query
+                            )
+                            logger.info("[PARTIAL] %s", partial)
                 
-                ctx.log("fallback_added", failed_node=current_node_id, fallback_node=fallback_id)
-                current_node_id = fallback_id
-            else:
-                # Reset consecutive failures on success
-                if execution_result.get("status") == "success":
-                    consecutive_failures = 0
+                    # While the wave's last output is perceived, start the nodes it unblocks; their results
+                    # are held back until the next iteration adopts them (or dropped if the run ends/re-plans)
+                    if self.SPECULATIVE_EXECUTION and current_node_id == ready[-1]:
+                        forced = _forced_successor(ctx.plan_graph, ready)
+                        speculative_ready = [forced] if forced else _unblocked(ctx.plan_graph, ready)
+                        if speculative_ready:
+                            staged = _StagedContext(ctx)
+                            speculation = (
+                                ctx.plan_graph,
+                                speculative_ready,
+                                forced is not None,
+                                staged,
+                                asyncio.ensure_future(self._execute_wave(
+                                    speculative_ready, staged, query, completed_steps, ask_human=False
+                                ))
+                            )
                 
-                # Check for consecutive failures or step limit
-                if consecutive_failures >= max_consecutive_failures:
-                    print(f"\n[WARNING] {consecutive_failures} consecutive failures detected. Triggering Human-in-Loop...")
-                    ctx.update_globals({"human_in_loop_triggered": True, "hil_reason": "consecutive_failures"})
-                    
-                    current_plan = [n.description for n in ctx.plan_graph.nodes.values() if n.status != StepStatus.SKIPPED]
-                    context = {
-                        "reason": f"{consecutive_failures} consecutive step failures",
-                        "current_plan": current_plan,
-                        "step_count": len(completed_steps),
-                        "max_steps": max_steps,
-                        "query": query,
-                        "consecutive_failures": consecutive_failures
-                    }
-                    
-                    suggested_plan = self.decision.build_initial_plan_graph(query)
-                    suggested_plan_steps = [n.description for n in suggested_plan.nodes.values()]
-                    
-                    session_id = ctx.globals_schema.get("session_id", str(uuid.uuid4()))
-                    new_plan, user_plan_dict = ask_user_for_plan(context, suggested_plan_steps, session_id)
-                    
-                    if new_plan and user_plan_dict:
-                        final_answer = user_plan_dict.get('final_answer', '')
-                        if final_answer:
+                    # Perception on step output (not needed when a simple math result ends the run below)
+                    if is_simple_math and execution_result.get("status") == "success" and execution_result.get("result", ""):
+                        p = _SKIP_PERCEPTION
+                    else:
+                        # Perception only needs a head/tail sample of the output; the digest keys the cache
+                        step_output = summarize(
+                            execution_result.get("result", ""),
+                            head=self.STEP_OUTPUT_HEAD_CHARS,
+                            tail=self.STEP_OUTPUT_TAIL_CHARS
+                        )
+                        globals_schema = ctx.get_globals_schema()
+                        p = await cached(
+                            ("step_perception", current_node_id, step_output.digest,
+                             self.STEP_OUTPUT_HEAD_CHARS, self.STEP_OUTPUT_TAIL_CHARS, self._perception_version()),
+                            lambda: self.perception.aperceive_step_output(current_node_id, step_output, globals_schema),
+                            cacheable=_perception_cacheable
+                        )
+                        ctx.log("step_perception", node_id=current_node_id, route=p.route.value, goal_met=p.goal_met)
+                
+                    # For simple math queries, use execution result directly
+                    if is_simple_math and execution_result.get("status") == "success":
+                        # For simple math, use the execution result as final answer
+                        result_value = execution_result.get("result", "")
+                        if result_value:
+                            logger.info("[INFO] Simple math execution successful. Result: %s", result_value)
+                            ctx.update_globals({"final_answer": str(result_value), "last_result": str(result_value)})
+                            final_answer = self.formatter_agent.format_report(
+                                ctx.get_globals_schema(),
+                                "Produce concise answer from execution results",
+                                query=query
+                            )
                             ctx.update_globals({"final_answer": final_answer})
+                        
+                            # Build execution_details for early return
+                            if return_execution_details:
+                                return self._build_execution_details(
+                                    final_answer,
+                                    ctx=ctx,
+                                    completed_steps=completed_steps,
+                                    node_execution_trace=node_execution_trace,
+                                    tools_used=_tools_used(completed_steps)
+                                )
+                        
                             return final_answer
-                    elif new_plan and new_plan != suggested_plan_steps:
-                        print(f"\n[INFO] Rebuilding plan graph with user-provided plan...")
-                        ctx.plan_graph = self.decision.build_initial_plan_graph(query)
-                        current_node_id = ctx.plan_graph.start_node_id
-                        consecutive_failures = 0
-                        continue
                 
-                # Check step limit
-                if len(completed_steps) >= max_steps and not p.goal_met:
-                    print(f"\n[WARNING] Maximum steps ({max_steps}) reached without goal achievement. Triggering Human-in-Loop...")
-                    ctx.update_globals({"human_in_loop_triggered": True, "hil_reason": "max_steps_reached"})
+                    # If goal met, summarize
+                    if p.route == Route.SUMMARIZE and p.goal_met:
+                        logger.info("\nGoal achieved at step %s. Summarizing...", current_node_id)
+                        final_answer = self.formatter_agent.format_report(
+                            ctx.get_globals_schema(),
+                            p.instruction_to_summarize,
+                            query=query
+                        )
+                        # Store final answer in context
+                        ctx.update_globals({"final_answer": final_answer})
+                        return self._remember_answer(query, ctx, final_answer, return_execution_details)
+                
+                    # Handle failure
+                    if node.status == StepStatus.FAILED:
+                        consecutive_failures += 1
+                        logger.info("Step %s failed. Adding fallback...", current_node_id)
+                        fallback_id = self.decision.add_fallback_node(ctx.plan_graph, current_node_id)
                     
-                    current_plan = [n.description for n in ctx.plan_graph.nodes.values() if n.status != StepStatus.SKIPPED]
-                    context = {
-                        "reason": f"Maximum steps ({max_steps}) reached without goal achievement",
-                        "current_plan": current_plan,
-                        "step_count": len(completed_steps),
-                        "max_steps": max_steps,
-                        "query": query
-                    }
+                        # Check if fallback was successfully added
+                        if fallback_id is None:
+                            # No fallback available - trigger HIL
+                            logger.warning("\n[WARNING] Step %s failed and no fallback available. Triggering Human-in-Loop...", current_node_id)
+                            ctx.update_globals({"human_in_loop_triggered": True, "hil_reason": "no_fallback_available"})
+                        
+                            # Build context for HIL
+                            current_plan = _plan_descriptions(ctx.plan_graph)
+                            context = {
+                                "reason": f"Step {current_node_id} failed and no fallback available",
+                                "current_plan": current_plan,
+                                "step_count": len(completed_steps),
+                                "max_steps": max_steps,
+                                "query": query,
+                                "failed_node": current_node_id,
+                                "consecutive_failures": consecutive_failures
+                            }
+                        
+                            # Generate suggested plan
+                            suggested_plan = copy.deepcopy(initial_plan)
+                            suggested_plan_steps = initial_plan_steps
+                        
+                            # Trigger HIL
+                            new_plan, user_plan_dict = ask_user_for_plan(context, suggested_plan_steps, session_id)
+                        
+                            # If user provided a plan, use it
+                            if new_plan and user_plan_dict:
+                                # User provided JSON plan with final_answer
+                                final_answer = user_plan_dict.get('final_answer', '')
+                                if final_answer:
+                                    ctx.update_globals({"final_answer": final_answer})
+                                    return final_answer
+                            elif new_plan and new_plan != suggested_plan_steps:
+                                # User provided custom plan - rebuild graph with new plan
+                                logger.info("\n[INFO] Rebuilding plan graph with user-provided plan (%d steps)...", len(new_plan))
+                                ctx.plan_graph = suggested_plan
+                                consecutive_failures = 0  # Reset failure counter
+                                break  # new plan graph: recompute the ready set
+                            else:
+                                # User accepted suggested plan or no input (non-interactive mode)
+                                logger.info("\n[INFO] Using suggested plan or default (non-interactive mode)...")
+                                ctx.plan_graph = suggested_plan
+                                consecutive_failures = 0
+                                break  # new plan graph: recompute the ready set
                     
-                    suggested_plan = self.decision.build_initial_plan_graph(query)
-                    suggested_plan_steps = [n.description for n in suggested_plan.nodes.values()]
+                        # The fallback node becomes ready in the next wave
+                        ctx.log("fallback_added", failed_node=current_node_id, fallback_node=fallback_id)
+                    else:
+                        # Reset consecutive failures on success
+                        if execution_result.get("status") == "success":
+                            consecutive_failures = 0
                     
-                    session_id = ctx.globals_schema.get("session_id", str(uuid.uuid4()))
-                    new_plan, user_plan_dict = ask_user_for_plan(context, suggested_plan_steps, session_id)
+                        # Check for consecutive failures or step limit
+                        if consecutive_failures >= max_consecutive_failures:
+                            logger.warning("\n[WARNING] %d consecutive failures detected. Triggering Human-in-Loop...", consecutive_failures)
+                            ctx.update_globals({"human_in_loop_triggered": True, "hil_reason": "consecutive_failures"})
+                        
+                            current_plan = _plan_descriptions(ctx.plan_graph)
+                            context = {
+                                "reason": f"{consecutive_failures} consecutive step failures",
+                                "current_plan": current_plan,
+                                "step_count": len(completed_steps),
+                                "max_steps": max_steps,
+                                "query": query,
+                                "consecutive_failures": consecutive_failures
+                            }
+                        
+                            suggested_plan = copy.deepcopy(initial_plan)
+                            suggested_plan_steps = initial_plan_steps
+                        
+                            new_plan, user_plan_dict = ask_user_for_plan(context, suggested_plan_steps, session_id)
+                        
+                            if new_plan and user_plan_dict:
+                                final_answer = user_plan_dict.get('final_answer', '')
+                                if final_answer:
+                                    ctx.update_globals({"final_answer": final_answer})
+                                    return final_answer
+                            elif new_plan and new_plan != suggested_plan_steps:
+                                logger.info("\n[INFO] Rebuilding plan graph with user-provided plan...")
+                                ctx.plan_graph = suggested_plan
+                                consecutive_failures = 0
+                                break  # new plan graph: recompute the ready set
                     
-                    if new_plan and user_plan_dict:
-                        final_answer = user_plan_dict.get('final_answer', '')
-                        if final_answer:
-                            ctx.update_globals({"final_answer": final_answer})
-                            return final_answer
-                    elif new_plan and new_plan != suggested_plan_steps:
-                        print(f"\n[INFO] Rebuilding plan graph with user-provided plan...")
-                        ctx.plan_graph = self.decision.build_initial_plan_graph(query)
-                        current_node_id = ctx.plan_graph.start_node_id
-                        consecutive_failures = 0
-                        continue
-                
-                # Move to next node
-                current_node_id = self.decision.select_next_node(
-                    ctx.plan_graph,
-                    current_node_id,
-                    p
-                )
+                        # Check step limit
+                        if len(completed_steps) >= max_steps and not p.goal_met:
+                            logger.warning("\n[WARNING] Maximum steps (%d) reached without goal achievement. Triggering Human-in-Loop...", max_steps)
+                            ctx.update_globals({"human_in_loop_triggered": True, "hil_reason": "max_steps_reached"})
+                        
+                            current_plan = _plan_descriptions(ctx.plan_graph)
+                            context = {
+                                "reason": f"Maximum steps ({max_steps}) reached without goal achievement",
+                                "current_plan": current_plan,
+                                "step_count": len(completed_steps),
+                                "max_steps": max_steps,
+                                "query": query
+                            }
+                        
+                            suggested_plan = copy.deepcopy(initial_plan)
+                            suggested_plan_steps = initial_plan_steps
+                        
+                            new_plan, user_plan_dict = ask_user_for_plan(context, suggested_plan_steps, session_id)
+                        
+                            if new_plan and user_plan_dict:
+                                final_answer = user_plan_dict.get('final_answer', '')
+                                if final_answer:
+                                    ctx.update_globals({"final_answer": final_answer})
+                                    return final_answer
+                            elif new_plan and new_plan != suggested_plan_steps:
+                                logger.info("\n[INFO] Rebuilding plan graph with user-provided plan...")
+                                ctx.plan_graph = suggested_plan
+                                consecutive_failures = 0
+                                break  # new plan graph: recompute the ready set
+                else:
+                    # Wave handled without re-planning: the next ready set comes from its children
+                    frontier = _unblocked(ctx.plan_graph, ready)
+        finally:
+            # Speculative work the run ended without using
+            await _cancel_speculation(speculation)
         
         # Final summarization if loop exits without explicit summary
         print(f"\nExecution complete. Generating final summary...")
         
-        # Store node execution trace and completed steps in context for CSV logging and formatter
-        ctx.globals_schema["node_execution_trace"] = node_execution_trace
-        ctx.globals_schema["completed_steps"] = completed_steps
+        # Node execution trace and completed steps (for CSV logging and formatter) plus the results
+        # gathered below go into context in a single update_globals() before formatting
+        delta = {"node_execution_trace": node_execution_trace, "completed_steps": completed_steps}
         
         # For complex queries with multiple steps, aggregate all results
-        # Optimized: Use list comprehension for better performance
         if len(completed_steps) > 1:
-            # Build aggregated result from all completed steps
-            aggregated_parts = []
-            for step in completed_steps:
-                if step.get("result") and str(step["result"]) != "Tool failed, no user input provided":
-                    desc = step.get("description", "")
-                    result_val = str(step["result"])
-                    # For math results, extract just the number if it's a simple numeric result
-                    if desc and any(word in desc.lower() for word in ["calculate", "find", "compute", "factorial", "sum", "gcd", "prime"]):
-                        # Try to extract just the numeric result
-                        import re
-                        num_match = re.search(r'\b(\d+\.?\d*)\b', result_val)
-                        if num_match and len(result_val) < 50:  # If result is mostly a number
-                            aggregated_parts.append(f"{desc}: {num_match.group(1)}")
-                        else:
-                            aggregated_parts.append(f"{desc}: {result_val}")
-                    else:
-                        aggregated_parts.append(f"{desc}: {result_val}")
+            aggregated_parts = list(_aggregate_parts(completed_steps))
             
             if aggregated_parts:
                 aggregated_result = ". ".join(aggregated_parts) + "."
-                ctx.update_globals({"last_result": aggregated_result, "aggregated_results": aggregated_parts})
+                delta.update({"last_result": aggregated_result, "aggregated_results": aggregated_parts})
                 print(f"[DEBUG] Aggregated results from {len(completed_steps)} steps: {aggregated_result[:200]}")
         
         # Ensure last_result is available for formatter
-        if "last_result" not in ctx.globals_schema or not ctx.globals_schema["last_result"]:
+        if not (delta.get("last_result") or ctx.globals_schema.get("last_result")):
             # Try to get result from completed steps
             if completed_steps:
                 last_step = completed_steps[-1]
                 if "result" in last_step and last_step["result"]:
                     result_value = str(last_step["result"])
-                    if result_value != "Tool failed, no user input provided":
-                        ctx.update_globals({"last_result": result_value})
+                    if result_value != _TOOL_FAILED:
+                        delta["last_result"] = result_value
+        ctx.update_globals(delta)
         
         final_answer = self.formatter_agent.format_report(
             ctx.get_globals_schema(),
@@ -540,12 +1020,7 @@ class AgentLoop:
         
         # Save session to memory for future queries
         try:
-            from memory.session_log import append_session_to_store
-            from agent.agentSession import AgentSession, PerceptionSnapshot
-            from dataclasses import asdict
-            
             # Create a session object from context
-            session_id = str(uuid.uuid4())
             session = AgentSession(session_id, query)
             
             # Add perception if available (from context or p0)
@@ -582,84 +1057,23 @@ class AgentLoop:
                 "reasoning_note": ""
             })
             
-            # Save to memory
-            append_session_to_store(session, enhance=True)
+            # Save to memory (file read/write) without blocking other runs on the event loop
+            await asyncio.to_thread(append_session_to_store, session, enhance=True)
         except Exception as e:
             print(f"[WARN] Could not save session to memory: {e}")
-            import traceback
             traceback.print_exc()
         
         # Prepare execution details for CSV logging if requested
         if return_execution_details:
-            import json
-            # Extract plan steps from plan graph
-            plan_steps = []
-            if ctx.plan_graph and ctx.plan_graph.nodes:
-                for node_id, node in ctx.plan_graph.nodes.items():
-                    plan_steps.append(f"Step {node_id}: {node.description}")
-            
-            # Extract tools used from completed steps and node execution
-            tools_used = set()
-            for step in completed_steps:
-                result_str = str(step.get("result", "")).lower()
-                desc_str = str(step.get("description", "")).lower()
-                # Check for search tools
-                if "duckduckgo" in result_str or "duckduckgo" in desc_str:
-                    tools_used.add("duckduckgo_search_with_markdown")
-                # Check for math tools
-                for op in ["add", "subtract", "multiply", "divide", "power", "factorial", "gcd", "sqrt", "cbrt", "remainder"]:
-                    if op in desc_str:
-                        tools_used.add(op)
-                        break
-            
-            # Extract nodes called and build execution path
-            nodes_called_list = [trace["node_id"] for trace in node_execution_trace]
-            nodes_exe_path = "->".join(nodes_called_list) if nodes_called_list else ""
-            
-            # Build step details JSON
-            step_details_list = []
-            for step in completed_steps:
-                step_details_list.append({
-                    "node_id": step.get("node_id", ""),
-                    "description": step.get("description", ""),
-                    "variant": step.get("variant_succeeded", ""),
-                    "result_preview": str(step.get("result", ""))[:100]
-                })
-            
-            # Determine LLM provider (check if Ollama was used)
-            llm_provider = "Google API"  # Default
-            if hasattr(self.perception, 'use_ollama') and self.perception.use_ollama:
-                llm_provider = "Ollama"
-            elif hasattr(self.decision, 'use_ollama') and self.decision.use_ollama:
-                llm_provider = "Ollama"
-            
-            # Check if HIL was triggered during execution
-            hil_triggered = ctx.globals_schema.get("human_in_loop_triggered", False)
-            hil_reason = ctx.globals_schema.get("hil_reason", "")
-            
-            execution_details = {
-                "answer": final_answer,
-                "plan_steps": plan_steps,
-                "plan_step_count": len(plan_steps) if plan_steps else 0,
-                "tools_used": list(tools_used),
-                "tool_name": list(tools_used)[0] if tools_used else "agent_loop",
-                "nodes_called": nodes_called_list,
-                "nodes_exe_path": nodes_exe_path,
-                "node_execution_trace": node_execution_trace,
-                "completed_steps": completed_steps,
-                "step_details": json.dumps(step_details_list),
-                "nodes_called_json": json.dumps(nodes_called_list),
-                "node_count": len(nodes_called_list),
-                "final_state": {
-                    "final_answer": final_answer,
-                    "nodes_executed": len(nodes_called_list),
-                    "steps_completed": len(completed_steps)
-                },
-                "llm_provider": llm_provider,
-                "api_call_type": "tool_execution" if tools_used else "llm_call",
-                "human_in_loop_triggered": hil_triggered,
-                "hil_reason": hil_reason
-            }
-            return execution_details
+            execution_details = self._build_execution_details(
+                final_answer,
+                ctx=ctx,
+                completed_steps=completed_steps,
+                node_execution_trace=node_execution_trace,
+                tools_used=_tools_used(completed_steps),
+                hil_triggered=ctx.globals_schema.get("human_in_loop_triggered", False),
+                hil_reason=ctx.globals_schema.get("hil_reason", "")
+            )
+            return self._remember_answer(query, ctx, execution_details, return_execution_details)
         
-        return final_answer
+        return self._remember_answer(query, ctx, final_answer, return_execution_details)
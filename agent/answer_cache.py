@@ -0,0 +1,66 @@
+"""
+Answer cache: return a recent run's answer for a repeat of the same query without re-running it.
+
+Entries are keyed by plan_template_cache.query_fingerprint, so repeats that differ only in
+case, spacing, Unicode form or trailing punctuation hit. Looser (embedding) similarity is
+deliberately not used: queries that read alike but differ in a number or a name have
+different answers. Entries expire after a TTL, since some answers (web searches) go stale.
+"""
+
+import copy
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional, Tuple
+
+from agent.plan_template_cache import query_fingerprint
+
+
+class AnswerCache:
+    """In-process LRU of run results with a time-to-live."""
+
+    def __init__(self, ttl: float = 300.0, maxsize: int = 256):
+        """
+        Args:
+            ttl: Seconds an answer stays valid
+            maxsize: Maximum number of answers kept (least recently used are dropped first)
+        """
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self._entries: "OrderedDict[Tuple[str, Hashable], Tuple[float, Any]]" = OrderedDict()
+
+    def get(self, query: str, variant: Hashable = ()) -> Optional[Any]:
+        """
+        Cached result for query, or None on a miss or an expired entry.
+
+        Args:
+            query: User query
+            variant: Anything else the shape of the result depends on (e.g. details requested)
+
+        Returns:
+            A copy of the stored result, safe for the caller to mutate
+        """
+        key = (query_fingerprint(query), variant)
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.monotonic() - stored_at > self.ttl:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return copy.deepcopy(result)
+
+    def put(self, query: str, result: Any, variant: Hashable = ()):
+        """
+        Store a run's result for query.
+
+        Args:
+            query: User query
+            result: Final answer or execution details dict (copied, so later changes don't leak in)
+            variant: As for get()
+        """
+        key = (query_fingerprint(query), variant)
+        self._entries[key] = (time.monotonic(), copy.deepcopy(result))
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
@@ -0,0 +1,56 @@
+"""
+Plan template cache: reuse the initial plan graph across queries that differ only in form.
+
+Plans are keyed by a fingerprint of the query rather than its exact text, so repeats that
+differ only in case, spacing, Unicode form or trailing punctuation share one Decision pass.
+The fingerprint keeps every word and number: Decision writes the query's numbers and search
+text into the step code, so semantically "similar" queries (e.g. "add 3 and 4" vs
+"add 5 and 6") must not share a plan.
+
+Storage and invalidation are those of agent._llm_cache (L1 + optional diskcache).
+"""
+
+import re
+import unicodedata
+from typing import Callable, Hashable, Optional
+
+from agent._llm_cache import cached
+from core.plan_graph import PlanGraph
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT = "?.!"
+
+
+def query_fingerprint(query: str) -> str:
+    """
+    Normalized form of a query for plan reuse.
+
+    Args:
+        query: User query
+
+    Returns:
+        NFKC-normalized, case-folded query with whitespace collapsed and trailing ?.! removed
+    """
+    text = unicodedata.normalize("NFKC", query).casefold()
+    return _WHITESPACE_RE.sub(" ", text).strip().rstrip(_TRAILING_PUNCT).rstrip()
+
+
+async def get_or_build(
+    query: str,
+    build: Callable[[], PlanGraph],
+    key_extra: Hashable = (),
+    cacheable: Optional[Callable[[PlanGraph], bool]] = None,
+) -> PlanGraph:
+    """
+    Return a fresh copy of the cached plan graph for query, building it with build() on a miss.
+
+    Args:
+        query: User query
+        build: Zero-argument callable producing the plan graph
+        key_extra: Anything else the plan depends on (strategy, prompt version, ...)
+        cacheable: Optional predicate; plans it rejects are returned but not stored
+
+    Returns:
+        PlanGraph the caller may mutate
+    """
+    return await cached(("plan_graph", query_fingerprint(query), key_extra), build, cacheable=cacheable)
@@ -0,0 +1,34 @@
+"""
+Concurrency Limit for Session 11 - Graph-Native Agent System
+Caps in-flight LLM and MCP tool calls once steps, variants and perception run concurrently.
+"""
+
+import asyncio
+import os
+import weakref
+
+# Load limit from environment or use default
+MAX_CONCURRENCY = int(os.getenv("AGENT_MAX_CONCURRENCY", "8"))
+
+# One semaphore per event loop: asyncio primitives are bound to the loop they are first used
+# on, and each asyncio.run call creates a new loop (e.g. successive harness or simulator
+# runs in one process)
+_semaphores: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]" = weakref.WeakKeyDictionary()
+
+
+def call_slot() -> asyncio.Semaphore:
+    """
+    Semaphore every outgoing LLM/MCP call holds while in flight.
+
+    Usage:
+        async with call_slot():
+            ...
+
+    Returns:
+        The running event loop's semaphore, sized by AGENT_MAX_CONCURRENCY
+    """
+    loop = asyncio.get_running_loop()
+    semaphore = _semaphores.get(loop)
+    if semaphore is None:
+        semaphore = _semaphores[loop] = asyncio.Semaphore(MAX_CONCURRENCY)
+    return semaphore
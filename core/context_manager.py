@@ -16,6 +16,8 @@ class ContextManager:
     failed_nodes: List[str] = field(default_factory=list)
     history: List[Dict[str, Any]] = field(default_factory=list)
     nodes_executed: List[str] = field(default_factory=list)
+    # Snapshot returned by get_globals_schema(); dropped whenever the globals change
+    _schema_cache: Optional[Dict[str, Any]] = field(default=None, init=False, repr=False, compare=False)
 
     def log(self, event: str, **kwargs):
         """Log an event to the execution history."""
@@ -65,6 +67,7 @@ class ContextManager:
     def update_globals(self, updates: Dict[str, Any]):
         """Update the global state schema."""
         self.globals_schema.update(updates)
+        self._schema_cache = None
         self.log("globals_updated", updates=updates)
 
     def get_execution_trace(self) -> List[Dict[str, Any]]:
@@ -76,13 +79,21 @@ class ContextManager:
         return self.nodes_executed.copy()
 
     def get_globals_schema(self) -> Dict[str, Any]:
-        """Get current global state schema."""
-        return self.globals_schema.copy()
+        """
+        Get current global state schema.
+        
+        The snapshot is copied once and shared until the next update_globals(), so callers
+        must treat it as read-only (write through update_globals() instead).
+        """
+        if self._schema_cache is None:
+            self._schema_cache = self.globals_schema.copy()
+        return self._schema_cache
 
     def reset(self):
         """Reset the context manager (for testing)."""
         self.plan_graph = PlanGraph()
         self.globals_schema.clear()
+        self._schema_cache = None
         self.failed_nodes.clear()
         self.history.clear()
         self.nodes_executed.clear()
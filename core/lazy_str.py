@@ -0,0 +1,53 @@
+"""
+Lazy String Summaries for Session 11 - Graph-Native Agent System
+Fingerprints large step outputs and keeps only a head/tail sample for LLM prompts.
+"""
+
+import hashlib
+from types import SimpleNamespace
+from typing import Any
+
+
+def summarize(obj: Any, head: int = 512, tail: int = 512) -> SimpleNamespace:
+    """
+    Summarize a value as a digest plus a head/tail sample of its text.
+
+    Args:
+        obj: Value to summarize (str() is applied unless it already is a string)
+        head: Number of leading characters to keep
+        tail: Number of trailing characters to keep
+
+    Returns:
+        SimpleNamespace with:
+            - head: str (leading sample; the whole text if it fits in head + tail)
+            - tail: str (trailing sample; empty if the whole text fits)
+            - digest: str (BLAKE2b hex digest of the full text)
+            - length: int (length of the full text in characters)
+    """
+    text = obj if isinstance(obj, str) else str(obj)
+    digest = hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).hexdigest()
+    length = len(text)
+    if length <= head + tail:
+        return SimpleNamespace(head=text, tail="", digest=digest, length=length)
+    return SimpleNamespace(
+        head=text[:head],
+        tail=text[length - tail:] if tail else "",
+        digest=digest,
+        length=length
+    )
+
+
+def render(summary: SimpleNamespace) -> str:
+    """
+    Text for a summary: the full text if it was kept whole, else head ... tail with a gap marker.
+
+    Args:
+        summary: Result of summarize()
+
+    Returns:
+        Prompt-ready string
+    """
+    omitted = summary.length - len(summary.head) - len(summary.tail)
+    if omitted <= 0:
+        return summary.head + summary.tail
+    return f"{summary.head}\n... [{omitted} characters omitted] ...\n{summary.tail}"
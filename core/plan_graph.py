@@ -8,6 +8,10 @@ from enum import Enum, auto
 from typing import Dict, List, Optional, Any
 
 
+class PlanGraphError(ValueError):
+    """Raised when a plan graph is structurally unusable (e.g. it contains a cycle)."""
+
+
 class StepStatus(Enum):
     """Status of a step node in the execution graph."""
     PENDING = auto()
@@ -46,6 +50,9 @@ class StepNode:
     parents: List[str] = field(default_factory=list)
     children: List[str] = field(default_factory=list)
     is_fallback: bool = False
+    # Start all variants at once (first successful one in A/B/C order wins); keep False
+    # for steps whose variants have side effects that must not run more than once
+    variants_parallel: bool = False
     globals_delta: Dict[str, Any] = field(default_factory=dict)
     error: Optional[str] = None
 
@@ -100,6 +107,33 @@ class PlanGraph:
         """Check if a node exists in the graph."""
         return node_id in self.nodes
 
+    def has_cycles(self) -> bool:
+        """Check whether following child edges can lead back to a node (the graph is not a DAG)."""
+        # Iterative DFS: a child that is still being visited closes a cycle
+        visiting = set()
+        visited = set()
+        
+        for root_id in self.nodes:
+            if root_id in visited:
+                continue
+            visiting.add(root_id)
+            stack = [(root_id, iter(self.nodes[root_id].children))]
+            while stack:
+                node_id, children = stack[-1]
+                for child_id in children:
+                    if child_id in visiting:
+                        return True
+                    if child_id not in visited and child_id in self.nodes:
+                        visiting.add(child_id)
+                        stack.append((child_id, iter(self.nodes[child_id].children)))
+                        break
+                else:
+                    stack.pop()
+                    visiting.discard(node_id)
+                    visited.add(node_id)
+        
+        return False
+
     def get_execution_order(self) -> List[str]:
         """Get topological sort of nodes for execution order."""
         # Simple topological sort for DAG
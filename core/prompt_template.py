@@ -0,0 +1,46 @@
+"""
+Prompt Templates for Session 11 - Graph-Native Agent System
+Keeps a prompt file's text in memory so each LLM call only appends its JSON input.
+"""
+
+import os
+import threading
+from pathlib import Path
+from typing import Optional
+
+
+class PromptTemplate:
+    """
+    Stripped text of a prompt file, read once and re-read only after the file changes.
+
+    The prompts are static text followed by the call's JSON input, so there is nothing to
+    substitute: the cached text is the whole reusable prefix of every prompt. Checking the
+    modification time keeps edits to the file visible, as re-reading it on every call did.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._mtime: Optional[float] = None
+        self._text: Optional[str] = None
+        try:
+            self.text()
+        except OSError:
+            pass  # Missing or unreadable now: read (and raise) on first use instead
+
+    def text(self) -> str:
+        """
+        Current prompt text.
+
+        Returns:
+            File contents with surrounding whitespace stripped
+
+        Raises:
+            OSError: If the file cannot be read
+        """
+        mtime = os.path.getmtime(self.path)
+        with self._lock:
+            if self._text is None or mtime != self._mtime:
+                self._text = Path(self.path).read_text(encoding="utf-8").strip()
+                self._mtime = mtime
+            return self._text
@@ -1,6 +1,5 @@
 import os
 import json
-from pathlib import Path
 from typing import Optional
 from dotenv import load_dotenv
 from google import genai
@@ -9,6 +8,7 @@ import re
 from mcp_servers.multiMCP import MultiMCP
 import ast
 from core.plan_graph import PlanGraph, StepNode, CodeVariant, StepStatus
+from core.prompt_template import PromptTemplate
 from perception.perception import PerceptionResult
 import sys
 from pathlib import Path as PathLib
@@ -55,10 +55,13 @@ class Decision:
     def __init__(self, decision_prompt_path: str, multi_mcp: MultiMCP, api_key: str | None = None, model: str = "gemini-2.0-flash-lite", use_ollama: bool = False):
         load_dotenv()
         self.decision_prompt_path = decision_prompt_path
+        self._prompt = PromptTemplate(decision_prompt_path)
         self.multi_mcp = multi_mcp
         self.model = model
         # Cache for query analysis results
         self._query_cache = {}
+        # (tool names, tool list section of the prompt); see _tool_descriptions()
+        self._tool_block = None
 
         # Use ModelManager if available and Ollama is requested
         if MODEL_MANAGER_AVAILABLE and use_ollama:
@@ -90,12 +93,24 @@ class Decision:
         )
         return response.candidates[0].content.parts[0].text.strip()
     
+    def _tool_descriptions(self) -> str:
+        """
+        Tool list section of the decision prompt, sorted by tool name.
+        
+        Built once per set of available tools, so every prompt repeats the same bytes after
+        the template regardless of the order the MCP servers reported their tools in.
+        """
+        tool_names = tuple(getattr(self.multi_mcp, "tool_map", None) or ())
+        if self._tool_block is None or self._tool_block[0] != tool_names:
+            function_list_text = sorted(self.multi_mcp.tool_description_wrapper())
+            tool_descriptions = "\n".join(f"- `{desc.strip()}`" for desc in function_list_text)
+            self._tool_block = (tool_names, "\n\n### The ONLY Available Tools\n\n---\n\n" + tool_descriptions)
+        return self._tool_block[1]
+    
     def run(self, decision_input: dict) -> dict:
-        prompt_template = Path(self.decision_prompt_path).read_text(encoding="utf-8")
-        function_list_text = self.multi_mcp.tool_description_wrapper()
-        tool_descriptions = "\n".join(f"- `{desc.strip()}`" for desc in function_list_text)
-        tool_descriptions = "\n\n### The ONLY Available Tools\n\n---\n\n" + tool_descriptions
-        full_prompt = f"{prompt_template.strip()}\n{tool_descriptions}\n\n```json\n{json.dumps(decision_input, indent=2)}\n```"
+        prompt_template = self._prompt.text()
+        tool_descriptions = self._tool_descriptions()
+        full_prompt = f"{prompt_template}\n{tool_descriptions}\n\n```json\n{json.dumps(decision_input, indent=2)}\n```"
 
         try:
             if self.use_ollama and MODEL_MANAGER_AVAILABLE:
@@ -286,7 +301,8 @@ return result"""
                 step = StepNode(
                     index=str(i),
                     description=step_desc.replace("Step {}: ".format(i), "").replace(f"Step {i}: ", "").strip(),
-                    variants=step_variants
+                    variants=step_variants,
+                    variants_parallel=True  # A/B/C are read-only alternatives for the same result
                 )
                 graph.add_node(step)
                 if i > 0:
@@ -323,7 +339,7 @@ return result"""
                 # Always use DuckDuckGo search with markdown for information queries - provides full content
                 # DuckDuckGo is the default search engine in text mode for all information queries
                 # Markdown search fetches full content from top 3 results for better parsing
-                # Note: Don't use 'await' - AwaitTransformer will add it automatically for tool calls
+                # Note: Don't use 'await' - the executor's ExecutorRewriter adds it automatically for tool calls
                 # Escape single quotes in query to avoid syntax errors
                 escaped_query = user_query.replace("'", "\\'")
                 actual_code = f"result = duckduckgo_search_with_markdown('{escaped_query}', 3)\nreturn result"
@@ -353,7 +369,7 @@ return result"""
                 elif self._is_information_query(user_query):
                     # If Decision code doesn't use DuckDuckGo search tool, replace it
                     # This ensures DuckDuckGo is always used as the default for information queries
-                    # Note: Don't use 'await' - AwaitTransformer will add it automatically for tool calls
+                    # Note: Don't use 'await' - the executor's ExecutorRewriter adds it automatically for tool calls
                     if "duckduckgo_search" not in actual_code.lower() and "search" not in actual_code.lower():
                         # Force DuckDuckGo with markdown for information queries (provides full content)
                         # Escape single quotes in query to avoid syntax errors
@@ -383,7 +399,8 @@ return result"""
             step0 = StepNode(
                 index="0",
                 description=decision_output.get("description", "Execute calculation"),
-                variants=step0_variants
+                variants=step0_variants,
+                variants_parallel=True
             )
             graph.add_node(step0)
             graph.start_node_id = "0"
@@ -2,11 +2,13 @@ import os
 import sys
 import asyncio
 import json
-from typing import Optional, Any, List, Dict
+from functools import partial
+from typing import Optional, Any, Callable, List, Dict
 from inspect import signature
 from mcp import ClientSession, StdioServerParameters
 from mcp.client.stdio import stdio_client
 import ast
+from core.concurrency import call_slot
 
 class MCP:
     def __init__(
@@ -37,16 +39,18 @@ class MCP:
             args=[self.server_script],
             cwd=self.working_dir
         )
-        async with stdio_client(server_params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                return await session.call_tool(tool_name, arguments=arguments)
+        async with call_slot():
+            async with stdio_client(server_params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    return await session.call_tool(tool_name, arguments=arguments)
 
 class MultiMCP:
     def __init__(self, server_configs: List[dict]):
         self.server_configs = server_configs
         self.tool_map: Dict[str, Dict[str, Any]] = {}
         self.server_tools: Dict[str, List[Any]] = {}
+        self._tool_proxies: Optional[Dict[str, Callable]] = None
 
     async def initialize(self):
         print("in MultiMCP initialize")
@@ -80,6 +84,7 @@ class MultiMCP:
                         print(f"[ERROR] Session error: {se}")
             except Exception as e:
                 print(f"[ERROR] Error initializing MCP server {config['script']}: {e}")
+        self._tool_proxies = None  # tool_map changed; rebuild on next access
 
     async def call_tool(self, tool_name: str, arguments: dict) -> Any:
         entry = self.tool_map.get(tool_name)
@@ -94,10 +99,11 @@ class MultiMCP:
             cwd=config.get("cwd", os.getcwd())
         )
 
-        async with stdio_client(params) as (read, write):
-            async with ClientSession(read, write) as session:
-                await session.initialize()
-                return await session.call_tool(tool_name, arguments)
+        async with call_slot():
+            async with stdio_client(params) as (read, write):
+                async with ClientSession(read, write) as session:
+                    await session.initialize()
+                    return await session.call_tool(tool_name, arguments)
 
 
 
@@ -186,6 +192,13 @@ class MultiMCP:
 
 
 
+    @property
+    def tool_proxies(self) -> Dict[str, Callable]:
+        """Tool name -> async callable, where tool(*args) awaits function_wrapper(tool, *args). Built once."""
+        if self._tool_proxies is None:
+            self._tool_proxies = {name: partial(self.function_wrapper, name) for name in self.tool_map}
+        return self._tool_proxies
+
     async def list_all_tools(self) -> List[str]:
         return list(self.tool_map.keys())
 
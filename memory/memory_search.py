@@ -2,6 +2,7 @@ import os
 import json
 import time
 import re
+import threading
 from pathlib import Path
 from typing import List, Dict, Optional
 from datetime import datetime, timedelta
@@ -39,6 +40,7 @@ class MemorySearch:
         self._cache = None
         self._cache_timestamp = None
         self._cache_file_timestamps = {}  # Track file modification times
+        self._cache_dir_timestamps = {}  # Track directory modification times (files added/removed)
         
         # Question word indexing
         self._question_word_index = {
@@ -60,6 +62,10 @@ class MemorySearch:
         
         # Memory prioritization
         self._usage_stats = {}  # Track usage counts per memory entry
+        
+        # One AgentLoop keeps a single searcher and calls it from worker threads; the
+        # caches and indices above are rebuilt lazily, so searches must not interleave
+        self._lock = threading.Lock()
 
     def search_memory(
         self, 
@@ -83,6 +89,11 @@ class MemorySearch:
         if skip_load:
             return []
         
+        with self._lock:
+            return self._search_memory(user_query, top_k, use_vector_search)
+    
+    def _search_memory(self, user_query: str, top_k: int, use_vector_search: bool) -> List[Dict]:
+        """search_memory() body; the caller holds self._lock."""
         # Load and index memory entries
         memory_entries = self._load_queries(silent=False)
         
@@ -190,14 +201,17 @@ class MemorySearch:
             
             scored_results.append((final_score, entry))
         
-        # Sort by score and return top K - optimized with heapq for large lists
+        # Sort by score and return top K - optimized with heapq for large lists.
+        # Equal scores are ordered by entry id, so the same memory gives the same matches (and
+        # the same prompt bytes downstream) whatever order the files were listed in
+        rank = lambda x: (-x[0], self._get_entry_id(x[1]))
         if len(scored_results) > top_k * 2:
             # Use heapq for better performance on large lists
             import heapq
-            top_matches = heapq.nlargest(top_k, scored_results, key=lambda x: x[0])
+            top_matches = heapq.nsmallest(top_k, scored_results, key=rank)
         else:
             # Use sorted for small lists (more efficient for small N)
-            top_matches = sorted(scored_results, key=lambda x: x[0], reverse=True)[:top_k]
+            top_matches = sorted(scored_results, key=rank)[:top_k]
         # Filter and extract matches in one pass
         filtered_matches = [match[1] for match in top_matches if match[0] > 60]
         
@@ -236,7 +250,9 @@ class MemorySearch:
         memory_entries = []
         cutoff_date = datetime.now() - timedelta(days=self.days_back)
         
-        all_json_files = list(self.logs_path.rglob("*.json"))
+        # Taken before listing, so a file written meanwhile still triggers the next reload
+        self._cache_dir_timestamps = self._dir_timestamps()
+        all_json_files = sorted(self.logs_path.rglob("*.json"))
         if not silent:
             print(f"[SEARCH] Found {len(all_json_files)} JSON file(s) in '{self.logs_path}'")
             print(f"[SEARCH] Loading sessions from last {self.days_back} days (since {cutoff_date.date()})")
@@ -283,10 +299,32 @@ class MemorySearch:
         self._cache = memory_entries
         self._cache_timestamp = time.time()
         
+        # Indices were built from the previous entries; rebuild them on next search
+        self._indexed = False
+        self._vectors_built = False
+        self.__dict__.pop("_entry_id_to_idx", None)
+        
         return memory_entries
     
+    def _dir_timestamps(self) -> Dict[str, float]:
+        """Modification times of every directory under logs_path; they change when a file is added or removed."""
+        timestamps = {}
+        for dir_path, _, _ in os.walk(self.logs_path):
+            try:
+                timestamps[dir_path] = os.stat(dir_path).st_mtime
+            except OSError:
+                pass
+        return timestamps
+    
     def _check_files_changed(self) -> bool:
-        """Check if any JSON files have been modified since cache was created."""
+        """Check if any JSON files have been added, removed or modified since cache was created."""
+        # New session logs (e.g. the previous run's) land in new or existing day directories
+        for dir_path, cached_mtime in self._cache_dir_timestamps.items():
+            try:
+                if os.stat(dir_path).st_mtime != cached_mtime:
+                    return True
+            except OSError:
+                return True
         for file_path_str, cached_mtime in self._cache_file_timestamps.items():
             try:
                 file_path = Path(file_path_str)
@@ -1,14 +1,17 @@
+import asyncio
 import os
 import json
 import uuid
 import datetime
 from dataclasses import dataclass
 from typing import Optional
-from pathlib import Path
 from dotenv import load_dotenv
 from google import genai
 from google.genai.errors import ServerError
 from core.plan_graph import Route
+from core.lazy_str import render
+from core.concurrency import call_slot
+from core.prompt_template import PromptTemplate
 import sys
 from pathlib import Path as PathLib
 
@@ -47,6 +50,7 @@ class Perception:
     def __init__(self, perception_prompt_path: str, api_key: str | None = None, model: str = "gemini-2.0-flash-lite", use_ollama: bool = False):
         load_dotenv()
         self.perception_prompt_path = perception_prompt_path
+        self._prompt = PromptTemplate(perception_prompt_path)
         self.model = model
         
         # Use ModelManager if available and Ollama is requested
@@ -82,16 +86,18 @@ class Perception:
         else:
             memory_excerpt = {}
 
+        # Fields that repeat across calls come first and per-call ones last, so consecutive
+        # prompts share the longest possible byte prefix (provider-side prompt caching)
         return {
-            "run_id": str(uuid.uuid4()),
+            "schema_version": 1,
             "snapshot_type": snapshot_type,
-            "raw_input": raw_input,
-            "memory_excerpt": memory_excerpt,
+            "current_plan" : current_plan or "Inain Query Mode, plan not created",
             "prev_objective": "",
             "prev_confidence": None,
-            "timestamp": datetime.datetime.utcnow().isoformat(timespec="seconds") + "Z",
-            "schema_version": 1,
-            "current_plan" : current_plan or "Inain Query Mode, plan not created"
+            "memory_excerpt": memory_excerpt,
+            "raw_input": raw_input,
+            "run_id": str(uuid.uuid4()),
+            "timestamp": datetime.datetime.utcnow().isoformat(timespec="seconds") + "Z"
         }
     
     def _generate_with_backoff(self, full_prompt: str):
@@ -101,10 +107,11 @@ class Perception:
             contents=full_prompt
         )
     
-    def run(self, perception_input: dict) -> dict:
-        """Run perception on given input using the specified prompt file."""
-        prompt_template = Path(self.perception_prompt_path).read_text(encoding="utf-8")
-        full_prompt = f"{prompt_template.strip()}\n\n```json\n{json.dumps(perception_input, indent=2)}\n```"
+    def run(self, perception_input: dict, prompt_template: Optional[str] = None) -> dict:
+        """Run perception on given input using the prompt template (or text already fetched with load_prompt())."""
+        if prompt_template is None:
+            prompt_template = self.load_prompt()
+        full_prompt = f"{prompt_template}\n\n```json\n{json.dumps(perception_input, indent=2)}\n```"
 
         try:
             if self.use_ollama and MODEL_MANAGER_AVAILABLE:
@@ -290,13 +297,18 @@ class Perception:
                 "confidence": "0.0"
             }
 
-    def perceive_root(self, user_query: str, memory: list = None) -> PerceptionResult:
+    def load_prompt(self) -> str:
+        """Perception prompt template, stripped (the memory-independent part of a perception call)."""
+        return self._prompt.text()
+    
+    def perceive_root(self, user_query: str, memory: list = None, prompt_template: Optional[str] = None) -> PerceptionResult:
         """
         Analyze root user query and determine routing.
         
         Args:
             user_query: The user's query
             memory: Optional memory results from search
+            prompt_template: Prompt already fetched with load_prompt(); fetched here if None
         
         Returns:
             PerceptionResult with route decision
@@ -312,7 +324,7 @@ class Perception:
         )
         
         # Run perception
-        result = self.run(perception_input)
+        result = self.run(perception_input, prompt_template)
         
         # Determine route based on goal achievement
         goal_met = result.get("original_goal_achieved", False)
@@ -343,10 +355,15 @@ class Perception:
             notes=result.get("reasoning", "Initial perception completed")
         )
 
+    async def aperceive_step_output(self, step_id: str, output, context: dict = None) -> PerceptionResult:
+        """perceive_step_output() on a worker thread, so other steps keep running during the LLM call."""
+        async with call_slot():
+            return await asyncio.to_thread(self.perceive_step_output, step_id, output, context)
+    
     def perceive_step_output(
         self, 
         step_id: str, 
-        output: str, 
+        output, 
         context: dict = None
     ) -> PerceptionResult:
         """
@@ -354,7 +371,7 @@ class Perception:
         
         Args:
             step_id: ID of the step that was executed
-            output: Output from step execution
+            output: Output from step execution, as text or a core.lazy_str.summarize() sample
             context: Optional context information
         
         Returns:
@@ -362,6 +379,8 @@ class Perception:
         """
         if context is None:
             context = {}
+        if not isinstance(output, str):
+            output = render(output)
         
         # Build perception input for step output
         perception_input = self.build_perception_input(
@@ -7,13 +7,14 @@ from .retriever_agent import RetrieverAgent
 from .triplet_agent import TripletAgent
 from .graph_agent import GraphAgent
 from .critic_agent import CriticAgent
-from .formatter_agent import FormatterAgent
+from .formatter_agent import FormatterAgent, StepEvent
 
 __all__ = [
     "RetrieverAgent",
     "TripletAgent",
     "GraphAgent",
     "CriticAgent",
-    "FormatterAgent"
+    "FormatterAgent",
+    "StepEvent"
 ]
 
@@ -5,9 +5,18 @@ Includes property categorization by BHK and amenities extraction.
 """
 
 import re
+from dataclasses import dataclass
 from typing import Dict, Any, Optional, List
 
 
+@dataclass
+class StepEvent:
+    """A completed plan step, reported to the formatter while later steps still run."""
+    node_id: str
+    description: str
+    result: Any
+
+
 class FormatterAgent:
     """Agent for formatting final reports and answers."""
     
@@ -57,9 +66,10 @@ class FormatterAgent:
         Returns:
             Formatted answer string
         """
-        # Ensure query is in findings for extraction functions
+        # Ensure query is in findings for extraction functions (on a copy: findings may be
+        # the context's shared globals snapshot)
         if query and "query" not in findings:
-            findings["query"] = query
+            findings = {**findings, "query": query}
         
         if instruction:
             # Use instruction if provided
@@ -81,6 +91,24 @@ class FormatterAgent:
         
         return "No answer available"
     
+    def format_step(self, event: StepEvent, query: Optional[str] = None) -> str:
+        """
+        Format a partial result for one completed step.
+        
+        Args:
+            event: The completed step
+            query: Original query (for context-aware extraction)
+        
+        Returns:
+            One-line partial answer, e.g. "[1] Search for the capital: Paris"
+        """
+        result = str(event.result).strip()
+        answer = self._extract_concise_answer(result, query or "") if result else None
+        if not answer:
+            first_line = result.split("\n", 1)[0]
+            answer = first_line[:200] + ("..." if len(first_line) > 200 else "") if first_line else "(no output)"
+        return f"[{event.node_id}] {event.description}: {answer}"
+    
     def _format_with_instruction(self, findings: Dict[str, Any], instruction: str) -> str:
         """Format with specific instruction."""
         # Get the original query from context if available (for context-aware extraction)
@@ -48,12 +48,17 @@ async def run_simulator(num_tests: int = 100, query_source: str = "Tests/sample_
         num_tests: Number of tests to run (default: 100)
         query_source: Path to query file
     """
-    print("=" * 60)
-    print("SESSION 10 SIMULATOR")
-    print("=" * 60)
-    print(f"Running {num_tests} tests...")
-    print(f"Query source: {query_source}")
-    print("=" * 60)
+    rule = "=" * 60
+    # Multi-line blocks go out as one print each: a single encode + write
+    # instead of one per line.
+    print("\n".join([
+        rule,
+        "SESSION 10 SIMULATOR",
+        rule,
+        f"Running {num_tests} tests...",
+        f"Query source: {query_source}",
+        rule,
+    ]))
     
     # Load queries
     all_queries = await load_queries(query_source)
@@ -91,10 +96,7 @@ async def run_simulator(num_tests: int = 100, query_source: str = "Tests/sample_
     for test_id in range(1, num_tests + 1):
         query = queries[test_id - 1]
         
-        print(f"\n{'=' * 60}")
-        print(f"TEST {test_id}/{num_tests}")
-        print(f"{'=' * 60}")
-        print(f"Query: {query}")
+        print(f"\n{rule}\nTEST {test_id}/{num_tests}\n{rule}\nQuery: {query}")
         
         try:
             # Run agent with query_name
@@ -148,16 +150,20 @@ async def run_simulator(num_tests: int = 100, query_source: str = "Tests/sample_
                 final_state={}
             )
     
+    csv_manager.close()
+    
     # Final summary
-    print(f"\n{'=' * 60}")
-    print("SIMULATOR COMPLETE")
-    print(f"{'=' * 60}")
-    print(f"Total tests: {num_tests}")
-    print(f"Successes: {success_count}")
-    print(f"Failures: {failure_count}")
-    print(f"Success rate: {(success_count/num_tests)*100:.2f}%")
-    print(f"\nResults logged to: data/tool_performance.csv")
-    print(f"Queries logged to: data/query_text.csv")
+    print("\n".join([
+        f"\n{rule}",
+        "SIMULATOR COMPLETE",
+        rule,
+        f"Total tests: {num_tests}",
+        f"Successes: {success_count}",
+        f"Failures: {failure_count}",
+        f"Success rate: {(success_count/num_tests)*100:.2f}%",
+        "\nResults logged to: data/tool_performance.csv",
+        "Queries logged to: data/query_text.csv",
+    ]))
 
 
 if __name__ == "__main__":
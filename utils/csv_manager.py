@@ -3,23 +3,99 @@ CSV Manager for Session 10
 Handles reading and writing to tool_performance.csv and query_text.csv
 """
 
+import atexit
 import csv
+import io
 import os
+import queue
+import re
+import threading
+import weakref
 from pathlib import Path
 from datetime import datetime
 from typing import Optional, Dict, List
 import json
 
+# Optional: mirror tool performance rows to Parquet for faster analysis-time reads
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    PYARROW_AVAILABLE = False
+
+
+# Markers put on the writer queue: flush() forces an immediate write, close() stops the thread
+_FLUSH = object()
+_STOP = object()
+
+# Managers with an open file handle or writer thread; one atexit hook closes those never closed.
+# Weak references, so the hook does not keep discarded managers alive until shutdown
+_open_managers: "weakref.WeakSet[CSVManager]" = weakref.WeakSet()
+
+# Parquet part files are named part-<8-digit sequence>.parquet, so sorted names give write order
+# (parts named part-<date>-<time>-... by older versions parse as a lower sequence than new ones)
+_PARQUET_PART_RE = re.compile(r"part-(\d+)")
+
+
+def _close_open_managers():
+    """atexit hook: close every manager whose owner never called close()."""
+    for manager in list(_open_managers):
+        manager._close_at_exit()
+
+
+atexit.register(_close_open_managers)
+
 
 class CSVManager:
     """Manages CSV file operations for tool performance and query tracking."""
     
-    def __init__(self, data_dir: str = "data"):
+    # NOTE: Result_Status is reserved for high-level pipeline outcome
+    # (success / failed / error), while Actual_Status captures
+    # correctness classification (success / mismatch / warning / error)
+    TOOL_PERFORMANCE_HEADERS = [
+        "Test_Id", "Query_Id", "Query_Name", "Query_Text", "Query_Answer",
+        "Correct_Answer_Expected", "Plan_Used", "Result_Status", "Actual_Status",
+        "Start_Datetime", "End_Datetime", "Elapsed_Time", "Plan_Step_Count",
+        "Tool_Name", "Retry_Count", "Error_Message", "Final_State",
+        "Api_Call_Type", "LLM_Provider", "Step_Details",
+        "Nodes_Called", "Nodes_Compact", "Node_Count", "Nodes_Exe_Path"
+    ]
+    
+    def __init__(self, data_dir: str = "data", flush_every: Optional[int] = None):
+        """
+        Args:
+            data_dir: Directory holding the CSV files
+            flush_every: Number of buffered tool performance rows the background writer
+                batches per write (default: SAKANA_BATCH_SIZE env var, or 64)
+        """
         self.data_dir = Path(data_dir)
         self.data_dir.mkdir(exist_ok=True)
         
         self.tool_performance_file = self.data_dir / "tool_performance.csv"
         self.query_text_file = self.data_dir / "query_text.csv"
+        # Parquet mirror of tool_performance.csv: one part file per CSVManager session, plus a
+        # marker holding the CSV size (bytes) the mirror covers; no marker means the mirror is stale
+        self.tool_performance_parquet_dir = self.data_dir / "tool_performance_parquet"
+        self.tool_performance_parquet_marker = self.tool_performance_parquet_dir / "_csv_bytes"
+        
+        if flush_every is None:
+            flush_every = int(os.environ.get("SAKANA_BATCH_SIZE", "64"))
+        self.flush_every = max(1, flush_every)
+        self.flush_interval = 0.5  # seconds the writer waits before writing a partial batch
+        self._row_queue: "queue.Queue" = queue.Queue(maxsize=10000)
+        self._writer_thread: Optional[threading.Thread] = None
+        self._writer_lock = threading.Lock()
+        
+        # Persistent append handle for tool_performance.csv (opened on first write, see close())
+        self._io_lock = threading.Lock()
+        self._tool_performance_fh = None
+        self._tool_performance_writer = None
+        self._parquet_writer = None
+        self._parquet_pending: List[list] = []
+        self._parquet_enabled = PYARROW_AVAILABLE
+        self._parquet_complete = True
+        self._csv_start_bytes = 0
         
         self._initialize_files()
     
@@ -27,18 +103,7 @@ class CSVManager:
         """Initialize CSV files with headers if they don't exist."""
         # Initialize tool_performance.csv
         if not self.tool_performance_file.exists():
-            # NOTE: Result_Status is reserved for high-level pipeline outcome
-            # (success / failed / error), while Actual_Status captures
-            # correctness classification (success / mismatch / warning / error)
-            headers = [
-                "Test_Id", "Query_Id", "Query_Name", "Query_Text", "Query_Answer",
-                "Correct_Answer_Expected", "Plan_Used", "Result_Status", "Actual_Status",
-                "Start_Datetime", "End_Datetime", "Elapsed_Time", "Plan_Step_Count",
-                "Tool_Name", "Retry_Count", "Error_Message", "Final_State",
-                "Api_Call_Type", "LLM_Provider", "Step_Details",
-                "Nodes_Called", "Nodes_Compact", "Node_Count", "Nodes_Exe_Path"
-            ]
-            self._write_csv_headers(self.tool_performance_file, headers)
+            self._write_csv_headers(self.tool_performance_file, self.TOOL_PERFORMANCE_HEADERS)
         
         # Initialize query_text.csv
         if not self.query_text_file.exists():
@@ -342,7 +407,8 @@ class CSVManager:
         end_datetime: str = "",
         tool_name: str = "",
         retry_count: int = 0,
-        error_message: str = ""
+        error_message: str = "",
+        buffered: bool = False
     ):
         """
         Log tool performance to tool_performance.csv.
@@ -373,6 +439,8 @@ class CSVManager:
             tool_name: Name of tool used (optional)
             retry_count: Number of retries (optional)
             error_message: Error message if any (optional)
+            buffered: If True, hand the row to the background writer thread, which writes in
+                batches of flush_every (call flush() to wait for queued rows to be written)
         """
         # Get or generate test_id
         if test_id is None:
@@ -428,9 +496,223 @@ class CSVManager:
             api_call_type, llm_provider, step_details, nodes_called_json, nodes_compact, node_count, execution_path
         ]
         
-        with open(self.tool_performance_file, 'a', newline='', encoding='utf-8') as f:
-            writer = csv.writer(f)
-            writer.writerow(row)
+        if buffered:
+            self._ensure_writer()
+            self._row_queue.put(row)
+            return
+        
+        with self._io_lock:
+            self._write_tool_performance_rows([row])
+    
+    def log_tool_performance_buffered(self, **kwargs):
+        """Same as log_tool_performance(), but the row is written by the background writer thread."""
+        self.log_tool_performance(**kwargs, buffered=True)
+    
+    def _get_tool_performance_writer(self):
+        """
+        Return the csv.writer for tool_performance.csv, opening the persistent handle on first use.
+        
+        The handle uses a 1 MiB buffer and is only flushed by flush()/close(). Caller must hold _io_lock.
+        """
+        if self._tool_performance_fh is None:
+            self._csv_start_bytes = os.path.getsize(self.tool_performance_file)
+            self._tool_performance_fh = open(
+                self.tool_performance_file, 'a', newline='', encoding='utf-8', buffering=1 << 20
+            )
+            self._tool_performance_writer = csv.writer(self._tool_performance_fh)
+            _open_managers.add(self)
+        return self._tool_performance_writer
+    
+    def _write_tool_performance_rows(self, rows: List[list]):
+        """Append rows to tool_performance.csv and queue them for the Parquet mirror. Caller must hold _io_lock."""
+        self._get_tool_performance_writer().writerows(rows)
+        if self._parquet_enabled:
+            self._parquet_pending.extend(rows)
+            if len(self._parquet_pending) >= self.flush_every:
+                self._write_parquet_pending()
+        else:
+            self._parquet_complete = False
+    
+    def _parquet_schema(self):
+        """All mirror columns are strings, matching what csv.DictReader returns for the CSV."""
+        return pa.schema([(name, pa.string()) for name in self.TOOL_PERFORMANCE_HEADERS])
+    
+    def _rows_to_table(self, rows: List[list]):
+        """Build an Arrow table from positional CSV rows (short rows are padded with "")."""
+        width = len(self.TOOL_PERFORMANCE_HEADERS)
+        columns = [[] for _ in range(width)]
+        for row in rows:
+            for i in range(width):
+                value = row[i] if i < len(row) else ""
+                columns[i].append("" if value is None else str(value))
+        return pa.Table.from_arrays(
+            [pa.array(col, type=pa.string()) for col in columns], schema=self._parquet_schema()
+        )
+    
+    def _write_parquet_pending(self):
+        """Write pending rows as a row group of this session's Parquet part file. Caller must hold _io_lock."""
+        if not self._parquet_pending:
+            return
+        try:
+            if self._parquet_writer is None:
+                self._open_parquet_writer()
+            self._parquet_writer.write_table(self._rows_to_table(self._parquet_pending))
+        except Exception as e:
+            print(f"[WARN] Could not write Parquet mirror of tool performance rows: {e}")
+            self._parquet_complete = False
+        self._parquet_pending.clear()
+    
+    def _open_parquet_writer(self):
+        """
+        Open this session's Parquet part file. Caller must hold _io_lock.
+        
+        If the mirror does not cover tool_performance.csv as it was before this session
+        (first run, or an earlier session that exited without mirroring), it is rebuilt
+        from the CSV first. The marker is removed until close() completes the mirror.
+        """
+        parquet_dir = self.tool_performance_parquet_dir
+        parquet_dir.mkdir(parents=True, exist_ok=True)
+        covered = self._read_parquet_marker()
+        if self.tool_performance_parquet_marker.exists():
+            self.tool_performance_parquet_marker.unlink()
+        self._parquet_complete = True
+        
+        if covered != self._csv_start_bytes:
+            for part in parquet_dir.glob("*.parquet"):
+                part.unlink()
+            with open(self.tool_performance_file, 'rb') as f:
+                existing = f.read(self._csv_start_bytes).decode('utf-8')
+            rows = list(csv.reader(io.StringIO(existing, newline='')))[1:]  # drop header
+            if rows:
+                pq.write_table(
+                    self._rows_to_table(rows),
+                    str(parquet_dir / "part-00000000.parquet"),
+                    compression='snappy'
+                )
+        
+        self._parquet_writer = pq.ParquetWriter(
+            str(self._reserve_parquet_part()), self._parquet_schema(), compression='snappy'
+        )
+    
+    def _reserve_parquet_part(self) -> Path:
+        """
+        Create an empty part file numbered one past the highest existing part and return its path.
+        
+        Sequence numbers are zero-padded so the directory read returns parts in write order.
+        The file is created exclusively, so concurrent managers never share a number.
+        """
+        parquet_dir = self.tool_performance_parquet_dir
+        sequence = 0
+        for part in parquet_dir.glob("part-*.parquet"):
+            match = _PARQUET_PART_RE.match(part.name)
+            if match:
+                sequence = max(sequence, int(match.group(1)))
+        sequence += 1
+        while True:
+            path = parquet_dir / f"part-{sequence:08d}.parquet"
+            try:
+                os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                return path
+            except FileExistsError:
+                sequence += 1
+    
+    def _read_parquet_marker(self) -> Optional[int]:
+        """Return the CSV size recorded by the last completed mirror, or None."""
+        try:
+            return int(self.tool_performance_parquet_marker.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return None
+    
+    def _ensure_writer(self):
+        """Start the background tool performance writer thread if it is not running."""
+        with self._writer_lock:
+            if self._writer_thread is None:
+                self._writer_thread = threading.Thread(
+                    target=self._writer_loop, name="csv-tool-performance-writer", daemon=True
+                )
+                self._writer_thread.start()
+                _open_managers.add(self)
+    
+    def _writer_loop(self):
+        """
+        Drain queued rows into tool_performance.csv.
+        
+        Rows are written in batches of flush_every, or whenever the queue has been idle for
+        flush_interval seconds, or when flush()/close() asks for it.
+        """
+        batch: List[list] = []
+        while True:
+            try:
+                item = self._row_queue.get(timeout=self.flush_interval)
+            except queue.Empty:
+                item = None  # idle: write whatever is pending
+            
+            is_marker = item is _FLUSH or item is _STOP
+            if item is not None and not is_marker:
+                batch.append(item)
+            
+            if batch and (item is None or is_marker or len(batch) >= self.flush_every):
+                try:
+                    with self._io_lock:
+                        self._write_tool_performance_rows(batch)
+                except Exception as e:
+                    print(f"[WARN] Could not write {len(batch)} tool performance row(s): {e}")
+                for _ in batch:
+                    self._row_queue.task_done()
+                batch.clear()
+            
+            if is_marker:
+                self._row_queue.task_done()
+                if item is _STOP:
+                    return
+    
+    def flush(self):
+        """Block until every buffered tool performance row has been written and flushed to disk."""
+        if self._writer_thread is not None:
+            self._row_queue.put(_FLUSH)
+            self._row_queue.join()
+        with self._io_lock:
+            if self._tool_performance_fh is not None:
+                self._tool_performance_fh.flush()
+    
+    def close(self):
+        """Write any queued rows, stop the background writer and close tool_performance.csv."""
+        _open_managers.discard(self)
+        with self._writer_lock:
+            writer_thread, self._writer_thread = self._writer_thread, None
+        if writer_thread is not None:
+            self._row_queue.put(_STOP)
+            writer_thread.join()
+        with self._io_lock:
+            self._write_parquet_pending()
+            if self._tool_performance_fh is not None:
+                self._tool_performance_fh.close()
+                self._tool_performance_fh = None
+                self._tool_performance_writer = None
+            if self._parquet_writer is not None:
+                try:
+                    self._parquet_writer.close()
+                    if self._parquet_complete:
+                        self.tool_performance_parquet_marker.write_text(
+                            str(os.path.getsize(self.tool_performance_file)), encoding='utf-8'
+                        )
+                except Exception as e:
+                    print(f"[WARN] Could not close Parquet mirror: {e}")
+                self._parquet_writer = None
+    
+    def _close_at_exit(self):
+        """
+        Close on behalf of callers that never call close() (see _close_open_managers).
+        
+        pyarrow cannot write at interpreter shutdown, so mirroring stops here: rows not yet
+        mirrored are dropped and the mirror is left stale; readers fall back to the CSV.
+        """
+        with self._io_lock:
+            self._parquet_enabled = False
+            if self._parquet_pending:
+                self._parquet_pending.clear()
+                self._parquet_complete = False
+        self.close()
     
     def get_all_queries(self) -> List[Dict]:
         """Get all queries from query_text.csv."""
@@ -442,8 +724,42 @@ class CSVManager:
             reader = csv.DictReader(f)
             return list(reader)
     
+    def _parquet_mirror_is_current(self) -> bool:
+        """True if the Parquet mirror covers every row currently in tool_performance.csv."""
+        if not PYARROW_AVAILABLE or not self.tool_performance_file.exists():
+            return False
+        covered = self._read_parquet_marker()
+        return covered is not None and covered == os.path.getsize(self.tool_performance_file)
+    
+    def get_tool_performance_columns(self, columns: List[str]) -> List[Dict]:
+        """
+        Get tool performance records restricted to the given columns (values are strings).
+        
+        Reads only those columns from the Parquet mirror when it is up to date with the CSV,
+        otherwise falls back to parsing tool_performance.csv.
+        
+        Args:
+            columns: Column names from TOOL_PERFORMANCE_HEADERS
+        
+        Returns:
+            List of {column: value} dicts in logged order
+        """
+        self.flush()
+        if self._parquet_mirror_is_current():
+            try:
+                return pq.read_table(str(self.tool_performance_parquet_dir), columns=columns).to_pylist()
+            except Exception as e:
+                print(f"[WARN] Could not read Parquet mirror, falling back to CSV: {e}")
+        
+        if not self.tool_performance_file.exists():
+            return []
+        with open(self.tool_performance_file, 'r', encoding='utf-8') as f:
+            reader = csv.DictReader(f)
+            return [{col: row.get(col) or "" for col in columns} for row in reader]
+    
     def get_tool_performance(self) -> List[Dict]:
         """Get all tool performance records."""
+        self.flush()
         if not self.tool_performance_file.exists():
             return []
         
@@ -50,20 +50,8 @@ def generate_statistics(csv_path: Path = None, output_path: Path = None, generat
         print(f"[ERROR] CSV file not found: {csv_path}")
         return None
     
-    # Read CSV data
-    records = []
-    with open(csv_path, 'r', encoding='utf-8') as f:
-        reader = csv.DictReader(f)
-        records = list(reader)
-    
-    if not records:
-        print(f"[ERROR] No records found in {csv_path}")
-        return None
-    
-    print(f"[OK] Loaded {len(records)} records from {csv_path}")
-    
     # Initialize statistics
-    total_tests = len(records)
+    total_tests = 0
     successes = 0
     failures = 0
     total_time = 0.0
@@ -90,51 +78,59 @@ def generate_statistics(csv_path: Path = None, output_path: Path = None, generat
     # Failure reasons
     failure_reasons = defaultdict(int)
     
-    # Process records
-    for record in records:
-        result_status = record.get('Result_Status', '').lower()
-        elapsed_time = parse_elapsed_time(record.get('Elapsed_Time', '0'))
-        tool_name = record.get('Tool_Name', 'unknown')
-        query_id = record.get('Query_Id', '')
-        query_text = record.get('Query_Text', '')
-        query_name = record.get('Query_Name', '')
-        error_message = record.get('Error_Message', '')
-        
-        # Count successes/failures
-        if result_status == 'success':
-            successes += 1
-        else:
-            failures += 1
-            if error_message:
-                # Extract failure reason (first 100 chars)
-                reason = error_message[:100].strip()
-                if reason:
-                    failure_reasons[reason] += 1
-        
-        total_time += elapsed_time
-        
-        # Tool statistics
-        tool_stats[tool_name]["attempts"] += 1
-        tool_stats[tool_name]["total_time"] += elapsed_time
-        if result_status == 'success':
-            tool_stats[tool_name]["successes"] += 1
-        else:
-            tool_stats[tool_name]["failures"] += 1
-        
-        # Query statistics
-        if query_id:
-            query_key = str(query_id)
-            query_stats[query_key]["attempts"] += 1
-            query_stats[query_key]["total_time"] += elapsed_time
-            query_stats[query_key]["query_id"] = query_id
-            if not query_stats[query_key]["query_text"]:
-                query_stats[query_key]["query_text"] = query_text
-            if not query_stats[query_key]["query_name"]:
-                query_stats[query_key]["query_name"] = query_name
+    # Stream records straight from the CSV; nothing needs the full row list
+    with open(csv_path, 'r', newline='', encoding='utf-8', buffering=1 << 20) as f:
+        for record in csv.DictReader(f):
+            total_tests += 1
+            result_status = record.get('Result_Status', '').lower()
+            elapsed_time = parse_elapsed_time(record.get('Elapsed_Time', '0'))
+            tool_name = record.get('Tool_Name', 'unknown')
+            query_id = record.get('Query_Id', '')
+            query_text = record.get('Query_Text', '')
+            query_name = record.get('Query_Name', '')
+            error_message = record.get('Error_Message', '')
+            
+            # Count successes/failures
             if result_status == 'success':
-                query_stats[query_key]["successes"] += 1
+                successes += 1
             else:
-                query_stats[query_key]["failures"] += 1
+                failures += 1
+                if error_message:
+                    # Extract failure reason (first 100 chars)
+                    reason = error_message[:100].strip()
+                    if reason:
+                        failure_reasons[reason] += 1
+            
+            total_time += elapsed_time
+            
+            # Tool statistics
+            tool_stats[tool_name]["attempts"] += 1
+            tool_stats[tool_name]["total_time"] += elapsed_time
+            if result_status == 'success':
+                tool_stats[tool_name]["successes"] += 1
+            else:
+                tool_stats[tool_name]["failures"] += 1
+            
+            # Query statistics
+            if query_id:
+                query_key = str(query_id)
+                query_stats[query_key]["attempts"] += 1
+                query_stats[query_key]["total_time"] += elapsed_time
+                query_stats[query_key]["query_id"] = query_id
+                if not query_stats[query_key]["query_text"]:
+                    query_stats[query_key]["query_text"] = query_text
+                if not query_stats[query_key]["query_name"]:
+                    query_stats[query_key]["query_name"] = query_name
+                if result_status == 'success':
+                    query_stats[query_key]["successes"] += 1
+                else:
+                    query_stats[query_key]["failures"] += 1
+    
+    if not total_tests:
+        print(f"[ERROR] No records found in {csv_path}")
+        return None
+    
+    print(f"[OK] Loaded {total_tests} records from {csv_path}")
     
     # Calculate averages
     avg_time_per_test = total_time / total_tests if total_tests > 0 else 0.0
@@ -248,17 +244,16 @@ def generate_statistics(csv_path: Path = None, output_path: Path = None, generat
     # Generate CSV statistics if requested
     if generate_csv:
         csv_output_path = output_path.parent / "query_statistics.csv"
-        generate_csv_statistics(records, query_stats, csv_output_path)
+        generate_csv_statistics(query_stats, csv_output_path)
     
     return str(output_path)
 
 
-def generate_csv_statistics(records: List[Dict], query_stats: Dict, csv_path: Path):
+def generate_csv_statistics(query_stats: Dict, csv_path: Path):
     """
     Generate CSV statistics file from query statistics.
     
     Args:
-        records: List of all records from tool_performance.csv
         query_stats: Dictionary of query statistics
         csv_path: Path to output CSV file
     """
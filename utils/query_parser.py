@@ -7,14 +7,23 @@ import re
 from typing import Dict, Optional, Tuple
 
 
+# Amount followed by an optional Indian-system unit, shared by every currency
+# prefix. The amount run and the unit are atomic (Python 3.11+): the tail is
+# optional, so backtracking into them can never produce a different match and
+# only costs time on long digit/space runs. The plural spellings were never
+# reachable in the old ``lakh|lakhs|...`` alternation (first branch wins), so
+# dropping them keeps the captured unit identical.
+_AMOUNT_WITH_UNIT = r'([\d,.\s]++)\s*+((?>lakh|crore|thousand|hundred))?'
+
+
 class PropertyUnitParser:
     """Parser for property units (BHK - Bedroom, Hall, Kitchen)."""
     
     # BHK patterns: 1BHK, 2BHK, 3BHK, 4BHK, 5BHK, 6BHK, 7BHK, etc.
-    BHK_PATTERN = re.compile(r'(\d+)\s*BHK', re.IGNORECASE)
+    BHK_PATTERN = re.compile(r'(\d++)\s*+BHK', re.IGNORECASE)
     
     # Alternative patterns: 2 BHK, 2-BHK, 2bhk, etc.
-    BHK_PATTERN_ALT = re.compile(r'(\d+)\s*[-]?\s*BHK', re.IGNORECASE)
+    BHK_PATTERN_ALT = re.compile(r'(\d++)\s*+-?+\s*+BHK', re.IGNORECASE)
     
     # Penthouse pattern
     PENTHOUSE_PATTERN = re.compile(r'\bpenthouse\b', re.IGNORECASE)
@@ -224,9 +233,9 @@ class CurrencyParser:
     """Parser for Indian Rupees (Rs) currency amounts."""
     
     # Currency patterns
-    RS_PATTERN = re.compile(r'Rs\.?\s*([\d,.\s]+)\s*(lakh|lakhs|crore|crores|lakh|thousand|thousands|hundred|hundreds)?', re.IGNORECASE)
-    RS_PATTERN_ALT = re.compile(r'₹\s*([\d,.\s]+)\s*(lakh|lakhs|crore|crores|lakh|thousand|thousands|hundred|hundreds)?', re.IGNORECASE)
-    INDIAN_RUPEE_PATTERN = re.compile(r'INR\s*([\d,.\s]+)\s*(lakh|lakhs|crore|crores|lakh|thousand|thousands|hundred|hundreds)?', re.IGNORECASE)
+    RS_PATTERN = re.compile(r'Rs\.?\s*' + _AMOUNT_WITH_UNIT, re.IGNORECASE)
+    RS_PATTERN_ALT = re.compile(r'₹\s*' + _AMOUNT_WITH_UNIT, re.IGNORECASE)
+    INDIAN_RUPEE_PATTERN = re.compile(r'INR\s*' + _AMOUNT_WITH_UNIT, re.IGNORECASE)
     
     # Indian number system multipliers
     MULTIPLIERS = {
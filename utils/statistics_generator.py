@@ -12,6 +12,13 @@ import csv
 import json
 from datetime import datetime
 
+# Try to import pandas for vectorized aggregation (optional)
+try:
+    import pandas as pd
+    HAS_PANDAS = True
+except ImportError:
+    HAS_PANDAS = False
+
 # Try to import plotting libraries (optional)
 try:
     import matplotlib
@@ -31,17 +38,64 @@ class StatisticsGenerator:
     
     def generate_statistics(self) -> Dict:
         """
-        Generate comprehensive statistics from tool_performance.csv.
+        Generate comprehensive statistics from tool_performance.csv (or its Parquet mirror).
         Includes statistics by tool and by unique query_text.
         
         Returns:
             dict: Statistics dictionary
         """
-        records = self.csv_manager.get_tool_performance()
+        # Only the columns aggregated below; served from the Parquet mirror when it is current
+        records = self.csv_manager.get_tool_performance_columns([
+            "Test_Id", "Query_Id", "Query_Name", "Query_Text",
+            "Result_Status", "Elapsed_Time", "Tool_Name", "Error_Message"
+        ])
         
         if not records:
             return {"error": "No performance records found"}
         
+        if HAS_PANDAS:
+            stats = self._aggregate_records_pandas(records)
+        else:
+            stats = self._aggregate_records(records)
+        
+        # Calculate averages
+        if stats["total_tests"] > 0:
+            stats["avg_time_per_test"] = stats["total_time_all_queries"] / stats["total_tests"]
+        
+        # Find most used tool
+        if stats["by_tool"]:
+            most_used = max(stats["by_tool"].items(), key=lambda x: x[1]["attempts"])
+            stats["most_used_tool"] = most_used[0]
+        
+        # Find worst tool (highest failure rate)
+        if stats["by_tool"]:
+            worst_tool = None
+            worst_rate = 0.0
+            for tool, data in stats["by_tool"].items():
+                if data["attempts"] > 0:
+                    failure_rate = data["failures"] / data["attempts"]
+                    if failure_rate > worst_rate:
+                        worst_rate = failure_rate
+                        worst_tool = tool
+            stats["worst_tool"] = worst_tool or "N/A"
+        
+        # Convert defaultdict to dict for JSON serialization
+        stats["by_tool"] = dict(stats["by_tool"])
+        stats["by_query_text"] = dict(stats["by_query_text"])
+        stats["failure_reasons"] = dict(stats["failure_reasons"])
+        
+        return stats
+    
+    def _aggregate_records(self, records: List[Dict]) -> Dict:
+        """
+        Aggregate tool performance records row by row (used when pandas is not installed).
+        
+        Args:
+            records: Tool performance rows (column -> string value)
+        
+        Returns:
+            dict: Totals, by_tool, by_query_text and failure_reasons
+        """
         stats = {
             "total_tests": len(records),
             "successes": 0,
@@ -130,35 +184,101 @@ class StatisticsGenerator:
                     except (ValueError, TypeError):
                         pass
         
-        # Calculate averages
-        if stats["total_tests"] > 0:
-            stats["avg_time_per_test"] = total_time / stats["total_tests"]
         stats["total_time_all_queries"] = total_time
+        return stats
+    
+    def _aggregate_records_pandas(self, records: List[Dict]) -> Dict:
+        """
+        Aggregate tool performance records with vectorized pandas group-bys.
         
-        # Find most used tool
-        if stats["by_tool"]:
-            most_used = max(stats["by_tool"].items(), key=lambda x: x[1]["attempts"])
-            stats["most_used_tool"] = most_used[0]
+        Produces the same structure as _aggregate_records(), with groups in first-seen order.
         
-        # Find worst tool (highest failure rate)
-        if stats["by_tool"]:
-            worst_tool = None
-            worst_rate = 0.0
-            for tool, data in stats["by_tool"].items():
-                if data["attempts"] > 0:
-                    failure_rate = data["failures"] / data["attempts"]
-                    if failure_rate > worst_rate:
-                        worst_rate = failure_rate
-                        worst_tool = tool
-            stats["worst_tool"] = worst_tool or "N/A"
+        Args:
+            records: Tool performance rows (column -> string value)
         
-        # Convert defaultdict to dict for JSON serialization
-        stats["by_tool"] = dict(stats["by_tool"])
-        stats["by_query_text"] = dict(stats["by_query_text"])
-        stats["failure_reasons"] = dict(stats["failure_reasons"])
+        Returns:
+            dict: Totals, by_tool, by_query_text and failure_reasons
+        """
+        df = pd.DataFrame.from_records(records).fillna("")
+        success = df["Result_Status"].str.lower().eq("success")
+        elapsed = pd.to_numeric(df["Elapsed_Time"], errors="coerce").fillna(0.0)
+        df = df.assign(_success=success, _elapsed=elapsed)
+        
+        successes = int(success.sum())
+        stats = {
+            "total_tests": len(df),
+            "successes": successes,
+            "failures": len(df) - successes,
+            "by_tool": {},
+            "by_query_text": {},
+            "avg_time_per_test": 0.0,
+            "total_time_all_queries": float(elapsed.sum()),
+            "most_used_tool": "",
+            "worst_tool": "",
+            "failure_reasons": {}
+        }
+        
+        reasons = df.loc[~success & df["Error_Message"].ne(""), "Error_Message"].str[:100]
+        stats["failure_reasons"] = {
+            reason: int(count) for reason, count in reasons.groupby(reasons, sort=False).size().items()
+        }
+        
+        by_tool = df[df["Tool_Name"].ne("")].groupby("Tool_Name", sort=False).agg(
+            attempts=("_success", "size"), successes=("_success", "sum"), total_time=("_elapsed", "sum")
+        )
+        for tool, row in zip(by_tool.index, by_tool.itertuples(index=False)):
+            stats["by_tool"][tool] = {
+                "attempts": int(row.attempts),
+                "successes": int(row.successes),
+                "failures": int(row.attempts - row.successes),
+                "total_time": float(row.total_time)
+            }
+        
+        queries = df.assign(
+            _query_text=df["Query_Text"].str.strip(),
+            # Empty names / unparseable ids become NA so "first" picks the first usable value
+            _query_name=df["Query_Name"].str.strip().replace("", pd.NA),
+            _query_id=self._int_column(df["Query_Id"]),
+            _test_id=self._int_column(df["Test_Id"])
+        )
+        queries = queries[queries["_query_text"].ne("")]
+        grouped = queries.groupby("_query_text", sort=False)
+        by_query = grouped.agg(
+            attempts=("_success", "size"),
+            successes=("_success", "sum"),
+            total_time=("_elapsed", "sum"),
+            min_time=("_elapsed", "min"),
+            max_time=("_elapsed", "max"),
+            query_name=("_query_name", "first"),
+            query_id=("_query_id", "first")
+        )
+        test_ids = (
+            queries.dropna(subset=["_test_id"])
+            .drop_duplicates(["_query_text", "_test_id"])
+            .groupby("_query_text", sort=False)["_test_id"]
+            .agg(list)
+        )
+        for query_text, row in zip(by_query.index, by_query.itertuples(index=False)):
+            stats["by_query_text"][query_text] = {
+                "attempts": int(row.attempts),
+                "successes": int(row.successes),
+                "failures": int(row.attempts - row.successes),
+                "total_time": float(row.total_time),
+                "min_time": float(row.min_time),
+                "max_time": max(float(row.max_time), 0.0),
+                "query_name": "" if pd.isna(row.query_name) else row.query_name,
+                "query_id": None if pd.isna(row.query_id) else int(row.query_id),
+                "test_ids": [int(t) for t in test_ids.get(query_text, [])]
+            }
         
         return stats
     
+    @staticmethod
+    def _int_column(column: "pd.Series") -> "pd.Series":
+        """Parse a string column as nullable integers; blank or non-integer values become NA."""
+        stripped = column.str.strip()
+        return pd.to_numeric(stripped.where(stripped.str.fullmatch(r"[+-]?\d+")), errors="coerce").astype("Int64")
+    
     def format_statistics(self, stats: Dict) -> str:
         """
         Format statistics as markdown string.